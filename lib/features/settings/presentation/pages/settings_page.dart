@@ -143,6 +143,7 @@ class SettingsPage extends ConsumerWidget {
           children: ThemeMode.values
               .map(
                 (mode) => RadioListTile<ThemeMode>(
+                  key: ValueKey(mode),
                   title: Text(_getThemeDisplayName(mode)),
                   value: mode,
                   groupValue: ref.read(themeModeProvider),
@@ -170,6 +171,7 @@ class SettingsPage extends ConsumerWidget {
           children: LocaleNotifier.supportedLocales.map((locale) {
             final notifier = ref.read(localeProvider.notifier);
             return RadioListTile<Locale>(
+              key: ValueKey(locale),
               title: Text(notifier.getLocaleDisplayName(locale)),
               value: locale,
               groupValue: ref.read(localeProvider),
@@ -55,6 +55,7 @@ class TodosPage extends ConsumerWidget {
                     itemBuilder: (context, index) {
                       final todo = filteredTodos[index];
                       return TodoItem(
+                        key: ValueKey(todo.id),
                         todo: todo,
                         onTap: () => _navigateToEditTodo(context, todo),
                       );
@@ -47,6 +47,23 @@ format_size() {
     fi
 }
 
+# Function to read the app version (without build number) from pubspec.yaml
+app_version() {
+    grep -E '^version:' pubspec.yaml 2>/dev/null | head -1 | sed -E 's/^version:[[:space:]]*//; s/\+.*//; s/[[:space:]]*$//'
+}
+
+# Function to attribute artifact bytes to Dart AOT, engine, assets and resources
+inspect_artifact() {
+    local artifact_path=$1
+    if command -v python3 &> /dev/null; then
+        python3 scripts/artifact_inspector.py "$artifact_path"
+    elif command -v aapt &> /dev/null; then
+        aapt list -v "$artifact_path" | head -20
+    else
+        print_warning "python3 not found. Skipping artifact content analysis."
+    fi
+}
+
 # Function to analyze APK size
 analyze_apk_size() {
     print_header "APK Size Analysis"
@@ -72,11 +89,7 @@ analyze_apk_size() {
         
         # Analyze APK contents
         print_info "Analyzing APK contents..."
-        if command -v aapt &> /dev/null; then
-            aapt list -v "$apk_path" | head -20
-        else
-            print_warning "aapt not found. Install Android SDK tools for detailed analysis."
-        fi
+        inspect_artifact "$apk_path"
     else
         print_error "APK file not found at $apk_path"
     fi
@@ -104,6 +117,10 @@ analyze_bundle_size() {
         else
             print_success "App Bundle size is reasonable (<100MB)."
         fi
+
+        # Analyze App Bundle contents
+        print_info "Analyzing App Bundle contents..."
+        inspect_artifact "$bundle_path"
     else
         print_error "App Bundle file not found at $bundle_path"
     fi
@@ -115,10 +132,14 @@ analyze_web_size() {
     
     if [ ! -d "build/web" ]; then
         print_warning "Web build not found. Building..."
-        flutter build web --release
+        # Source maps let web_bundle_analyzer.py attribute main.dart.js to packages
+        flutter build web --release --source-maps
     fi
     
-    if [ -d "build/web" ]; then
+    if [ -d "build/web" ] && command -v python3 &> /dev/null; then
+        # Raw, gzip and brotli size per file, startup vs deferred totals and deferred-loading hints
+        python3 scripts/web_bundle_analyzer.py build/web
+    elif [ -d "build/web" ]; then
         local web_size=$(du -sh build/web | cut -f1)
         print_info "Web Bundle Size: $web_size"
         
@@ -142,15 +163,60 @@ analyze_web_size() {
     fi
 }
 
+# Function to summarise the --analyze-size JSON per package, library and asset
+analyze_code_size_json() {
+    print_header "Code Size Breakdown"
+
+    if command -v python3 &> /dev/null; then
+        # Stored as logs/bundle_size/v<version>-android.json for release diffs and dependency attribution
+        local app_version=$(app_version)
+        if [ -n "$app_version" ]; then
+            python3 scripts/bundle_size_analyzer.py analyze --version "$app_version" --platform android \
+                || print_warning "Code size analysis JSON not available"
+        else
+            python3 scripts/bundle_size_analyzer.py analyze --platform android \
+                || print_warning "Code size analysis JSON not available"
+        fi
+        print_info "Compare builds with: python3 scripts/bundle_size_analyzer.py diff <old> <new>"
+    else
+        print_warning "python3 not found. Skipping code size breakdown."
+    fi
+}
+
+# Function to list packages added, removed or re-resolved since the last release, with their code size change
+analyze_dependency_changes() {
+    local previous_tag=$(git describe --tags --abbrev=0 --match 'release-android-v*' 2>/dev/null || true)
+    if ! command -v python3 &> /dev/null || [ -z "$previous_tag" ] || [ ! -f "pubspec.lock" ]; then
+        return
+    fi
+
+    print_header "Dependency Changes"
+    print_info "Dependency changes since $previous_tag..."
+    # Sized against the summary analyze_code_size_json stored for this build, when there is one
+    local size_args=()
+    local app_version=$(app_version)
+    if [ -n "$app_version" ] && [ -f "logs/bundle_size/v${app_version}-android.json" ]; then
+        size_args=(--new-size "$app_version:android")
+    fi
+    python3 scripts/pubspec_lock_diff.py diff "$previous_tag" pubspec.lock "${size_args[@]}" \
+        || print_warning "Dependency diff not available"
+}
+
 # Function to analyze dependencies
 analyze_dependencies() {
     print_header "Dependency Analysis"
     
-    print_info "Analyzing pubspec.yaml dependencies..."
-    
-    # Count dependencies
-    local dep_count=$(grep -c "^  [a-zA-Z]" pubspec.yaml || echo "0")
-    print_info "Total dependencies: $dep_count"
+    # Count resolved dependencies from pubspec.lock (direct ones count towards the limit)
+    local dep_count
+    if command -v python3 &> /dev/null && [ -f "pubspec.lock" ]; then
+        print_info "Analyzing pubspec.lock dependencies..."
+        python3 scripts/pubspec_lock_diff.py summary
+        dep_count=$(python3 scripts/pubspec_lock_diff.py summary --count direct)
+    else
+        print_info "Analyzing pubspec.yaml dependencies..."
+        dep_count=$(grep -c "^  [a-zA-Z]" pubspec.yaml || echo "0")
+    fi
+    print_info "Direct dependencies: $dep_count"
     
     if [ $dep_count -gt 50 ]; then
         print_warning "High number of dependencies ($dep_count). Consider removing unused ones."
@@ -207,6 +273,27 @@ check_unused_assets() {
     fi
 }
 
+# Function to enforce config/size_budgets.yaml against the build outputs and the previous release
+run_size_gate() {
+    print_header "Size Budget Gate"
+
+    if ! command -v python3 &> /dev/null; then
+        print_warning "python3 not found. Skipping size budget gate."
+        return 0
+    fi
+
+    local gate_status=0
+    for platform in android web; do
+        print_info "Checking $platform budgets..."
+        python3 scripts/size_ledger.py check "$platform" || gate_status=1
+    done
+
+    if [ $gate_status -ne 0 ]; then
+        print_error "Size budgets exceeded. See config/size_budgets.yaml."
+    fi
+    return $gate_status
+}
+
 # Function to provide optimization recommendations
 provide_recommendations() {
     print_header "Optimization Recommendations"
@@ -263,8 +350,13 @@ main() {
     check_unused_assets
     analyze_apk_size
     analyze_bundle_size
+    analyze_code_size_json
+    analyze_dependency_changes
     analyze_web_size
     provide_recommendations
+
+    local gate_status=0
+    run_size_gate || gate_status=$?
     
     print_header "Analysis Complete"
     print_success "Bundle size analysis finished!"
@@ -272,6 +364,9 @@ main() {
     print_info "For detailed size analysis, use:"
     echo "flutter build apk --analyze-size"
     echo "flutter build appbundle --analyze-size"
+    echo "python3 scripts/size_ledger.py trend web main.dart.js"
+
+    exit $gate_status
 }
 
 # Run main function
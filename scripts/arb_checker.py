@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+ARB Consistency Checker
+Compares every locale's ARB file with the template for missing, extra and placeholder-mismatched keys
+without running flutter gen-l10n, reparsing only ARB files whose content changed, and compiles a compact
+key index with per-locale coverage
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import yaml
+
+from file_cache import FileHashCache
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+L10N_CONFIG = 'l10n.yaml'
+# flutter gen-l10n defaults when l10n.yaml is absent
+DEFAULT_ARB_DIR = 'lib/l10n'
+DEFAULT_TEMPLATE = 'app_en.arb'
+KEY_INDEX_FILE = '.dart_tool/l10n/key_index.json'
+PARSER_VERSION = '1'
+PARALLEL_THRESHOLD = 16
+PLURAL_TYPES = ('plural', 'select', 'selectordinal')
+
+
+class _Pairs(dict):
+    """json object that remembers its raw key/value pairs, so duplicate keys stay visible"""
+
+    def __init__(self, pairs):
+        super().__init__(pairs)
+        self.pairs = pairs
+
+
+def iter_entries(path: str) -> Iterator[Tuple[str, object]]:
+    """Top-level (key, value) pairs of an ARB file in file order, duplicates included"""
+    with open(path, 'rb') as f:
+        if ijson is not None:
+            yield from ijson.kvitems(f, '')
+        else:
+            yield from json.load(f, object_pairs_hook=_Pairs).pairs
+
+
+def message_placeholders(message: str) -> Set[str]:
+    """Argument names used by an ICU message, including those inside plural/select cases"""
+    names: Set[str] = set()
+    _parse_message(message, 0, names, nested=False)
+    return names
+
+
+def _parse_message(text: str, pos: int, names: Set[str], nested: bool) -> int:
+    """Scan message text from pos, collecting {arguments}; returns the index after a closing brace when nested"""
+    while pos < len(text):
+        char = text[pos]
+        if char == '{':
+            pos = _parse_argument(text, pos + 1, names)
+        elif char == '}' and nested:
+            return pos + 1
+        else:
+            pos += 1
+    return pos
+
+
+def _parse_argument(text: str, pos: int, names: Set[str]) -> int:
+    """Parse '{name}' or '{name, type, cases}' starting after the brace; returns the index after it"""
+    end = len(text)
+    separator = pos
+    while separator < end and text[separator] not in ',}':
+        separator += 1
+    name = text[pos:separator].strip()
+    if name:
+        names.add(name)
+    if separator >= end or text[separator] == '}':
+        return separator + 1
+
+    type_end = text.find(',', separator + 1)
+    close = text.find('}', separator + 1)
+    argument_type = text[separator + 1:type_end if type_end != -1 and type_end < close else close].strip()
+    if argument_type not in PLURAL_TYPES:
+        # {amount, number} style: skip to the matching brace
+        return (close + 1) if close != -1 else end
+
+    pos = type_end + 1
+    while pos < end:
+        char = text[pos]
+        if char == '{':
+            pos = _parse_message(text, pos + 1, names, nested=True)
+        elif char == '}':
+            return pos + 1
+        else:
+            pos += 1
+    return pos
+
+
+def parse_arb(path: str) -> Dict:
+    """Messages (key -> placeholder names), declared placeholders and duplicate keys of one ARB file"""
+    locale = None
+    messages: Dict[str, List[str]] = {}
+    declared: Dict[str, List[str]] = {}
+    duplicates: List[str] = []
+
+    for key, value in iter_entries(path):
+        if key == '@@locale':
+            locale = value
+        elif key.startswith('@@'):
+            continue
+        elif key.startswith('@'):
+            placeholders = value.get('placeholders') if isinstance(value, dict) else None
+            declared[key[1:]] = sorted(placeholders or {})
+        else:
+            if key in messages:
+                duplicates.append(key)
+            messages[key] = sorted(message_placeholders(value)) if isinstance(value, str) else []
+
+    if locale is None:
+        # app_pt_BR.arb -> pt_BR
+        locale = os.path.splitext(os.path.basename(path))[0].split('_', 1)[-1]
+    return {'locale': locale, 'messages': messages, 'declared': declared, 'duplicates': duplicates}
+
+
+def load_l10n_config(config_file: str = L10N_CONFIG) -> Tuple[str, str]:
+    """(arb directory, template file name) from l10n.yaml or the gen-l10n defaults"""
+    if not os.path.exists(config_file):
+        return DEFAULT_ARB_DIR, DEFAULT_TEMPLATE
+    with open(config_file, 'r') as f:
+        config = yaml.safe_load(f) or {}
+    return config.get('arb-dir', DEFAULT_ARB_DIR), config.get('template-arb-file', DEFAULT_TEMPLATE)
+
+
+def parse_all(paths: List[str], max_workers: Optional[int] = None) -> Tuple[Dict[str, Dict], int]:
+    """Parsed summary per ARB file, reparsing only changed files; returns (summaries, files parsed)"""
+    cache = FileHashCache('arb_checker', version=PARSER_VERSION)
+    summaries, pending = {}, []
+    for path in paths:
+        fingerprint, cached = cache.lookup(path)
+        if cached is not None:
+            summaries[path] = cached
+        else:
+            pending.append((path, fingerprint))
+
+    if len(pending) >= PARALLEL_THRESHOLD:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            parsed = list(executor.map(parse_arb, [path for path, _ in pending]))
+    else:
+        parsed = [parse_arb(path) for path, _ in pending]
+
+    for (path, fingerprint), summary in zip(pending, parsed):
+        summaries[path] = summary
+        cache.store(path, fingerprint, summary)
+    cache.prune(paths)
+    cache.save()
+    return summaries, len(pending)
+
+
+def compare_locale(template: Dict, summary: Dict) -> Dict:
+    """Missing, extra and placeholder-mismatched keys of one locale against the template"""
+    template_messages = template['messages']
+    messages = summary['messages']
+    mismatched = {key: {'expected': template_messages[key], 'found': placeholders}
+                  for key, placeholders in messages.items()
+                  if key in template_messages and placeholders != template_messages[key]}
+    return {
+        'missing': [key for key in template_messages if key not in messages],
+        'extra': [key for key in messages if key not in template_messages],
+        'placeholder_mismatch': mismatched,
+        'duplicates': summary['duplicates'],
+    }
+
+
+def check_template(template: Dict) -> Dict[str, List[str]]:
+    """Placeholders used in template messages but not declared in their @key metadata"""
+    undeclared = {}
+    for key, placeholders in template['messages'].items():
+        missing = [name for name in placeholders if name not in template['declared'].get(key, [])]
+        if missing:
+            undeclared[key] = missing
+    return undeclared
+
+
+def build_key_index(template_path: str, template: Dict, reports: Dict[str, Dict]) -> Dict:
+    """Compact index: keys listed once, per-locale problems referenced by key position"""
+    keys = list(template['messages'])
+    position = {key: i for i, key in enumerate(keys)}
+    return {
+        'template': os.path.basename(template_path),
+        'keys': keys,
+        'placeholders': {str(position[key]): names for key, names in template['messages'].items() if names},
+        'locales': {
+            locale: {
+                'coverage': round(1 - len(report['missing']) / len(keys), 4) if keys else 1.0,
+                'missing': [position[key] for key in report['missing']],
+                'mismatched': [position[key] for key in report['placeholder_mismatch']],
+                'extra': report['extra'],
+            } for locale, report in sorted(reports.items())
+        },
+    }
+
+
+def write_key_index(index: Dict, path: str = KEY_INDEX_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+    os.replace(temporary, path)
+
+
+def print_report(template_locale: str, undeclared: Dict[str, List[str]], reports: Dict[str, Dict],
+                 key_count: int, limit: int):
+    def listing(keys: List[str]) -> str:
+        shown = ', '.join(keys[:limit])
+        return shown + (f" (+{len(keys) - limit} more)" if len(keys) > limit else '')
+
+    print(f"🌐 Template {template_locale}: {key_count} keys")
+    for key, names in sorted(undeclared.items()):
+        print(f"❌ {template_locale}: '{key}' uses undeclared placeholders {', '.join(names)}")
+
+    for locale, report in sorted(reports.items()):
+        coverage = 1 - len(report['missing']) / key_count if key_count else 1.0
+        print(f"{'✅' if not any(report.values()) else '⚠️'} {locale}: {coverage:.1%} translated")
+        if report['missing']:
+            print(f"   missing ({len(report['missing'])}): {listing(report['missing'])}")
+        if report['extra']:
+            print(f"   ❌ extra ({len(report['extra'])}): {listing(report['extra'])}")
+        for key, details in sorted(report['placeholder_mismatch'].items())[:limit]:
+            print(f"   ❌ placeholders of '{key}': expected {{{', '.join(details['expected'])}}}, "
+                  f"found {{{', '.join(details['found'])}}}")
+        if len(report['placeholder_mismatch']) > limit:
+            print(f"   ❌ ... {len(report['placeholder_mismatch']) - limit} more placeholder mismatches")
+        if report['duplicates']:
+            print(f"   ❌ duplicate keys: {listing(report['duplicates'])}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Check ARB files against the template without gen-l10n')
+    parser.add_argument('--arb-dir', help='ARB directory (default: from l10n.yaml or lib/l10n)')
+    parser.add_argument('--template', help='template ARB file name (default: from l10n.yaml or app_en.arb)')
+    parser.add_argument('--index', default=KEY_INDEX_FILE, help='where to write the compact key index')
+    parser.add_argument('--strict', action='store_true', help='fail on missing translations too')
+    parser.add_argument('--limit', type=int, default=10, help='keys listed per problem')
+    parser.add_argument('--jobs', type=int, help='worker processes')
+    args = parser.parse_args(argv)
+
+    arb_dir, template_name = load_l10n_config()
+    arb_dir = args.arb_dir or arb_dir
+    template_path = os.path.join(arb_dir, args.template or template_name)
+    if not os.path.exists(template_path):
+        print(f"❌ Template ARB file not found: {template_path}")
+        return 1
+
+    paths = sorted(glob.glob(os.path.join(arb_dir, '*.arb')))
+    summaries, parsed = parse_all(paths, args.jobs)
+    template = summaries[template_path]
+
+    undeclared = check_template(template)
+    reports = {summary['locale']: compare_locale(template, summary)
+               for path, summary in summaries.items() if path != template_path}
+    if template['duplicates']:
+        reports[template['locale']] = {'missing': [], 'extra': [], 'placeholder_mismatch': {},
+                                       'duplicates': template['duplicates']}
+
+    write_key_index(build_key_index(template_path, template, reports), args.index)
+    print_report(template['locale'], undeclared, reports, len(template['messages']), args.limit)
+    print(f"📇 Key index written to {args.index} ({parsed} of {len(paths)} ARB files reparsed)")
+
+    failed = bool(undeclared) or any(
+        report['extra'] or report['placeholder_mismatch'] or report['duplicates'] or
+        (args.strict and report['missing'])
+        for report in reports.values()
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
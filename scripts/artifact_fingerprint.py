@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Artifact Fingerprinting
+Hashes release artifacts with SHA-256 and a BLAKE2b tree hash using mmap and a thread pool,
+splitting the work across files and across chunks of large files. Directories get digests over
+their sorted file manifest
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+CHUNK_SIZE = 8 * 1024 * 1024
+DIGEST_SIZE = 32
+
+
+def _blake2b_node(offset: int, depth: int, last: bool) -> 'hashlib.blake2b':
+    """BLAKE2b tree node with fixed parameters (unlimited fanout, depth 2, CHUNK_SIZE leaves)"""
+    return hashlib.blake2b(digest_size=DIGEST_SIZE, fanout=0, depth=2, leaf_size=CHUNK_SIZE,
+                           inner_size=DIGEST_SIZE, node_offset=offset, node_depth=depth,
+                           last_node=last)
+
+
+class MappedFile:
+    """Read-only mmap of a file; empty files map to an empty buffer"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self.file = None
+        self.map = None
+        self.view = None
+
+    def __enter__(self) -> memoryview:
+        if not self.size:
+            self.view = memoryview(b'')
+        else:
+            self.file = open(self.path, 'rb')
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.view = memoryview(self.map)
+        return self.view
+
+    def __exit__(self, *exc):
+        self.view.release()
+        if self.map is not None:
+            self.map.close()
+            self.file.close()
+
+
+def sha256_file(path: str) -> str:
+    """Full-file SHA-256; hashlib releases the GIL so files hash concurrently"""
+    digest = hashlib.sha256()
+    with MappedFile(path) as view:
+        for start in range(0, len(view), CHUNK_SIZE):
+            digest.update(view[start:start + CHUNK_SIZE])
+    return digest.hexdigest()
+
+
+def blake2b_leaf(path: str, index: int, last: bool) -> bytes:
+    """Digest of one CHUNK_SIZE leaf of the BLAKE2b tree"""
+    with MappedFile(path) as view:
+        node = _blake2b_node(index, 0, last)
+        node.update(view[index * CHUNK_SIZE:(index + 1) * CHUNK_SIZE])
+    return node.digest()
+
+
+def blake2b_root(leaves: List[bytes]) -> str:
+    root = _blake2b_node(0, 1, True)
+    for leaf in leaves:
+        root.update(leaf)
+    return root.hexdigest()
+
+
+def list_files(path: str) -> List[str]:
+    """A file, or every file below a directory, in a stable order"""
+    if os.path.isfile(path):
+        return [path]
+    files = []
+    for root, dirs, names in os.walk(path):
+        dirs.sort()
+        files.extend(os.path.join(root, name) for name in sorted(names))
+    return files
+
+
+def fingerprint_paths(artifacts: Dict[str, str], max_workers: Optional[int] = None) -> Dict[str, Dict]:
+    """Fingerprint named artifacts (files or directories) with one shared thread pool; a file that
+    belongs to several artifacts (build/web and build/web/main.dart.js) is hashed once"""
+    workers = max_workers or min(32, (os.cpu_count() or 1) * 2)
+    plan: Dict[str, List[Tuple[str, int, Future, List[Future]]]] = {}
+    scheduled: Dict[str, Tuple[Future, List[Future]]] = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for name, root in artifacts.items():
+            jobs = []
+            for path in list_files(root):
+                size = os.path.getsize(path)
+                key = os.path.realpath(path)
+                if key not in scheduled:
+                    leaf_count = max(1, -(-size // CHUNK_SIZE))
+                    leaves = [executor.submit(blake2b_leaf, path, i, i == leaf_count - 1)
+                              for i in range(leaf_count)]
+                    scheduled[key] = (executor.submit(sha256_file, path), leaves)
+                sha256, leaves = scheduled[key]
+                jobs.append((path, size, sha256, leaves))
+            plan[name] = jobs
+
+        results = {}
+        for name, jobs in plan.items():
+            files = [{
+                'path': os.path.relpath(path, artifacts[name]) if os.path.isdir(artifacts[name]) else path,
+                'size': size,
+                'sha256': sha256.result(),
+                'blake2b_tree': blake2b_root([leaf.result() for leaf in leaves]),
+            } for path, size, sha256, leaves in jobs]
+            results[name] = summarize(artifacts[name], files)
+
+    return results
+
+
+def summarize(root: str, files: List[Dict]) -> Dict:
+    """A file's digests, or directory digests (SHA-256 and plain BLAKE2b) over its sorted
+    (path, sha256) manifest"""
+    if os.path.isfile(root):
+        return {'path': root, 'chunk_size': CHUNK_SIZE, **{k: v for k, v in files[0].items() if k != 'path'}}
+
+    manifest = ''.join(f"{entry['path']}\0{entry['sha256']}\n" for entry in files).encode()
+    return {
+        'path': root,
+        'size': sum(entry['size'] for entry in files),
+        'file_count': len(files),
+        'sha256': hashlib.sha256(manifest).hexdigest(),
+        'blake2b_manifest': hashlib.blake2b(manifest, digest_size=DIGEST_SIZE).hexdigest(),
+        'chunk_size': CHUNK_SIZE,
+        'files': files,
+    }
+
+
+def without_file_lists(fingerprints: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Fingerprints suitable for release history (directory file lists dropped)"""
+    return {name: {k: v for k, v in details.items() if k != 'files'} for name, details in fingerprints.items()}
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if not args:
+        print("Usage: python artifact_fingerprint.py <file-or-directory>... [--files]")
+        sys.exit(1)
+
+    fingerprints = fingerprint_paths({os.path.basename(os.path.normpath(path)): path for path in args})
+    if '--files' not in sys.argv:
+        fingerprints = without_file_lists(fingerprints)
+    print(json.dumps(fingerprints, indent=2))
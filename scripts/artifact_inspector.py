@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Artifact Inspector
+Reads the zip central directory of APK, AAB and IPA files through mmap (no extraction)
+and attributes compressed/uncompressed bytes to Flutter components
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+EOCD_SIGNATURE = b'PK\x05\x06'
+ZIP64_LOCATOR_SIGNATURE = b'PK\x06\x07'
+ZIP64_EOCD_SIGNATURE = b'PK\x06\x06'
+CENTRAL_HEADER_SIGNATURE = b'PK\x01\x02'
+CENTRAL_HEADER = struct.Struct('<4s6H3L5H2L')
+EOCD = struct.Struct('<4s4H2LH')
+ZIP64_EOCD = struct.Struct('<4sQ2H2L4Q')
+ZIP64_LOCATOR = struct.Struct('<4sLQL')
+
+ABI_PATTERN = re.compile(r'(?:^|/)lib/(arm64-v8a|armeabi-v7a|x86_64|x86)/([^/]+)$')
+FONT_EXTENSIONS = ('.ttf', '.otf', '.woff', '.woff2')
+
+
+class ZipEntry(NamedTuple):
+    name: str
+    compressed_size: int
+    uncompressed_size: int
+
+
+def _zip64_sizes(extra: bytes, compressed: int, uncompressed: int) -> Tuple[int, int]:
+    """Resolve 0xFFFFFFFF sizes from the zip64 extended information extra field"""
+    offset = 0
+    while offset + 4 <= len(extra):
+        header_id, size = struct.unpack_from('<HH', extra, offset)
+        if header_id == 0x0001:
+            fields = extra[offset + 4:offset + 4 + size]
+            position = 0
+            if uncompressed == 0xFFFFFFFF:
+                uncompressed = struct.unpack_from('<Q', fields, position)[0]
+                position += 8
+            if compressed == 0xFFFFFFFF:
+                compressed = struct.unpack_from('<Q', fields, position)[0]
+            break
+        offset += 4 + size
+    return compressed, uncompressed
+
+
+def iter_entries(path: str) -> Iterator[ZipEntry]:
+    """Yield every entry of the central directory without touching file data"""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        # The end-of-central-directory record sits within the last 64 KB + 22 bytes
+        eocd_offset = data.rfind(EOCD_SIGNATURE, max(0, len(data) - 65557))
+        if eocd_offset < 0:
+            raise ValueError(f"Not a zip archive: {path}")
+
+        _, _, _, _, total_entries, cd_size, cd_offset, _ = EOCD.unpack_from(data, eocd_offset)
+
+        locator_offset = eocd_offset - ZIP64_LOCATOR.size
+        if locator_offset >= 0 and data[locator_offset:locator_offset + 4] == ZIP64_LOCATOR_SIGNATURE:
+            _, _, zip64_eocd_offset, _ = ZIP64_LOCATOR.unpack_from(data, locator_offset)
+            if data[zip64_eocd_offset:zip64_eocd_offset + 4] == ZIP64_EOCD_SIGNATURE:
+                fields = ZIP64_EOCD.unpack_from(data, zip64_eocd_offset)
+                total_entries, cd_size, cd_offset = fields[7], fields[8], fields[9]
+
+        position = cd_offset
+        for _ in range(total_entries):
+            header = CENTRAL_HEADER.unpack_from(data, position)
+            if header[0] != CENTRAL_HEADER_SIGNATURE:
+                raise ValueError(f"Corrupt central directory in {path} at offset {position}")
+
+            compressed, uncompressed = header[8], header[9]
+            name_length, extra_length, comment_length = header[10], header[11], header[12]
+            name_start = position + CENTRAL_HEADER.size
+            name = data[name_start:name_start + name_length].decode('utf-8', errors='replace')
+
+            if compressed == 0xFFFFFFFF or uncompressed == 0xFFFFFFFF:
+                extra = data[name_start + name_length:name_start + name_length + extra_length]
+                compressed, uncompressed = _zip64_sizes(extra, compressed, uncompressed)
+
+            if not name.endswith('/'):
+                yield ZipEntry(name, compressed, uncompressed)
+            position = name_start + name_length + extra_length + comment_length
+
+
+def artifact_type(path: str) -> str:
+    return os.path.splitext(path)[1].lstrip('.').lower() or 'zip'
+
+
+def classify_entry(name: str) -> str:
+    """Attribute a zip entry to a Flutter component"""
+    abi_match = ABI_PATTERN.search(name)
+    if abi_match:
+        abi, library = abi_match.groups()
+        if library == 'libapp.so':
+            return f'dart_aot/{abi}'
+        if library == 'libflutter.so':
+            return f'flutter_engine/{abi}'
+        return f'native_libs/{abi}'
+
+    if '/App.framework/App' in name or name.endswith('App.framework/App'):
+        return 'dart_aot/ios'
+    if '/Flutter.framework/Flutter' in name:
+        return 'flutter_engine/ios'
+    if 'flutter_assets/' in name:
+        if name.lower().endswith(FONT_EXTENSIONS) or '/fonts/' in name:
+            return 'fonts'
+        if name.endswith(('NOTICES.Z', 'NOTICES')):
+            return 'licenses'
+        if name.endswith(('AssetManifest.json', 'AssetManifest.bin', 'FontManifest.json')):
+            return 'asset_manifests'
+        if '/shaders/' in name:
+            return 'shaders'
+        return 'assets'
+    if name.lower().endswith(FONT_EXTENSIONS):
+        return 'fonts'
+    if name.endswith('.dex'):
+        return 'dex'
+    if '/Frameworks/' in name and '.framework/' in name:
+        return 'frameworks'
+    if name.endswith(('resources.arsc', 'resources.pb')) or '/res/' in name or name.startswith('res/'):
+        return 'resources'
+    if name.startswith('META-INF/') or '/META-INF/' in name or '_CodeSignature/' in name:
+        return 'signing'
+    return 'other'
+
+
+def inspect_artifact(path: str, top: int = 10) -> Dict:
+    """Per-component compressed/uncompressed totals plus the largest entries"""
+    components: Dict[str, Dict[str, int]] = {}
+    largest: List[ZipEntry] = []
+    totals = {'compressed': 0, 'uncompressed': 0, 'entries': 0}
+
+    for entry in iter_entries(path):
+        component = components.setdefault(classify_entry(entry.name),
+                                           {'compressed': 0, 'uncompressed': 0, 'entries': 0})
+        component['compressed'] += entry.compressed_size
+        component['uncompressed'] += entry.uncompressed_size
+        component['entries'] += 1
+        totals['compressed'] += entry.compressed_size
+        totals['uncompressed'] += entry.uncompressed_size
+        totals['entries'] += 1
+
+        if len(largest) < top or entry.compressed_size > largest[-1].compressed_size:
+            largest.append(entry)
+            largest.sort(key=lambda e: -e.compressed_size)
+            del largest[top:]
+
+    return {
+        'artifact': os.path.basename(path),
+        'type': artifact_type(path),
+        'file_size': os.path.getsize(path),
+        'totals': totals,
+        'components': dict(sorted(components.items(), key=lambda item: -item[1]['compressed'])),
+        'largest_entries': [entry._asdict() for entry in largest],
+    }
+
+
+def format_size(size: int) -> str:
+    if size >= 1048576:
+        return f"{size / 1048576:.2f} MB"
+    if size >= 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size} B"
+
+
+def print_report(report: Dict):
+    print("\n" + "="*72)
+    print(f"🔍 ARTIFACT INSPECTION: {report['artifact']} ({report['type'].upper()})")
+    print("="*72)
+    print(f"📏 File size: {format_size(report['file_size'])} "
+          f"({report['totals']['entries']} entries, "
+          f"{format_size(report['totals']['uncompressed'])} uncompressed)")
+    print(f"\n{'component':<28}{'compressed':>14}{'uncompressed':>16}{'share':>9}")
+    print("-"*72)
+    total = report['totals']['compressed'] or 1
+    for name, sizes in report['components'].items():
+        print(f"{name:<28}{format_size(sizes['compressed']):>14}"
+              f"{format_size(sizes['uncompressed']):>16}{sizes['compressed'] / total:>9.1%}")
+    print("\n🔝 Largest entries:")
+    for entry in report['largest_entries']:
+        print(f"   {format_size(entry['compressed_size']):>12}  {entry['name']}")
+    print("="*72 + "\n")
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if not args:
+        print("Usage: python artifact_inspector.py <artifact.apk|aab|ipa>... [--json]")
+        sys.exit(1)
+
+    reports = [inspect_artifact(path) for path in args]
+    if '--json' in sys.argv:
+        print(json.dumps(reports if len(reports) > 1 else reports[0], indent=2))
+    else:
+        for report in reports:
+            print_report(report)
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Artifact Store
+Keeps release artifacts as SHA-256 named blobs so identical files across releases are stored once,
+with per-release manifests, reflink/hardlink ingest and age/size based eviction
+"""
+
+import argparse
+import json
+import os
+import shutil
+import stat
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from artifact_fingerprint import fingerprint_paths
+
+DEFAULT_STORE_DIR = '.artifact_store'
+FICLONE = 0x40049409  # Linux ioctl for copy-on-write clones (btrfs, XFS, overlayfs on CoW fs)
+# Unreferenced blobs younger than this are left alone: they may belong to an ingest whose manifest
+# is not written yet (the store lock covers this where fcntl exists)
+GC_GRACE_SECONDS = 3600
+
+
+def reflink(source: str, target: str) -> bool:
+    """Copy-on-write clone; returns False when the filesystem does not support it"""
+    if fcntl is None:
+        return False
+    try:
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        if os.path.exists(target):
+            os.remove(target)
+        return False
+
+
+def place_file(source: str, target: str, mode: str) -> str:
+    """Materialise source at target via reflink or hardlink, falling back to a copy"""
+    if mode == 'reflink' and reflink(source, target):
+        return 'reflink'
+    if mode == 'hardlink':
+        try:
+            os.link(source, target)
+            return 'hardlink'
+        except OSError:
+            pass
+    shutil.copy2(source, target)
+    return 'copy'
+
+
+def make_read_only(path: str):
+    mode = os.stat(path).st_mode
+    os.chmod(path, mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+
+class ArtifactStore:
+    def __init__(self, root: Optional[str] = None, link_mode: Optional[str] = None):
+        self.root = root or os.getenv('ARTIFACT_STORE_DIR', DEFAULT_STORE_DIR)
+        # Hardlinks share inodes with build/, so blobs are made read-only: an in-place write to the
+        # build output then fails instead of silently changing the stored release
+        self.link_mode = link_mode or os.getenv('ARTIFACT_STORE_LINK_MODE', 'reflink')
+        self.blobs_dir = os.path.join(self.root, 'blobs')
+        self.manifests_dir = os.path.join(self.root, 'manifests')
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.blobs_dir, digest[:2], digest[2:])
+
+    def manifest_path(self, platform: str, version: str, build_number: str) -> str:
+        return os.path.join(self.manifests_dir, f"{platform}-v{version}+{build_number}.json")
+
+    @contextmanager
+    def lock(self, exclusive: bool):
+        """Ingests share the store lock; garbage collection takes it exclusively"""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, '.lock'), 'w') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+
+    def ingest_file(self, source: str, digest: str, stats: Dict[str, int]):
+        """Store one file under its digest unless an identical blob already exists"""
+        target = self.blob_path(digest)
+        size = os.path.getsize(source)
+        if os.path.exists(target):
+            stats['deduplicated'] += 1
+            stats['bytes_saved'] += size
+            return
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temporary = f"{target}.{os.getpid()}.tmp"
+        method = place_file(source, temporary, self.link_mode)
+        make_read_only(temporary)
+        os.replace(temporary, target)
+        stats[method] += 1
+        stats['bytes_stored'] += size
+
+    def ingest_release(self, platform: str, version: str, build_number: str, commit: str,
+                       artifacts: Dict[str, str], fingerprints: Optional[Dict[str, Dict]] = None) -> Dict:
+        """Store named artifacts (files or directories) and write the release manifest"""
+        fingerprints = fingerprints or fingerprint_paths(artifacts)
+        with self.lock(exclusive=False):
+            return self._ingest(platform, version, build_number, commit, artifacts, fingerprints)
+
+    def _ingest(self, platform: str, version: str, build_number: str, commit: str,
+                artifacts: Dict[str, str], fingerprints: Dict[str, Dict]) -> Dict:
+        stats = {'reflink': 0, 'hardlink': 0, 'copy': 0, 'deduplicated': 0,
+                 'bytes_stored': 0, 'bytes_saved': 0}
+        manifest_artifacts = {}
+
+        for name, source in artifacts.items():
+            details = fingerprints[name]
+            if os.path.isdir(source):
+                for entry in details['files']:
+                    self.ingest_file(os.path.join(source, entry['path']), entry['sha256'], stats)
+                manifest_artifacts[name] = {
+                    'type': 'directory', 'sha256': details['sha256'], 'size': details['size'],
+                    'files': [{k: entry[k] for k in ('path', 'sha256', 'size')} for entry in details['files']],
+                }
+            else:
+                self.ingest_file(source, details['sha256'], stats)
+                manifest_artifacts[name] = {
+                    'type': 'file', 'sha256': details['sha256'], 'size': details['size'],
+                    'filename': os.path.basename(source),
+                }
+
+        now = datetime.now().isoformat()
+        manifest = {
+            'platform': platform,
+            'version': version,
+            'build_number': str(build_number),
+            'commit': commit,
+            'created_at': now,
+            'last_accessed': now,
+            'artifacts': manifest_artifacts,
+        }
+        self.write_manifest(manifest)
+        return stats
+
+    def write_manifest(self, manifest: Dict):
+        path = self.manifest_path(manifest['platform'], manifest['version'], manifest['build_number'])
+        os.makedirs(self.manifests_dir, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temporary, path)
+
+    def load_manifest(self, platform: str, version: str, build_number: Optional[str] = None) -> Dict:
+        """Direct lookup by release key; without a build number the newest build of the version wins"""
+        if build_number is not None:
+            path = self.manifest_path(platform, version, build_number)
+        else:
+            prefix = f"{platform}-v{version}+"
+            builds = [name[len(prefix):-len('.json')] for name in os.listdir(self.manifests_dir)
+                      if name.startswith(prefix)] if os.path.isdir(self.manifests_dir) else []
+            if not builds:
+                raise FileNotFoundError(f"No stored artifacts for {platform} v{version}")
+            newest = max(builds, key=lambda build: (build.isdigit(), int(build) if build.isdigit() else 0, build))
+            path = self.manifest_path(platform, version, newest)
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def restore_file(self, digest: str, target: str):
+        """Restored files are independent copies (reflinked where possible), never links to a blob"""
+        mode = 'reflink' if self.link_mode == 'reflink' else 'copy'
+        place_file(self.blob_path(digest), target, mode)
+        os.chmod(target, os.stat(target).st_mode | stat.S_IWUSR)
+
+    def restore(self, platform: str, version: str, destination: str,
+                build_number: Optional[str] = None) -> List[str]:
+        """Materialise a past release's artifacts into destination"""
+        manifest = self.load_manifest(platform, version, build_number)
+        restored = []
+
+        for name, details in manifest['artifacts'].items():
+            if details['type'] == 'directory':
+                for entry in details['files']:
+                    target = os.path.join(destination, name, entry['path'])
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    self.restore_file(entry['sha256'], target)
+                restored.append(os.path.join(destination, name))
+            else:
+                target = os.path.join(destination, details['filename'])
+                os.makedirs(destination, exist_ok=True)
+                self.restore_file(details['sha256'], target)
+                restored.append(target)
+
+        manifest['last_accessed'] = datetime.now().isoformat()
+        self.write_manifest(manifest)
+        return restored
+
+    def manifests(self) -> List[Dict]:
+        if not os.path.isdir(self.manifests_dir):
+            return []
+        loaded = []
+        for name in os.listdir(self.manifests_dir):
+            if name.endswith('.json'):
+                with open(os.path.join(self.manifests_dir, name), 'r') as f:
+                    loaded.append({**json.load(f), '_path': os.path.join(self.manifests_dir, name)})
+        return loaded
+
+    def referenced_digests(self, manifests: List[Dict]) -> Set[str]:
+        digests = set()
+        for manifest in manifests:
+            for details in manifest['artifacts'].values():
+                if details['type'] == 'directory':
+                    digests.update(entry['sha256'] for entry in details['files'])
+                else:
+                    digests.add(details['sha256'])
+        return digests
+
+    def exclusive_bytes(self, manifests: List[Dict], others: List[Dict]) -> int:
+        """Blob bytes referenced by manifests but by none of the others"""
+        exclusive = self.referenced_digests(manifests) - self.referenced_digests(others)
+        return sum(os.path.getsize(self.blob_path(d)) for d in exclusive if os.path.exists(self.blob_path(d)))
+
+    def store_size(self) -> int:
+        total = 0
+        for root, _, files in os.walk(self.blobs_dir):
+            total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+        return total
+
+    def evict(self, max_age_days: Optional[float] = None, max_bytes: Optional[int] = None) -> Dict:
+        """Drop releases older than max_age_days, then least recently used ones until under max_bytes"""
+        with self.lock(exclusive=True):
+            return self._evict(max_age_days, max_bytes)
+
+    def _evict(self, max_age_days: Optional[float], max_bytes: Optional[int]) -> Dict:
+        manifests = sorted(self.manifests(), key=lambda m: m['last_accessed'])
+        evicted = []
+
+        if max_age_days is not None:
+            cutoff = datetime.fromtimestamp(time.time() - max_age_days * 86400).isoformat()
+            evicted = [m for m in manifests if m['last_accessed'] < cutoff]
+            manifests = [m for m in manifests if m['last_accessed'] >= cutoff]
+
+        if max_bytes is not None:
+            size = self.store_size() - self.exclusive_bytes(evicted, manifests)
+            while manifests and size > max_bytes:
+                oldest = manifests.pop(0)
+                size -= self.exclusive_bytes([oldest], manifests)
+                evicted.append(oldest)
+
+        for manifest in evicted:
+            os.remove(manifest['_path'])
+
+        removed_blobs, freed = self.collect_garbage(self.referenced_digests(manifests))
+        return {'releases_evicted': len(evicted), 'blobs_removed': removed_blobs, 'bytes_freed': freed}
+
+    def collect_garbage(self, keep: Set[str], grace_seconds: float = GC_GRACE_SECONDS) -> Tuple[int, int]:
+        """Delete blobs no manifest references, except temporary files and blobs added within the grace period"""
+        removed, freed = 0, 0
+        if not os.path.isdir(self.blobs_dir):
+            return removed, freed
+        cutoff = time.time() - grace_seconds
+        for prefix in os.listdir(self.blobs_dir):
+            directory = os.path.join(self.blobs_dir, prefix)
+            for name in os.listdir(directory):
+                if prefix + name in keep or name.endswith('.tmp'):
+                    continue
+                path = os.path.join(directory, name)
+                info = os.stat(path)
+                # ctime changes when a hardlink is made, so it dates hardlinked blobs to their ingest
+                if max(info.st_mtime, info.st_ctime) > cutoff:
+                    continue
+                freed += info.st_size
+                os.remove(path)
+                removed += 1
+        return removed, freed
+
+
+def format_size(size: int) -> str:
+    if size >= 1048576:
+        return f"{size / 1048576:.2f} MB"
+    if size >= 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size} B"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Content-addressed release artifact store')
+    parser.add_argument('--store', help=f'store directory (ARTIFACT_STORE_DIR, default {DEFAULT_STORE_DIR})')
+    parser.add_argument('--link-mode', choices=('reflink', 'hardlink', 'copy'))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = subparsers.add_parser('ingest', help='store artifacts for a release')
+    ingest_parser.add_argument('platform')
+    ingest_parser.add_argument('version')
+    ingest_parser.add_argument('build_number')
+    ingest_parser.add_argument('paths', nargs='+', help='artifact files or directories')
+    ingest_parser.add_argument('--commit', default='unknown')
+
+    restore_parser = subparsers.add_parser('restore', help="materialise a past release's artifacts")
+    restore_parser.add_argument('platform')
+    restore_parser.add_argument('version')
+    restore_parser.add_argument('destination')
+    restore_parser.add_argument('--build')
+
+    evict_parser = subparsers.add_parser('evict', help='remove old or least recently used releases')
+    evict_parser.add_argument('--max-age-days', type=float)
+    evict_parser.add_argument('--max-bytes', type=int)
+
+    subparsers.add_parser('list', help='list stored releases')
+
+    args = parser.parse_args(argv)
+    store = ArtifactStore(args.store, args.link_mode)
+
+    if args.command == 'ingest':
+        artifacts = {os.path.basename(os.path.normpath(path)): path for path in args.paths}
+        stats = store.ingest_release(args.platform, args.version, args.build_number, args.commit, artifacts)
+        print(f"✅ Stored {args.platform} v{args.version}+{args.build_number}: "
+              f"{format_size(stats['bytes_stored'])} new, {format_size(stats['bytes_saved'])} deduplicated")
+    elif args.command == 'restore':
+        for path in store.restore(args.platform, args.version, args.destination, args.build):
+            print(f"✅ Restored {path}")
+    elif args.command == 'evict':
+        result = store.evict(args.max_age_days, args.max_bytes)
+        print(f"✅ Evicted {result['releases_evicted']} releases, removed {result['blobs_removed']} blobs "
+              f"({format_size(result['bytes_freed'])})")
+    else:
+        for manifest in sorted(store.manifests(), key=lambda m: m['created_at']):
+            total = sum(details['size'] for details in manifest['artifacts'].values())
+            print(f"{manifest['platform']:<8} v{manifest['version']}+{manifest['build_number']:<8} "
+                  f"{format_size(total):>12}  last used {manifest['last_accessed']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Release Script Benchmarks
+Times the release automation against synthetic repositories and compares with a stored baseline
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List, Optional
+from unittest import mock
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(SCRIPTS_DIR, 'benchmark_baseline.json')
+# Wall-time growth below this is scheduler/timer noise for millisecond-scale benchmarks
+MIN_DELTA_MS = 10.0
+
+BENCHMARKS = [
+    'apply_environment_config',
+    'apply_all_configs',
+    'generate_changelog',
+    'log_metadata',
+    'run_all_tasks',
+]
+
+
+class SyntheticRepo:
+    """Builds a throwaway git repository that looks like a large Flutter app"""
+
+    def __init__(self, root: str, commits: int, tags: int, dependencies: int, history_entries: int):
+        self.root = root
+        self.commits = commits
+        self.tags = tags
+        self.dependencies = dependencies
+        self.history_entries = history_entries
+
+    def build(self):
+        """Create fixtures, commit history, tags, history logs and a local origin"""
+        os.makedirs(self.root, exist_ok=True)
+        self.git('init', '-q', '-b', 'main')
+        self.git('config', 'user.email', 'bench@example.com')
+        self.git('config', 'user.name', 'Benchmark')
+
+        subprocess.run(['git', 'fast-import', '--quiet'], cwd=self.root, check=True,
+                       input=self.fast_import_stream())
+        self.git('checkout', '-q', '-f', 'main')
+
+        origin = self.root + '-origin.git'
+        subprocess.run(['git', 'init', '-q', '--bare', origin], check=True)
+        self.git('remote', 'add', 'origin', origin)
+
+        self.write_release_history()
+
+    def git(self, *args: str):
+        subprocess.run(['git', *args], cwd=self.root, check=True)
+
+    def fixtures(self) -> Dict[str, str]:
+        """Large versions of every file the release scripts read or rewrite"""
+        deps = '\n'.join(f'  package_{i}: ^{i % 9}.{i % 7}.{i % 5}' for i in range(self.dependencies))
+        gradle_body = '\n'.join(f'    implementation("com.example:lib{i}:1.0.{i}")'
+                                for i in range(self.dependencies * 4))
+        manifest_activities = '\n'.join(f'        <activity android:name=".Activity{i}" android:exported="false"/>'
+                                        for i in range(self.dependencies * 2))
+        plist_entries = '\n'.join(f'\t<key>CustomKey{i}</key>\n\t<string>value-{i}</string>'
+                                  for i in range(self.dependencies * 4))
+        manifest = f'''<manifest xmlns:android="http://schemas.android.com/apk/res/android" package="com.example.flutter.projects">
+    <application android:label="bench">
+{manifest_activities}
+    </application>
+</manifest>
+'''
+        return {
+            'pubspec.yaml': f'name: flutter_projects\nversion: 1.0.0+1\n\ndependencies:\n{deps}\n',
+            'android/app/build.gradle.kts': (
+                'android {\n    defaultConfig {\n        applicationId = "com.example.flutter.projects"\n'
+                f'    }}\n}}\n\ndependencies {{\n{gradle_body}\n}}\n'
+            ),
+            'android/app/src/main/AndroidManifest.xml': manifest,
+            'android/app/src/debug/AndroidManifest.xml': manifest,
+            'android/app/src/profile/AndroidManifest.xml': manifest,
+            'ios/Runner/Info.plist': (
+                '<?xml version="1.0" encoding="UTF-8"?>\n<plist version="1.0">\n<dict>\n'
+                '\t<key>CFBundleIdentifier</key>\n\t<string>com.example.flutter.projects</string>\n'
+                f'{plist_entries}\n</dict>\n</plist>\n'
+            ),
+            **{f'config/templates/android/google-services-{env}.json': json.dumps({'env': env})
+               for env in ('dev', 'stg', 'prod')},
+            **{f'config/templates/ios/GoogleService-Info-{env}.plist': f'<plist><string>{env}</string></plist>'
+               for env in ('dev', 'stg', 'prod')},
+        }
+
+    def fast_import_stream(self) -> bytes:
+        """Generate the whole history as one git fast-import stream"""
+        out = io.BytesIO()
+
+        def data(payload: str):
+            encoded = payload.encode()
+            out.write(b'data %d\n' % len(encoded) + encoded + b'\n')
+
+        tag_marks = {max(1, (self.commits * (k + 1)) // (self.tags + 1)): k for k in range(self.tags)}
+        timestamp = 1_600_000_000
+
+        for i in range(1, self.commits + 1):
+            out.write(b'commit refs/heads/main\nmark :%d\n' % i)
+            out.write(b'committer Benchmark <bench@example.com> %d +0000\n' % (timestamp + i * 60))
+            data(f'feat: synthetic change {i}')
+            if i > 1:
+                out.write(b'from :%d\n' % (i - 1))
+            files = self.fixtures() if i == 1 else {f'lib/src/module_{i % 97}.dart': f'// change {i}\n'}
+            for path, content in files.items():
+                out.write(f'M 644 inline {path}\n'.encode())
+                data(content)
+
+        for mark, k in sorted(tag_marks.items()):
+            out.write(f'tag release-android-v1.{k}.0\nfrom :{mark}\n'.encode())
+            out.write(b'tagger Benchmark <bench@example.com> %d +0000\n' % (timestamp + mark * 60))
+            data(f'ANDROID release v1.{k}.0')
+
+        out.write(b'done\n')
+        return out.getvalue()
+
+    def write_release_history(self):
+        """Pre-populate the release history so log_metadata works on a large file"""
+        os.makedirs(os.path.join(self.root, 'logs'), exist_ok=True)
+        history = [{
+            'timestamp': f'2024-01-01T00:00:{i % 60:02d}',
+            'platform': 'android' if i % 2 else 'ios',
+            'version': f'1.{i}.0',
+            'build_number': str(i),
+            'commit_hash': f'{i:040x}',
+            'branch_name': 'main',
+            'triggered_by': 'benchmark',
+            'status': 'success'
+        } for i in range(self.history_entries)]
+
+        with open(os.path.join(self.root, 'logs', 'release_history.json'), 'w') as f:
+            json.dump(history, f, indent=2)
+
+
+class SubprocessCounter:
+    """Counts every process spawned through the subprocess module"""
+
+    def __init__(self):
+        self.count = 0
+        self.original = subprocess.Popen
+
+    def __enter__(self):
+        counter = self
+
+        class CountingPopen(self.original):
+            def __init__(self, *args, **kwargs):
+                counter.count += 1
+                super().__init__(*args, **kwargs)
+
+        subprocess.Popen = CountingPopen
+        return self
+
+    def __exit__(self, *exc):
+        subprocess.Popen = self.original
+
+
+def peak_rss_kb() -> Dict[str, int]:
+    """Peak resident set size of this process and its reaped children, in KB"""
+    scale = 1024 if platform.system() == 'Darwin' else 1
+    return {
+        'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale,
+        'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale,
+    }
+
+
+def benchmark_target(name: str, iteration: int) -> Callable[[], object]:
+    """Build the callable for one benchmark iteration (runs inside the repo)"""
+    if name == 'apply_environment_config':
+        from environment_manager import EnvironmentManager
+        return lambda: EnvironmentManager().apply_environment_config()
+
+    if name == 'apply_all_configs':
+        from config_manager import ConfigManager
+        return lambda: ConfigManager('dev').apply_all_configs()
+
+    from post_deployment import PostDeploymentAutomation
+    automation = PostDeploymentAutomation('android', f'9.{iteration}.0', str(iteration), 'production')
+    if name == 'generate_changelog':
+        return automation.generate_changelog
+    if name == 'log_metadata':
+        return automation.log_metadata
+    return automation.run_all_tasks
+
+
+def run_benchmark(name: str, repo_root: str, repeat: int) -> Dict:
+    """Run one benchmark in the current (fresh) process and collect its metrics"""
+    os.chdir(repo_root)
+    sys.path.insert(0, SCRIPTS_DIR)
+    os.environ['SLACK_WEBHOOK_URL'] = 'http://127.0.0.1:9/benchmark'
+
+    import requests
+    stub_response = mock.Mock(status_code=200)
+    stub_response.json.return_value = {}
+
+    timings = []
+    subprocesses = 0
+    with mock.patch.object(requests, 'request', return_value=stub_response), \
+            redirect_stdout(io.StringIO()):
+        for iteration in range(repeat):
+            target = benchmark_target(name, iteration)
+            with SubprocessCounter() as counter:
+                started = time.perf_counter()
+                target()
+                timings.append(time.perf_counter() - started)
+            subprocesses = max(subprocesses, counter.count)
+
+    rss = peak_rss_kb()
+    return {
+        'wall_time_s': statistics.median(timings),
+        'subprocesses': subprocesses,
+        'peak_rss_kb': rss['self'],
+        'peak_child_rss_kb': rss['children'],
+    }
+
+
+def run_suite(names: List[str], commits: int, tags: int, dependencies: int,
+              history_entries: int, repeat: int) -> Dict[str, Dict]:
+    """Build a fresh synthetic repository per benchmark and measure it in a clean process"""
+    context = multiprocessing.get_context('spawn')
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix='release-bench-') as workdir:
+        template = os.path.join(workdir, 'template')
+        print(f"🏗️  Building synthetic repo: {commits} commits, {tags} tags, {dependencies} dependencies")
+        started = time.perf_counter()
+        SyntheticRepo(template, commits, tags, dependencies, history_entries).build()
+        print(f"   Built in {time.perf_counter() - started:.2f}s")
+
+        for name in names:
+            repo_root = os.path.join(workdir, name)
+            shutil.copytree(template, repo_root, symlinks=True)
+            subprocess.run(['git', 'remote', 'set-url', 'origin', template + '-origin.git'],
+                           cwd=repo_root, check=True)
+
+            with context.Pool(1) as pool:
+                results[name] = pool.apply(run_benchmark, (name, repo_root, repeat))
+            print(f"⏱️  {name}: {results[name]['wall_time_s'] * 1000:.1f} ms")
+
+    return results
+
+
+def compare_with_baseline(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float,
+                          min_delta_ms: float = MIN_DELTA_MS) -> bool:
+    """Print a comparison table and return False when any metric regressed beyond tolerance;
+    wall-time growth smaller than min_delta_ms is timer noise and never counts as a regression"""
+    print("\n" + "="*78)
+    print("📊 BENCHMARK RESULTS")
+    print("="*78)
+    print(f"{'benchmark':<26}{'wall (ms)':>14}{'subprocs':>10}{'rss (MB)':>10}{'vs baseline':>18}")
+    print("-"*78)
+
+    ok = True
+    for name, metrics in results.items():
+        previous = baseline.get(name)
+        verdict = "(no baseline)"
+        if previous:
+            growth = metrics['wall_time_s'] - previous['wall_time_s']
+            delta = growth / max(previous['wall_time_s'], 1e-9)
+            verdict = f"{delta:+.1%}"
+            slower = delta > tolerance and growth * 1000 >= min_delta_ms
+            regressed = slower or metrics['subprocesses'] > previous['subprocesses']
+            if regressed:
+                verdict = f"❌ {verdict}"
+                ok = False
+            else:
+                verdict = f"✅ {verdict}"
+
+        print(f"{name:<26}{metrics['wall_time_s'] * 1000:>14.1f}{metrics['subprocesses']:>10}"
+              f"{metrics['peak_rss_kb'] / 1024:>10.1f}{verdict:>18}")
+
+    print("="*78 + "\n")
+    return ok
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--commits', type=int, default=5000, help='commits in the synthetic repo')
+    parser.add_argument('--tags', type=int, default=200, help='release tags in the synthetic repo')
+    parser.add_argument('--dependencies', type=int, default=500, help='scale of pubspec/Gradle/manifest/plist fixtures')
+    parser.add_argument('--history', type=int, default=20000, help='existing release history entries')
+    parser.add_argument('--repeat', type=int, default=3, help='iterations per benchmark (median is reported)')
+    parser.add_argument('--only', action='append', choices=BENCHMARKS, help='run only these benchmarks')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed wall-time regression (0.2 = 20%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=MIN_DELTA_MS,
+                        help='ignore wall-time growth below this many milliseconds')
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.only or BENCHMARKS, args.commits, args.tags,
+                        args.dependencies, args.history, args.repeat)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f).get('results', {})
+
+    ok = compare_with_baseline(results, baseline, args.tolerance, args.min_delta_ms)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'parameters': {k: getattr(args, k) for k in ('commits', 'tags', 'dependencies', 'history', 'repeat')},
+                'results': results
+            }, f, indent=2)
+        print(f"✅ Baseline saved: {args.baseline}")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Branch Classifier
+Maps Git branch names to environments using the rules in config/branch_environments.yaml,
+compiled into a single regular expression. The bulk mode classifies every local and remote
+branch at once and writes build_config/branch_environments.json for CI jobs without git
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import yaml
+
+RULES_FILE = 'config/branch_environments.yaml'
+LOOKUP_FILE = 'build_config/branch_environments.json'
+
+# Used when config/branch_environments.yaml is missing
+DEFAULT_CONFIG = {
+    'environments': {
+        'production': {'short': 'prod'},
+        'staging': {'short': 'stg'},
+        'development': {'short': 'dev'},
+    },
+    'rules': [
+        {'environment': 'production', 'branches': ['main'], 'prefixes': ['release/']},
+        {'environment': 'staging', 'branches': ['development', 'develop', 'dev'], 'prefixes': ['qa/']},
+        {'environment': 'development', 'prefixes': ['feature/', 'feat/', 'fix/', 'hotfix/', 'bugfix/']},
+    ],
+    'default': 'development',
+}
+
+
+class BranchClassifier:
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or DEFAULT_CONFIG
+        self.short_names = {name: (details or {}).get('short', name)
+                            for name, details in config['environments'].items()}
+        self.aliases = {}
+        for name, short in self.short_names.items():
+            self.aliases[name.lower()] = name
+            self.aliases[short.lower()] = name
+        self.default = self.normalize(config['default'])
+        self.rule_environments = [self.normalize(rule['environment']) for rule in config['rules']]
+        self.pattern = self.compile(config['rules'])
+
+    @staticmethod
+    def compile(rules: List[Dict]):
+        """One alternation per rule, in rule order, so the leftmost matching rule wins"""
+        alternatives = []
+        for index, rule in enumerate(rules):
+            options = [f"{re.escape(branch.lower())}$" for branch in rule.get('branches', [])]
+            options += [re.escape(prefix.lower()) for prefix in rule.get('prefixes', [])]
+            if options:
+                alternatives.append(f"(?P<r{index}>{'|'.join(options)})")
+        return re.compile('|'.join(alternatives)) if alternatives else None
+
+    def classify(self, branch: str) -> str:
+        """Long environment name for a branch"""
+        match = self.pattern.match(branch.strip().lower()) if self.pattern else None
+        if not match:
+            return self.default
+        return self.rule_environments[int(match.lastgroup[1:])]
+
+    def normalize(self, environment: str) -> str:
+        """Long environment name for a long or short name (dev, staging, PROD, ...)"""
+        try:
+            return self.aliases[environment.strip().lower()]
+        except KeyError:
+            raise ValueError(f"Unknown environment '{environment}' "
+                             f"(expected one of {', '.join(sorted(self.aliases))})") from None
+
+    def short_name(self, environment: str) -> str:
+        return self.short_names[self.normalize(environment)]
+
+    def classify_all(self, branches: List[str]) -> Dict[str, str]:
+        return {branch: self.classify(branch) for branch in branches}
+
+
+def load_classifier(rules_file: str = RULES_FILE) -> BranchClassifier:
+    if os.path.exists(rules_file):
+        with open(rules_file, 'r') as f:
+            return BranchClassifier(yaml.safe_load(f))
+    return BranchClassifier()
+
+
+_classifiers: Dict[str, BranchClassifier] = {}
+
+
+def get_classifier(project_root: Optional[str] = None) -> BranchClassifier:
+    """Classifier for a project's rules file (default: the current directory), compiled once per project"""
+    root = os.path.realpath(project_root or os.getcwd())
+    if root not in _classifiers:
+        _classifiers[root] = load_classifier(os.path.join(root, RULES_FILE))
+    return _classifiers[root]
+
+
+def classify_branch(branch: str, project_root: Optional[str] = None) -> str:
+    return get_classifier(project_root).classify(branch)
+
+
+def normalize_environment(environment: str, project_root: Optional[str] = None) -> str:
+    return get_classifier(project_root).normalize(environment)
+
+
+def short_environment(environment: str, project_root: Optional[str] = None) -> str:
+    return get_classifier(project_root).short_name(environment)
+
+
+def list_branches() -> List[str]:
+    """Local and remote branch names, with remote names stripped (origin/qa/x -> qa/x)"""
+    output = subprocess.check_output([
+        'git', 'for-each-ref', '--format=%(refname)', 'refs/heads', 'refs/remotes'
+    ]).decode()
+    branches = set()
+    for ref in output.splitlines():
+        if ref.startswith('refs/heads/'):
+            branches.add(ref[len('refs/heads/'):])
+        elif ref.startswith('refs/remotes/'):
+            remote_branch = ref[len('refs/remotes/'):].split('/', 1)
+            if len(remote_branch) == 2 and remote_branch[1] != 'HEAD':
+                branches.add(remote_branch[1])
+    return sorted(branches)
+
+
+def write_lookup(classifier: BranchClassifier, branches: List[str], path: str = LOOKUP_FILE) -> Dict:
+    lookup = {
+        'generated_at': datetime.now().isoformat(),
+        'default': classifier.default,
+        'short_names': classifier.short_names,
+        'branches': classifier.classify_all(branches),
+    }
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w') as f:
+        json.dump(lookup, f, indent=2, sort_keys=True)
+    os.replace(temporary, path)
+    return lookup
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Classify Git branches into environments')
+    parser.add_argument('branches', nargs='*', help='branch names to classify (default: current branch)')
+    parser.add_argument('--all', action='store_true',
+                        help=f'classify every local and remote branch and write {LOOKUP_FILE}')
+    parser.add_argument('--output', default=LOOKUP_FILE, help='lookup map path for --all')
+    parser.add_argument('--short', action='store_true', help='print short names (dev/stg/prod)')
+    parser.add_argument('--rules', default=RULES_FILE, help='rules file')
+    args = parser.parse_args(argv)
+
+    classifier = load_classifier(args.rules)
+
+    if args.all:
+        lookup = write_lookup(classifier, list_branches(), args.output)
+        counts: Dict[str, int] = {}
+        for environment in lookup['branches'].values():
+            counts[environment] = counts.get(environment, 0) + 1
+        summary = ', '.join(f"{count} {environment}" for environment, count in sorted(counts.items()))
+        print(f"✅ Classified {len(lookup['branches'])} branches ({summary or 'none'}) → {args.output}")
+        return 0
+
+    branches = args.branches or [
+        subprocess.check_output(['git', 'rev-parse', '--abbrev-ref', 'HEAD']).decode().strip()
+    ]
+    for branch in branches:
+        environment = classifier.classify(branch)
+        if args.short:
+            environment = classifier.short_name(environment)
+        print(environment if len(branches) == 1 else f"{branch}\t{environment}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
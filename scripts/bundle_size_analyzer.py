@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Bundle Size Analyzer
+Parses Flutter --analyze-size JSON, aggregates sizes per package, library and asset,
+and diffs builds against the per-version size history
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+SIZE_HISTORY_DIR = 'logs/bundle_size'
+# flutter names analysis files after the build target; web builds do not support --analyze-size
+PLATFORM_ANALYSIS_PREFIXES = {'android': ('apk', 'aab'), 'ios': ('ios',)}
+CATEGORIES = ('packages', 'libraries', 'assets', 'other')
+
+
+def iter_leaves(path: str) -> Iterator[Tuple[Tuple[str, ...], int]]:
+    """Yield (node path, size) for every leaf of a code-size-analysis tree"""
+    with open(path, 'rb') as f:
+        if ijson is not None:
+            yield from _iter_leaves_streaming(f)
+        else:
+            yield from _iter_leaves_loaded(json.load(f))
+
+
+def _iter_leaves_streaming(f) -> Iterator[Tuple[Tuple[str, ...], int]]:
+    """Event-driven walk that never materialises the tree"""
+    stack: List[Dict] = []
+    for prefix, event, value in ijson.parse(f):
+        if event == 'start_map':
+            stack.append({'n': None, 'value': None, 'children': False})
+        elif event == 'end_map':
+            node = stack.pop()
+            if node['value'] is not None and not node['children']:
+                yield tuple(frame['n'] or '' for frame in stack) + (node['n'] or '',), int(node['value'])
+        elif not stack:
+            continue
+        elif event == 'start_array' and prefix.endswith('children'):
+            stack[-1]['children'] = True
+        elif event == 'string' and (prefix == 'n' or prefix.endswith('.n')):
+            stack[-1]['n'] = value
+        elif event == 'number' and (prefix == 'value' or prefix.endswith('.value')):
+            stack[-1]['value'] = value
+
+
+def _iter_leaves_loaded(root: Dict) -> Iterator[Tuple[Tuple[str, ...], int]]:
+    """Iterative walk of an already-parsed tree (used when ijson is unavailable)"""
+    pending = [(root, ())]
+    while pending:
+        node, parents = pending.pop()
+        path = parents + (node.get('n', ''),)
+        children = node.get('children')
+        if children:
+            pending.extend((child, path) for child in reversed(children))
+        elif 'value' in node:
+            yield path, int(node['value'])
+
+
+def classify(path: Tuple[str, ...]) -> Tuple[str, str]:
+    """Map a leaf path to (category, key) for aggregation"""
+    for index, segment in enumerate(path):
+        if segment.startswith(('package:', 'dart:')):
+            library_parts = [segment]
+            for part in path[index + 1:]:
+                library_parts.append(part)
+                if part.endswith('.dart'):
+                    break
+            return 'dart', '/'.join(library_parts)
+        if segment == 'flutter_assets':
+            return 'assets', '/'.join(path[index + 1:]) or segment
+
+    return 'other', '/'.join(path[1:4]) or path[0]
+
+
+def package_of(library: str) -> str:
+    """'package:flutter/src/widgets/framework.dart' -> 'flutter', 'dart:core/...' -> 'dart:core'"""
+    head = library.split('/', 1)[0]
+    return head[len('package:'):] if head.startswith('package:') else head
+
+
+def analyze(path: str) -> Dict:
+    """Aggregate one --analyze-size JSON file into a size summary"""
+    summary = {category: {} for category in CATEGORIES}
+    total = 0
+
+    for leaf_path, size in iter_leaves(path):
+        total += size
+        category, key = classify(leaf_path)
+        if category == 'dart':
+            bucket = summary['libraries']
+            bucket[key] = bucket.get(key, 0) + size
+            package = package_of(key)
+            summary['packages'][package] = summary['packages'].get(package, 0) + size
+        else:
+            bucket = summary[category]
+            bucket[key] = bucket.get(key, 0) + size
+
+    with open(path, 'rb') as f:
+        head = f.read(256).decode('utf-8', errors='ignore')
+    build_type = 'unknown'
+    if '"type"' in head:
+        build_type = head.split('"type"', 1)[1].split('"')[1]
+
+    return {'type': build_type, 'total': total, 'source': os.path.abspath(path), **summary}
+
+
+def find_latest_analysis(platform: Optional[str] = None) -> Optional[str]:
+    """Locate the most recent *-code-size-analysis_*.json written by flutter (optionally for one platform)"""
+    candidates = []
+    for pattern in ('~/.flutter-devtools/*-code-size-analysis_*.json', 'build/**/*-code-size-analysis_*.json'):
+        candidates.extend(glob.glob(os.path.expanduser(pattern), recursive=True))
+    if platform:
+        prefixes = tuple(f"{prefix}-" for prefix in PLATFORM_ANALYSIS_PREFIXES.get(platform, ()))
+        candidates = [path for path in candidates if os.path.basename(path).startswith(prefixes)] if prefixes else []
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+def history_path(version: str, platform: str) -> str:
+    return os.path.join(SIZE_HISTORY_DIR, f"v{version}-{platform}.json")
+
+
+def save_summary(summary: Dict, version: str, platform: str) -> str:
+    """Store a summary next to the release history, keyed by version and platform"""
+    os.makedirs(SIZE_HISTORY_DIR, exist_ok=True)
+    record = {'version': version, 'platform': platform,
+              'created_at': datetime.now().isoformat(), **summary}
+    target = history_path(version, platform)
+    with open(target, 'w') as f:
+        json.dump(record, f, indent=2, sort_keys=True)
+    return target
+
+
+def load_summary(reference: str) -> Dict:
+    """Load a summary from a stored history entry ('1.2.0:android'), summary file or raw analysis file"""
+    if ':' in reference and not os.path.exists(reference):
+        version, platform = reference.rsplit(':', 1)
+        reference = history_path(version, platform)
+
+    with open(reference, 'r') as f:
+        head = f.read(4096)
+    if '"packages"' in head and '"total"' in head:
+        with open(reference, 'r') as f:
+            return json.load(f)
+    return analyze(reference)
+
+
+def diff_summaries(old: Dict, new: Dict) -> Dict[str, List[Tuple[str, int, int, int]]]:
+    """Ranked (name, old, new, delta) rows per category, largest absolute change first"""
+    result = {}
+    for category in CATEGORIES:
+        before, after = old.get(category, {}), new.get(category, {})
+        rows = []
+        for key in before.keys() | after.keys():
+            delta = after.get(key, 0) - before.get(key, 0)
+            if delta:
+                rows.append((key, before.get(key, 0), after.get(key, 0), delta))
+        rows.sort(key=lambda row: (-abs(row[3]), row[0]))
+        result[category] = rows
+    return result
+
+
+def format_size(size: int) -> str:
+    sign = '-' if size < 0 else ''
+    size = abs(size)
+    if size >= 1048576:
+        return f"{sign}{size / 1048576:.2f} MB"
+    if size >= 1024:
+        return f"{sign}{size / 1024:.1f} KB"
+    return f"{sign}{size} B"
+
+
+def print_summary(summary: Dict, top: int):
+    print("\n" + "="*60)
+    print(f"📦 CODE SIZE ANALYSIS ({summary['type'].upper()})")
+    print("="*60)
+    print(f"📏 Total: {format_size(summary['total'])}")
+    for category in ('packages', 'assets', 'other'):
+        ranked = sorted(summary[category].items(), key=lambda item: -item[1])[:top]
+        if ranked:
+            print(f"\n🔝 Largest {category}:")
+            for name, size in ranked:
+                print(f"   {format_size(size):>12}  {name}")
+    print("="*60 + "\n")
+
+
+def print_diff(old: Dict, new: Dict, top: int):
+    delta = new['total'] - old['total']
+    percent = (delta / old['total'] * 100) if old['total'] else 0.0
+    print("\n" + "="*60)
+    print("📊 CODE SIZE DIFF")
+    print("="*60)
+    print(f"📏 Total: {format_size(old['total'])} → {format_size(new['total'])} "
+          f"({'+' if delta >= 0 else ''}{format_size(delta)}, {percent:+.2f}%)")
+
+    for category, rows in diff_summaries(old, new).items():
+        if not rows:
+            continue
+        print(f"\n{'📈' if rows[0][3] > 0 else '📉'} {category.capitalize()} ({len(rows)} changed):")
+        for name, before, after, change in rows[:top]:
+            marker = '+' if change > 0 else ''
+            status = ' (new)' if not before else ' (removed)' if not after else ''
+            print(f"   {marker + format_size(change):>13}  {name}{status}")
+    print("="*60 + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Flutter --analyze-size JSON analyzer')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    analyze_parser = subparsers.add_parser('analyze', help='summarise one analysis file')
+    analyze_parser.add_argument('file', nargs='?', help='analysis JSON (defaults to the latest one)')
+    analyze_parser.add_argument('--version', help='store the summary for this version')
+    analyze_parser.add_argument('--platform', help='platform for the stored summary (android, ios, web)')
+    analyze_parser.add_argument('--top', type=int, default=15)
+
+    diff_parser = subparsers.add_parser('diff', help='rank what grew between two builds')
+    diff_parser.add_argument('old', help="analysis file, summary file or 'version:platform'")
+    diff_parser.add_argument('new', help="analysis file, summary file or 'version:platform'")
+    diff_parser.add_argument('--top', type=int, default=20)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'analyze':
+        source = args.file or find_latest_analysis(args.platform)
+        if not source:
+            print("❌ No *-code-size-analysis_*.json found. Build with --analyze-size first.")
+            return 1
+        summary = analyze(source)
+        print_summary(summary, args.top)
+        if args.version and args.platform:
+            print(f"✅ Size summary stored: {save_summary(summary, args.version, args.platform)}")
+        return 0
+
+    print_diff(load_summary(args.old), load_summary(args.new), args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,29 +4,40 @@ Configuration Manager for Multi-Environment Setup
 Automatically copies the correct configuration files based on environment
 """
 
+import filecmp
 import os
 import shutil
 import json
 from pathlib import Path
 
+from branch_classifier import classify_branch, short_environment
+from release_metrics import FILES, write_textfile
+
 class ConfigManager:
-    def __init__(self, environment: str = None):
-        self.environment = environment or self.determine_environment()
-        self.project_root = Path.cwd()
+    def __init__(self, environment: str = None, project_root: str = None):
+        self.project_root = Path(project_root) if project_root else Path.cwd()
+        # Templates use short names; accept long ones too (EnvironmentManager passes 'development')
+        self.environment = (short_environment(environment, str(self.project_root)) if environment
+                            else self.determine_environment())
         self.config_templates = self.project_root / "config" / "templates"
         
+    def copy_if_changed(self, source_file: Path, target_file: Path) -> bool:
+        """Copy unless the target already matches, so unchanged configs keep their mtime"""
+        if target_file.exists() and filecmp.cmp(source_file, target_file, shallow=False):
+            FILES.inc(script='config_manager', result='skipped')
+            return False
+        shutil.copy2(source_file, target_file)
+        FILES.inc(script='config_manager', result='rewritten')
+        return True
+
     def determine_environment(self) -> str:
-        """Determine environment based on branch name"""
+        """Determine environment based on branch name (rules in config/branch_environments.yaml)"""
         try:
             import subprocess
-            branch = subprocess.check_output(['git', 'rev-parse', '--abbrev-ref', 'HEAD']).decode().strip()
-            
-            if branch.startswith('release/') or branch == 'main':
-                return 'prod'
-            elif branch in ['development', 'develop', 'dev'] or branch.startswith('qa/'):
-                return 'stg'
-            else:
-                return 'dev'
+            branch = subprocess.check_output(
+                ['git', 'rev-parse', '--abbrev-ref', 'HEAD'], cwd=self.project_root
+            ).decode().strip()
+            return short_environment(classify_branch(branch, str(self.project_root)), str(self.project_root))
         except:
             return 'dev'
     
@@ -40,7 +51,7 @@ class ConfigManager:
             target_file.parent.mkdir(parents=True, exist_ok=True)
             
             # Copy the file
-            shutil.copy2(source_file, target_file)
+            self.copy_if_changed(source_file, target_file)
             print(f"✅ Copied Android config: {source_file.name} → google-services.json")
         else:
             print(f"⚠️ Android config template not found: {source_file}")
@@ -56,7 +67,7 @@ class ConfigManager:
             target_file.parent.mkdir(parents=True, exist_ok=True)
             
             # Copy the file
-            shutil.copy2(source_file, target_file)
+            self.copy_if_changed(source_file, target_file)
             print(f"✅ Copied iOS config: {source_file.name} → GoogleService-Info.plist")
         else:
             print(f"⚠️ iOS config template not found: {source_file}")
@@ -76,8 +87,13 @@ class ConfigManager:
         build_config_dir.mkdir(exist_ok=True)
         
         # Write environment info
-        with open(build_config_dir / "config_environment.json", 'w') as f:
-            json.dump(env_info, f, indent=2)
+        info_file = build_config_dir / "config_environment.json"
+        content = json.dumps(env_info, indent=2)
+        if info_file.exists() and info_file.read_text() == content:
+            FILES.inc(script='config_manager', result='skipped')
+        else:
+            info_file.write_text(content)
+            FILES.inc(script='config_manager', result='rewritten')
         
         print(f"✅ Created config environment info: build_config/config_environment.json")
     
@@ -135,3 +151,4 @@ if __name__ == "__main__":
     environment = sys.argv[1] if len(sys.argv) > 1 else None
     manager = ConfigManager(environment)
     manager.apply_all_configs()
+    write_textfile()
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Coverage Delta
+Streams coverage/lcov.info and reports coverage of the lines changed since the previous release tag,
+per file and in total. Parsed coverage is cached per commit, so releases can be compared without
+their lcov files
+"""
+
+import argparse
+import base64
+import json
+import os
+import subprocess
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from file_cache import file_sha256
+from git_objects import CommitCache, resolve_commits
+from release_metrics import git_timer
+
+LCOV_FILE = 'coverage/lcov.info'
+PARSER_VERSION = '1'
+GENERATED_SUFFIXES = ('.g.dart', '.freezed.dart', '.gr.dart')
+# Line states in a file's coverage map (one byte per source line)
+NOT_INSTRUMENTED, MISSED, HIT = 0, 1, 2
+MERGE_TABLE = bytes([NOT_INSTRUMENTED, MISSED, HIT, HIT]) + bytes(252)
+# Below this size one process parses faster than a pool can start
+PARALLEL_BYTES = 32 * 1024 * 1024
+
+Coverage = Dict[str, bytearray]
+
+
+def normalize_path(path: str, root: str) -> str:
+    path = path.strip()
+    if os.path.isabs(path):
+        path = os.path.relpath(path, root)
+    return path.replace(os.sep, '/')
+
+
+def _parse_segment(path: str, start: int, end: int, root: str) -> Dict[str, bytearray]:
+    """Coverage maps of the records between two byte offsets (runs in a worker process for large files)"""
+    files: Dict[str, bytearray] = {}
+    current: Optional[bytearray] = None
+    position = start
+    with open(path, 'rb') as f:
+        f.seek(start)
+        for line in f:
+            if position >= end:
+                break
+            position += len(line)
+            if line.startswith(b'DA:'):
+                if current is None:
+                    continue
+                # DA:<line>,<hits>[,<checksum>]
+                number, hits = line[3:].split(b',', 2)[:2]
+                number = int(number)
+                state = HIT if int(hits) > 0 else MISSED
+                if number >= len(current):
+                    current.extend(bytes(number + 1 - len(current)))
+                if state > current[number]:
+                    current[number] = state
+            elif line.startswith(b'SF:'):
+                source = normalize_path(line[3:].decode('utf-8', errors='replace'), root)
+                current = files.setdefault(source, bytearray())
+            elif line.startswith(b'end_of_record'):
+                current = None
+    return files
+
+
+def merge_maps(first: bytearray, second: bytearray) -> bytearray:
+    """Line-wise maximum of two coverage maps, computed on whole integers instead of byte by byte"""
+    length = max(len(first), len(second))
+    combined = (int.from_bytes(first.ljust(length, b'\0'), 'big') |
+                int.from_bytes(second.ljust(length, b'\0'), 'big'))
+    # MISSED | HIT sets both bits; a line hit in either map is hit
+    return bytearray(combined.to_bytes(length, 'big')).translate(MERGE_TABLE)
+
+
+def segments(path: str, count: int) -> List[Tuple[int, int]]:
+    """Byte ranges of roughly equal size that each start at an SF: record"""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as f:
+        for index in range(1, count):
+            f.seek(max(size * index // count, bounds[-1]))
+            f.readline()
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line or line.startswith(b'SF:'):
+                    break
+            if offset > bounds[-1]:
+                bounds.append(offset)
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def parse_lcov(path: str, root: Optional[str] = None, max_workers: Optional[int] = None) -> Coverage:
+    """{source file: coverage map} read line by line. Memory grows with the number of source lines,
+    not with the file size; repeated records of a file (one per test run) are merged, and large files
+    are split at record boundaries and parsed in a process pool"""
+    root = os.path.abspath(root or os.getcwd())
+    workers = max_workers or os.cpu_count() or 1
+    if workers < 2 or os.path.getsize(path) < PARALLEL_BYTES:
+        return _parse_segment(path, 0, os.path.getsize(path), root)
+
+    ranges = segments(path, workers)
+    files: Coverage = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for partial in executor.map(_parse_segment, [path] * len(ranges), [start for start, _ in ranges],
+                                    [end for _, end in ranges], [root] * len(ranges)):
+            for source, lines in partial.items():
+                files[source] = merge_maps(files[source], lines) if source in files else lines
+    return files
+
+
+def totals(coverage_map: bytearray) -> Tuple[int, int]:
+    """(instrumented lines, hit lines)"""
+    hit = coverage_map.count(HIT)
+    return coverage_map.count(MISSED) + hit, hit
+
+
+def encode(coverage: Coverage) -> Dict[str, str]:
+    return {path: base64.b64encode(zlib.compress(bytes(lines), 9)).decode() for path, lines in coverage.items()}
+
+
+def decode(encoded: Dict[str, str]) -> Coverage:
+    return {path: bytearray(zlib.decompress(base64.b64decode(data))) for path, data in encoded.items()}
+
+
+def working_tree_clean() -> bool:
+    """True when tracked files match HEAD, so a fresh lcov file describes the HEAD commit"""
+    with git_timer('diff'):
+        return subprocess.run(['git', 'diff', '--quiet', 'HEAD', '--'], stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL).returncode == 0
+
+
+def load_coverage(commit: Optional[str], lcov: Optional[str], cache: CommitCache, store: bool = True,
+                  max_workers: Optional[int] = None) -> Optional[Coverage]:
+    """Coverage for a commit: from the cache when the lcov file is absent or unchanged, otherwise parsed
+    and (when store is set) cached under the commit"""
+    cached = cache.get(commit) if commit else None
+    if lcov is None or not os.path.exists(lcov):
+        return decode(cached['files']) if cached else None
+
+    sha256 = file_sha256(lcov)
+    if cached and cached['lcov_sha256'] == sha256:
+        return decode(cached['files'])
+    coverage = parse_lcov(lcov, max_workers=max_workers)
+    if commit and store:
+        cache.put(commit, {'lcov_sha256': sha256, 'files': encode(coverage)})
+    return coverage
+
+
+def previous_release_tag(head: str = 'HEAD', platform: Optional[str] = None) -> Optional[str]:
+    """Newest release tag before head (a release commit is compared with the release before it)"""
+    pattern = f"release-{platform}-*" if platform else 'release-*'
+    try:
+        with git_timer('describe'):
+            return subprocess.check_output(['git', 'describe', '--tags', '--abbrev=0', '--match', pattern,
+                                            f"{head}^"], stderr=subprocess.DEVNULL).decode().strip() or None
+    except subprocess.CalledProcessError:
+        return None
+
+
+def changed_lines(base: str, head: Optional[str] = None) -> Dict[str, List[Tuple[int, int]]]:
+    """{path: [(first line, line count)]} added or modified since base, from `git diff -U0`
+    (head None compares with the working tree)"""
+    command = ['git', 'diff', '-U0', '--no-color', '--no-ext-diff', '--diff-filter=AMR', base]
+    if head:
+        command.append(head)
+    changes: Dict[str, List[Tuple[int, int]]] = {}
+    ranges: Optional[List[Tuple[int, int]]] = None
+    with git_timer('diff'):
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        for raw in process.stdout:
+            if raw.startswith(b'+++ '):
+                target = raw[4:].rstrip(b'\n').decode('utf-8', errors='replace')
+                ranges = changes.setdefault(target[2:], []) if target.startswith('b/') else None
+            elif raw.startswith(b'@@ ') and ranges is not None:
+                # @@ -<old>[,<count>] +<new>[,<count>] @@
+                new = raw.split(b' ', 3)[2][1:]
+                start, _, count = new.partition(b',')
+                count = int(count) if count else 1
+                if count:
+                    ranges.append((int(start), count))
+        process.stdout.close()
+        if process.wait() != 0:
+            raise ValueError(f"git diff against {base} failed")
+    return {path: spans for path, spans in changes.items() if spans}
+
+
+def format_ranges(lines: List[int]) -> str:
+    """'12-15, 40' for [12, 13, 14, 15, 40]"""
+    spans = []
+    for number in lines:
+        if spans and number == spans[-1][1] + 1:
+            spans[-1][1] = number
+        else:
+            spans.append([number, number])
+    return ', '.join(str(start) if start == end else f"{start}-{end}" for start, end in spans)
+
+
+def percent(hit: int, found: int) -> Optional[float]:
+    return round(hit / found * 100, 1) if found else None
+
+
+def delta_report(changes: Dict[str, List[Tuple[int, int]]], coverage: Coverage,
+                 base_coverage: Optional[Coverage] = None) -> Dict:
+    """Per changed file: file coverage now (and at base) plus coverage of its changed lines"""
+    rows = []
+    untested = []
+    for path in sorted(changes):
+        lines = coverage.get(path)
+        if lines is None:
+            if path.startswith('lib/') and path.endswith('.dart') and not path.endswith(GENERATED_SUFFIXES):
+                untested.append(path)
+            continue
+        covered, missed = [], []
+        for start, count in changes[path]:
+            for number in range(start, min(start + count, len(lines))):
+                if lines[number] == HIT:
+                    covered.append(number)
+                elif lines[number] == MISSED:
+                    missed.append(number)
+        found, hit = totals(lines)
+        row = {'file': path, 'coverage': percent(hit, found), 'lines_found': found, 'lines_hit': hit,
+               'changed_lines': sum(count for _, count in changes[path]),
+               'changed_found': len(covered) + len(missed), 'changed_hit': len(covered),
+               'changed_coverage': percent(len(covered), len(covered) + len(missed)),
+               'uncovered': format_ranges(missed)}
+        if base_coverage is not None:
+            base_lines = base_coverage.get(path)
+            base_found, base_hit = totals(base_lines) if base_lines is not None else (0, 0)
+            row['base_coverage'] = percent(base_hit, base_found)
+        rows.append(row)
+
+    changed_found = sum(row['changed_found'] for row in rows)
+    changed_hit = sum(row['changed_hit'] for row in rows)
+    found, hit = map(sum, zip(*(totals(lines) for lines in coverage.values()))) if coverage else (0, 0)
+    summary = {'changed_found': changed_found, 'changed_hit': changed_hit,
+               'changed_coverage': percent(changed_hit, changed_found),
+               'coverage': percent(hit, found), 'lines_found': found, 'lines_hit': hit}
+    if base_coverage:
+        base_found, base_hit = map(sum, zip(*(totals(lines) for lines in base_coverage.values())))
+        summary['base_coverage'] = percent(base_hit, base_found)
+    return {'files': rows, 'untested': untested, 'summary': summary}
+
+
+def _percent(value: Optional[float]) -> str:
+    return '-' if value is None else f"{value:.1f}%"
+
+
+def print_report(report: Dict, base: str, head: str):
+    summary = report['summary']
+    print("\n" + "="*72)
+    print(f"🧪 CHANGED-LINE COVERAGE: {base}..{head}")
+    print("="*72)
+    for row in report['files']:
+        if not row['changed_found']:
+            continue
+        icon = "✅" if not row['uncovered'] else "⚠️"
+        trend = f" (was {_percent(row['base_coverage'])})" if row.get('base_coverage') is not None else ''
+        print(f"{icon} {row['file']}")
+        print(f"   changed: {row['changed_hit']}/{row['changed_found']} lines covered "
+              f"({_percent(row['changed_coverage'])}) | file: {_percent(row['coverage'])}{trend}")
+        if row['uncovered']:
+            print(f"   uncovered: {row['uncovered']}")
+    if report['untested']:
+        print(f"\n❌ Changed files no test loads ({len(report['untested'])}):")
+        for path in report['untested']:
+            print(f"   - {path}")
+    print("-"*72)
+    trend = f" (was {_percent(summary['base_coverage'])} at {base})" if summary.get('base_coverage') is not None else ''
+    print(f"Overall: {summary['lines_hit']}/{summary['lines_found']} lines ({_percent(summary['coverage'])}){trend}")
+    print(f"Changed lines: {summary['changed_hit']}/{summary['changed_found']} covered "
+          f"({_percent(summary['changed_coverage'])})")
+    print("="*72 + "\n")
+
+
+def markdown_report(report: Dict, base: str) -> str:
+    summary = report['summary']
+    lines = [f"**Changed-line coverage since {base}: {_percent(summary['changed_coverage'])}** "
+             f"({summary['changed_hit']}/{summary['changed_found']} lines), overall {_percent(summary['coverage'])}",
+             "",
+             "| File | Changed lines | Coverage | Uncovered |",
+             "|------|---------------|----------|-----------|"]
+    for row in report['files']:
+        if row['changed_found']:
+            lines.append(f"| {row['file']} | {row['changed_hit']}/{row['changed_found']} "
+                         f"({_percent(row['changed_coverage'])}) | {_percent(row['coverage'])} | "
+                         f"{row['uncovered'] or '-'} |")
+    for path in report['untested']:
+        lines.append(f"| {path} | not loaded by any test | - | - |")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Coverage of the lines changed since the previous release')
+    parser.add_argument('--lcov', help=f'lcov file from flutter test --coverage (default: {LCOV_FILE} '
+                                       'unless --head is given)')
+    parser.add_argument('--base', help='revision to diff against (default: the previous release tag)')
+    parser.add_argument('--head', help='revision the coverage belongs to (default: the working tree); '
+                                       'coverage cached for a release is used without an lcov file')
+    parser.add_argument('--platform', help="only consider release-<platform>-* tags for the default base")
+    parser.add_argument('--workers', type=int, help='processes for parsing large lcov files')
+    parser.add_argument('--min-coverage', type=float, help='fail when changed-line coverage is below this percent')
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--json', action='store_true', help='print the report as JSON')
+    output.add_argument('--markdown', action='store_true', help='print a pull request / release notes summary')
+    args = parser.parse_args(argv)
+
+    base = args.base or previous_release_tag(args.head or 'HEAD', args.platform)
+    if not base:
+        print("ℹ️  No previous release tag found; pass --base to choose a revision")
+        return 0
+
+    commits = resolve_commits([base, args.head or 'HEAD'])
+    if commits[base] is None or commits[args.head or 'HEAD'] is None:
+        print(f"❌ Unknown revision: {base if commits[base] is None else args.head}")
+        return 1
+
+    cache = CommitCache('coverage_delta', PARSER_VERSION, max_entries=50)
+    head_commit = commits[args.head or 'HEAD']
+    # The default lcov file describes the working tree, which is HEAD only when nothing is modified;
+    # --head without --lcov reads coverage cached for that commit
+    lcov = args.lcov or (None if args.head else LCOV_FILE)
+    store = bool(args.head and args.lcov) or (lcov is not None and working_tree_clean())
+    coverage = load_coverage(head_commit, lcov, cache, store, args.workers)
+    base_coverage = load_coverage(commits[base], None, cache)
+    cache.save()
+    if coverage is None:
+        print(f"❌ No coverage for {args.head}" if lcov is None
+              else f"❌ No coverage: run flutter test --coverage to create {lcov}")
+        return 1
+
+    try:
+        changes = changed_lines(base, args.head)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    report = delta_report(changes, coverage, base_coverage)
+
+    if args.json:
+        print(json.dumps({'base': base, 'head': args.head or 'working tree', **report}, indent=2))
+    elif args.markdown:
+        print(markdown_report(report, base))
+    else:
+        print_report(report, base, args.head or 'working tree')
+
+    changed_coverage = report['summary']['changed_coverage']
+    if args.min_coverage is not None and changed_coverage is not None and changed_coverage < args.min_coverage:
+        print(f"❌ Changed-line coverage {changed_coverage:.1f}% is below {args.min_coverage:.1f}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
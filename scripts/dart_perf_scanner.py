@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+Dart Performance Scanner
+Tokenizes .dart files (comments and string contents stripped) and applies a pluggable set of rules for
+runtime-cost patterns the analyzer does not catch, rescanning only files whose content changed
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from file_cache import FileHashCache
+
+# Bump when tokenizer or rule behaviour changes so cached findings are discarded
+SCANNER_VERSION = '1'
+DEFAULT_PATHS = ['lib']
+GENERATED_SUFFIXES = ('.g.dart', '.freezed.dart', '.gr.dart', '.config.dart')
+# Below this many files a process pool costs more than it saves
+PARALLEL_THRESHOLD = 48
+IGNORE_RE = re.compile(r'perf-ignore:\s*([\w\-, ]+)')
+CALLBACK_RE = re.compile(r'on[A-Z]')
+
+Token = Tuple[str, str, int]  # (kind, text, line)
+
+TOKEN_RE = re.compile(r'''
+    (?P<space>[ \t\r\f\v]+)
+  | (?P<newline>\n)
+  | (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*)
+  | (?P<string>r?(?:\'\'\'|"""|\'|"))
+  | (?P<number>0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<ident>[A-Za-z_$][A-Za-z0-9_$]*)
+  | (?P<op>=>|\?\.|\.\.\.\??|\?\?=?|\.\.|[-+*/%&|^<>=!~]=?|[(){}\[\],;:.?@\#])
+''', re.VERBOSE)
+
+
+def skip_block_comment(source: str, pos: int) -> int:
+    """End of a (nestable) block comment starting at pos"""
+    depth = 0
+    while pos < len(source):
+        if source.startswith('/*', pos):
+            depth += 1
+            pos += 2
+        elif source.startswith('*/', pos):
+            depth -= 1
+            pos += 2
+            if not depth:
+                return pos
+        else:
+            pos += 1
+    return pos
+
+
+def skip_string(source: str, pos: int, quote: str, raw: bool) -> Tuple[int, bool]:
+    """End of a string literal whose contents start at pos, and whether it interpolates"""
+    interpolated = False
+    special = re.compile('|'.join(re.escape(c) for c in ([quote, '\n'] + ([] if raw else ['\\', '$']))))
+    while True:
+        match = special.search(source, pos)
+        if not match:
+            return len(source), interpolated
+        pos = match.start()
+        text = match.group()
+        if text == quote:
+            return pos + len(quote), interpolated
+        if text == '\n':
+            if len(quote) == 1:
+                return pos, interpolated
+            pos += 1
+        elif text == '\\':
+            pos += 2
+        elif source.startswith('${', pos):
+            interpolated = True
+            pos = skip_interpolation(source, pos + 2)
+        else:
+            interpolated = interpolated or bool(re.match(r'\$[A-Za-z_]', source[pos:pos + 2]))
+            pos += 1
+
+
+def skip_interpolation(source: str, pos: int) -> int:
+    """End of a ${...} expression, which may contain braces and nested strings"""
+    depth = 1
+    while pos < len(source) and depth:
+        char = source[pos]
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+        elif char in '\'"':
+            quote = source[pos:pos + 3] if source[pos:pos + 3] in ("'''", '"""') else char
+            raw = pos > 0 and source[pos - 1] == 'r'
+            pos, _ = skip_string(source, pos + len(quote), quote, raw)
+            continue
+        pos += 1
+    return pos
+
+
+def tokenize(source: str) -> Tuple[List[Token], Dict[int, Set[str]]]:
+    """Code tokens plus the rules suppressed per line by // perf-ignore: comments.
+
+    Strings become a single 'string' token (or 'istring' when interpolated); comments are dropped.
+    """
+    tokens: List[Token] = []
+    ignores: Dict[int, Set[str]] = {}
+    pos, line = 0, 1
+    while pos < len(source):
+        match = TOKEN_RE.match(source, pos)
+        if not match:
+            pos += 1
+            continue
+        kind = match.lastgroup
+        end = match.end()
+        if kind == 'newline':
+            line += 1
+        elif kind == 'line_comment':
+            ignored = IGNORE_RE.search(match.group())
+            if ignored:
+                ignores.setdefault(line, set()).update(r.strip() for r in ignored.group(1).split(','))
+        elif kind == 'block_comment':
+            end = skip_block_comment(source, pos)
+            line += source.count('\n', pos, end)
+        elif kind == 'string':
+            text = match.group()
+            raw = text.startswith('r')
+            end, interpolated = skip_string(source, end, text.lstrip('r'), raw)
+            tokens.append(('istring' if interpolated else 'string', source[pos:end], line))
+            line += source.count('\n', pos, end)
+        elif kind != 'space':
+            tokens.append((kind, match.group(), line))
+        pos = end
+    return tokens, ignores
+
+
+class DartFile:
+    """Token stream with bracket matching and the structural queries rules share"""
+
+    def __init__(self, path: str, source: str):
+        self.path = path
+        self.tokens, self.ignores = tokenize(source)
+        self.match: Dict[int, int] = {}
+        stack = []
+        for index, (kind, text, _) in enumerate(self.tokens):
+            if kind != 'op':
+                continue
+            if text in '([{':
+                stack.append(index)
+            elif text in ')]}' and stack:
+                opening = stack.pop()
+                self.match[opening] = index
+                self.match[index] = opening
+        self._build_ranges = None
+        self._build_phase = None
+
+    def text(self, index: int) -> str:
+        return self.tokens[index][1] if 0 <= index < len(self.tokens) else ''
+
+    def line(self, index: int) -> int:
+        return self.tokens[index][2]
+
+    def expression_end(self, index: int) -> int:
+        """Index of the ',', ';' or closing bracket that ends the expression starting at index"""
+        while index < len(self.tokens):
+            text = self.text(index)
+            if text in ('(', '[', '{'):
+                index = self.match.get(index, index)
+            elif text in (',', ';', ')', ']', '}'):
+                return index
+            index += 1
+        return index
+
+    def named_argument(self, open_paren: int, name: str) -> Optional[int]:
+        """Index of the value of a top-level named argument in the call opened at open_paren"""
+        index = open_paren + 1
+        close = self.match.get(open_paren, len(self.tokens))
+        while index < close:
+            if self.text(index) == name and self.text(index + 1) == ':':
+                return index + 2
+            index = self.expression_end(index) + 1
+        return None
+
+    def call_paren(self, index: int) -> int:
+        """Index just past a constructor name at index (Name, Name.named, Name<T>): its '(' for calls"""
+        index += 3 if self.text(index + 1) == '.' else 1
+        if self.text(index) == '<':
+            depth = 0
+            while index < len(self.tokens):
+                depth += {'<': 1, '>': -1}.get(self.text(index), 0)
+                index += 1
+                if not depth:
+                    break
+        return index
+
+    def build_ranges(self) -> List[Tuple[int, int]]:
+        """Bodies of methods returning Widget (build and _build* helpers) that run on every rebuild"""
+        if self._build_ranges is not None:
+            return self._build_ranges
+        ranges = []
+        for index in range(len(self.tokens) - 2):
+            if self.text(index) != 'Widget' or self.tokens[index + 1][0] != 'ident' or self.text(index + 2) != '(':
+                continue
+            after = self.match.get(index + 2, index + 2) + 1
+            if self.text(after) == '{':
+                ranges.append((after, self.match.get(after, after)))
+            elif self.text(after) == '=>':
+                ranges.append((after, self.expression_end(after + 1)))
+        self._build_ranges = ranges
+        return ranges
+
+    def callback_ranges(self) -> Dict[int, int]:
+        """Event handler arguments (onPressed:, onTap:, ...) that do not run during build, start -> end"""
+        return {index: self.expression_end(index + 2)
+                for index, (kind, text, _) in enumerate(self.tokens)
+                if kind == 'ident' and CALLBACK_RE.match(text) and self.text(index + 1) == ':'}
+
+    def build_phase_indices(self) -> List[int]:
+        """Token indices that execute while building widgets"""
+        if self._build_phase is None:
+            callbacks = self.callback_ranges()
+            self._build_phase = []
+            for start, end in self.build_ranges():
+                index = start
+                while index < end:
+                    if index in callbacks:
+                        index = callbacks[index]
+                        continue
+                    self._build_phase.append(index)
+                    index += 1
+        return self._build_phase
+
+    def closure_results(self, start: int) -> List[int]:
+        """Start indices of the values a function literal starting at start returns"""
+        index = self.match.get(start, start) + 1 if self.text(start) == '(' else start
+        if self.text(index) == 'async':
+            index += 1
+        if self.text(index) == '=>':
+            return [index + 1]
+        if self.text(index) != '{':
+            return []
+        end = self.match.get(index, index)
+        return [i + 1 for i in range(index, end) if self.text(i) == 'return']
+
+
+RULES: Dict[str, Dict] = {}
+
+
+def rule(rule_id: str, description: str):
+    """Register a rule; the check receives a DartFile and yields (token index, message)"""
+    def register(check: Callable[[DartFile], Iterator[Tuple[int, str]]]):
+        RULES[rule_id] = {'description': description, 'check': check}
+        return check
+    return register
+
+
+# Widgets and values whose constructors are const; named constructors listed in NON_CONST_CONSTRUCTORS are not
+CONST_CLASSES = {
+    'Align', 'AlwaysScrollableScrollPhysics', 'BorderRadius', 'BorderSide', 'BoxConstraints', 'Center',
+    'CircularProgressIndicator', 'Color', 'Column', 'Divider', 'Duration', 'EdgeInsets',
+    'EdgeInsetsDirectional', 'Expanded', 'Flexible', 'FlutterLogo', 'Icon', 'InputDecoration', 'Key',
+    'LinearProgressIndicator', 'NeverScrollableScrollPhysics', 'Offset', 'Padding', 'Placeholder', 'Radius',
+    'RoundedRectangleBorder', 'Row', 'SafeArea', 'SizedBox', 'Size', 'Spacer', 'Text', 'TextStyle',
+    'ValueKey', 'VerticalDivider', 'Wrap',
+}
+NON_CONST_CONSTRUCTORS = {'BorderRadius.circular', 'EdgeInsets.fromWindowPadding', 'Size.fromHeight'}
+LITERALS = {'true', 'false', 'null'}
+
+
+def const_call_end(f: DartFile, index: int) -> Optional[int]:
+    """Closing paren index if the constructor call at index could be const, else None"""
+    name = f.text(index)
+    if name not in CONST_CLASSES:
+        return None
+    open_paren = index + 1
+    if f.text(open_paren) == '.' and f.tokens[index + 2][0] == 'ident':
+        if f"{name}.{f.text(index + 2)}" in NON_CONST_CONSTRUCTORS:
+            return None
+        open_paren = index + 3
+    if f.text(open_paren) != '(' or open_paren not in f.match:
+        return None
+    close = f.match[open_paren]
+    return close if constant_range(f, open_paren + 1, close) else None
+
+
+def constant_range(f: DartFile, index: int, end: int) -> bool:
+    """True when every expression in [index, end) is a compile-time constant"""
+    while index < end:
+        kind, text, _ = f.tokens[index]
+        if kind in ('number', 'string') or text in LITERALS or text in (',', ':', '-'):
+            index += 1
+        elif kind == 'ident' and f.text(index + 1) == ':':
+            index += 2
+        elif text == 'const':
+            index = f.expression_end(index + 1)
+        elif text == '[':
+            close = f.match.get(index, end)
+            if not constant_range(f, index + 1, close):
+                return False
+            index = close + 1
+        elif kind == 'ident' and text[0].isupper():
+            call_end = const_call_end(f, index)
+            if call_end is not None:
+                index = call_end + 1
+                continue
+            # Static constants such as Icons.add or AppConstants.defaultPadding
+            chain = index + 1
+            while f.text(chain) == '.' and f.tokens[chain + 1][0] == 'ident':
+                chain += 2
+            if chain == index + 1 or f.text(chain) in ('(', '[', '!', '?.'):
+                return False
+            index = chain
+        else:
+            return False
+    return True
+
+
+@rule('missing-const', 'Constructor call with only constant arguments is not const')
+def check_missing_const(f: DartFile) -> Iterator[Tuple[int, str]]:
+    index = 0
+    while index < len(f.tokens):
+        text = f.text(index)
+        if text == 'const':
+            # Everything under an explicit const (expression or declaration) is already canonicalized
+            index = f.expression_end(index + 1) + 1
+            continue
+        if f.tokens[index][0] == 'ident' and f.text(index - 1) not in ('.', 'new', 'class', 'extends'):
+            end = const_call_end(f, index)
+            if end is not None:
+                constructor = text + (f".{f.text(index + 2)}" if f.text(index + 1) == '.' else '')
+                yield index, f"{constructor}(...) could be const, avoiding a rebuild allocation"
+                index = end + 1
+                continue
+        index += 1
+
+
+@rule('unkeyed-list-item', 'Widget built per list item has no key')
+def check_unkeyed_list_items(f: DartFile) -> Iterator[Tuple[int, str]]:
+    closures = []
+    for index in range(len(f.tokens) - 2):
+        text = f.text(index)
+        if text == 'itemBuilder' and f.text(index + 1) == ':':
+            closures.append(index + 2)
+        elif text == 'children' and f.text(index + 1) == ':':
+            end = f.expression_end(index + 2)
+            closures.extend(i + 2 for i in range(index + 2, end)
+                            if f.text(i) == 'map' and f.text(i + 1) == '(')
+    for closure in closures:
+        for result in f.closure_results(closure):
+            result += f.text(result) == 'const'
+            name = f.text(result)
+            if not name[:1].isupper() or f.tokens[result][0] != 'ident':
+                continue
+            open_paren = f.call_paren(result)
+            if f.text(open_paren) == '(' and f.named_argument(open_paren, 'key') is None:
+                yield result, f"{name} list item has no key; reordering or filtering rebuilds every item"
+
+
+SYNC_CALLS = {
+    'jsonDecode': 'JSON decoding', 'jsonEncode': 'JSON encoding',
+    'SharedPreferences': 'SharedPreferences access', 'sharedPreferencesProvider': 'SharedPreferences access',
+}
+PREFERENCE_METHODS = {'getString', 'getBool', 'getInt', 'getDouble', 'getStringList', 'getKeys',
+                      'setString', 'setBool', 'setInt', 'setDouble', 'setStringList', 'remove'}
+
+
+@rule('sync-work-in-build', 'Synchronous I/O, JSON or SharedPreferences work while building widgets')
+def check_sync_work_in_build(f: DartFile) -> Iterator[Tuple[int, str]]:
+    for index in f.build_phase_indices():
+        text = f.text(index)
+        if text in SYNC_CALLS:
+            yield index, f"{SYNC_CALLS[text]} in build; move it to a provider or initState"
+        elif text == 'json' and f.text(index + 1) == '.' and f.text(index + 2) in ('decode', 'encode'):
+            yield index, f"json.{f.text(index + 2)} in build; move it to a provider or initState"
+        elif text.endswith('Sync') and f.text(index + 1) == '(':
+            yield index, f"{text}() blocks the UI thread during build"
+        elif text in PREFERENCE_METHODS and f.text(index - 1) in ('.', '?.') and \
+                re.search(r'pref', f.text(index - 2), re.IGNORECASE):
+            yield index, f"SharedPreferences.{text} in build; read preferences through a provider"
+
+
+@rule('regexp-in-build', 'RegExp compiled on every build')
+def check_regexp_in_build(f: DartFile) -> Iterator[Tuple[int, str]]:
+    for index in f.build_phase_indices():
+        if f.text(index) == 'RegExp' and f.text(index + 1) == '(':
+            yield index, "RegExp compiled on every build; hoist it to a static final field"
+
+
+def scan_file(path: str, rule_ids: List[str]) -> List[Dict]:
+    """Findings for one file (runs in a worker process for large batches)"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        dart_file = DartFile(path, f.read())
+
+    findings = []
+    for rule_id in rule_ids:
+        for index, message in RULES[rule_id]['check'](dart_file):
+            line = dart_file.line(index)
+            suppressed = dart_file.ignores.get(line, set()) | dart_file.ignores.get(line - 1, set())
+            if rule_id not in suppressed and 'all' not in suppressed:
+                findings.append({'line': line, 'rule': rule_id, 'message': message})
+    return sorted(findings, key=lambda finding: finding['line'])
+
+
+def find_dart_files(paths: List[str]) -> List[str]:
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            candidates = [path]
+        else:
+            candidates = []
+            for root, dirs, names in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d != 'build')
+                candidates.extend(os.path.join(root, name) for name in sorted(names))
+        files.extend(c for c in candidates if c.endswith('.dart') and not c.endswith(GENERATED_SUFFIXES))
+    return files
+
+
+def staged_dart_files() -> List[str]:
+    output = subprocess.check_output(['git', 'diff', '--cached', '--name-only', '--diff-filter=ACM']).decode()
+    return find_dart_files([path for path in output.splitlines() if os.path.isfile(path)])
+
+
+def scan(paths: List[str], rule_ids: List[str], max_workers: Optional[int] = None) -> Tuple[Dict[str, List[Dict]], int]:
+    """Findings per file and the number of files actually rescanned"""
+    cache = FileHashCache('dart_perf_scanner', version=f"{SCANNER_VERSION}:{','.join(sorted(rule_ids))}")
+    results, pending = {}, []
+    for path in find_dart_files(paths):
+        fingerprint, cached = cache.lookup(path)
+        if cached is not None:
+            results[path] = cached
+        else:
+            pending.append((path, fingerprint))
+
+    if len(pending) >= PARALLEL_THRESHOLD:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = list(executor.map(scan_file, [path for path, _ in pending], [rule_ids] * len(pending),
+                                         chunksize=max(1, len(pending) // ((os.cpu_count() or 1) * 4))))
+    else:
+        outcomes = [scan_file(path, rule_ids) for path, _ in pending]
+
+    for (path, fingerprint), findings in zip(pending, outcomes):
+        results[path] = findings
+        cache.store(path, fingerprint, findings)
+    cache.save()
+    return results, len(pending)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Scan Dart sources for runtime-cost anti-patterns')
+    parser.add_argument('paths', nargs='*', help='files or directories (default: lib)')
+    parser.add_argument('--staged', action='store_true', help='scan files staged for commit')
+    parser.add_argument('--rules', help='comma-separated rule ids (default: all)')
+    parser.add_argument('--list-rules', action='store_true')
+    parser.add_argument('--json', action='store_true', help='print findings as JSON')
+    parser.add_argument('--jobs', type=int, help='worker processes')
+    args = parser.parse_args(argv)
+
+    if args.list_rules:
+        for rule_id, details in sorted(RULES.items()):
+            print(f"{rule_id:<22} {details['description']}")
+        return 0
+
+    rule_ids = sorted(RULES) if not args.rules else [r.strip() for r in args.rules.split(',')]
+    unknown = [r for r in rule_ids if r not in RULES]
+    if unknown:
+        print(f"❌ Unknown rules: {', '.join(unknown)}")
+        return 2
+
+    paths = staged_dart_files() if args.staged else (args.paths or DEFAULT_PATHS)
+    results, rescanned = scan(paths, rule_ids, args.jobs)
+    findings = [{'path': path, **finding} for path, file_findings in sorted(results.items())
+                for finding in file_findings]
+
+    if args.json:
+        print(json.dumps(findings, indent=2))
+    else:
+        for finding in findings:
+            print(f"{finding['path']}:{finding['line']}: [{finding['rule']}] {finding['message']}")
+        print(f"{'⚠️' if findings else '✅'} {len(findings)} findings in {len(results)} files "
+              f"({rescanned} rescanned)")
+    return 1 if findings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
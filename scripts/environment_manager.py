@@ -10,17 +10,38 @@ import subprocess
 import yaml
 from typing import Dict, Optional
 
+from branch_classifier import classify_branch
+from release_metrics import FILES, git_timer, timed_stage, write_textfile
+
 class EnvironmentManager:
-    def __init__(self):
+    def __init__(self, project_root: Optional[str] = None, branch: Optional[str] = None):
+        self.project_root = project_root or os.getcwd()
         self.base_package_name = self.get_base_package_name()
-        self.current_branch = self.get_current_branch()
+        self.current_branch = branch or self.get_current_branch()
         self.environment = self.determine_environment()
         self.target_package_name = self.get_target_package_name()
 
+    def project_path(self, relative_path: str) -> str:
+        """Resolve a project-relative path against the project root"""
+        return os.path.join(self.project_root, relative_path)
+
+    def write_file(self, path: str, content: str, current: Optional[str] = None) -> bool:
+        """Write content unless the file already holds it, so unchanged files keep their mtime"""
+        if current is None and os.path.exists(path):
+            with open(path, 'r') as f:
+                current = f.read()
+        if content == current:
+            FILES.inc(script='environment_manager', result='skipped')
+            return False
+        with open(path, 'w') as f:
+            f.write(content)
+        FILES.inc(script='environment_manager', result='rewritten')
+        return True
+
     def get_base_package_name(self) -> str:
         """Extract base package name from pubspec.yaml"""
         try:
-            with open('pubspec.yaml', 'r') as f:
+            with open(self.project_path('pubspec.yaml'), 'r') as f:
                 pubspec = yaml.safe_load(f)
                 name = pubspec.get('name', 'flutter_projects')
                 # Remove any existing environment suffixes
@@ -33,34 +54,17 @@ class EnvironmentManager:
     def get_current_branch(self) -> str:
         """Get current Git branch name"""
         try:
-            branch = subprocess.check_output(['git', 'rev-parse', '--abbrev-ref', 'HEAD']).decode().strip()
+            with git_timer('rev-parse'):
+                branch = subprocess.check_output(
+                    ['git', 'rev-parse', '--abbrev-ref', 'HEAD'], cwd=self.project_root
+                ).decode().strip()
             return branch
         except:
             return os.getenv('GITHUB_REF_NAME', 'main')
 
     def determine_environment(self) -> str:
-        """Determine environment based on branch name"""
-        branch = self.current_branch.lower()
-
-        # Release branches (production)
-        if branch.startswith('release/') or branch == 'main':
-            return 'production'
-
-        # Development/QA branches (staging)
-        elif branch in ['development', 'develop', 'dev'] or branch.startswith('qa/'):
-            return 'staging'
-
-        # Feature branches (development)
-        elif (branch.startswith('feature/') or
-              branch.startswith('feat/') or
-              branch.startswith('fix/') or
-              branch.startswith('hotfix/') or
-              branch.startswith('bugfix/')):
-            return 'development'
-
-        # Default to development for unknown branches
-        else:
-            return 'development'
+        """Determine environment based on branch name (rules in config/branch_environments.yaml)"""
+        return classify_branch(self.current_branch, self.project_root)
 
     def get_target_package_name(self) -> str:
         """Get target package name based on environment"""
@@ -92,19 +96,18 @@ class EnvironmentManager:
     def update_pubspec_yaml(self):
         """Update pubspec.yaml with environment-specific package name"""
         try:
-            with open('pubspec.yaml', 'r') as f:
-                content = f.read()
+            with open(self.project_path('pubspec.yaml'), 'r') as f:
+                original = f.read()
 
             # Update name field
             content = re.sub(
                 r'^name:\s*.*$',
                 f'name: {self.target_package_name}',
-                content,
+                original,
                 flags=re.MULTILINE
             )
 
-            with open('pubspec.yaml', 'w') as f:
-                f.write(content)
+            self.write_file(self.project_path('pubspec.yaml'), content, original)
 
             print(f"✅ Updated pubspec.yaml: name = {self.target_package_name}")
 
@@ -125,21 +128,20 @@ class EnvironmentManager:
 
     def update_android_build_gradle(self, package_name: str):
         """Update Android build.gradle.kts with new package name"""
-        build_gradle_path = 'android/app/build.gradle.kts'
+        build_gradle_path = self.project_path('android/app/build.gradle.kts')
 
         try:
             with open(build_gradle_path, 'r') as f:
-                content = f.read()
+                original = f.read()
 
             # Update applicationId
             content = re.sub(
                 r'applicationId\s*=\s*"[^"]*"',
                 f'applicationId = "{package_name}"',
-                content
+                original
             )
 
-            with open(build_gradle_path, 'w') as f:
-                f.write(content)
+            self.write_file(build_gradle_path, content, original)
 
         except Exception as e:
             print(f"⚠️ Error updating build.gradle.kts: {e}")
@@ -152,21 +154,20 @@ class EnvironmentManager:
             'android/app/src/profile/AndroidManifest.xml'
         ]
 
-        for manifest_path in manifest_paths:
+        for manifest_path in map(self.project_path, manifest_paths):
             try:
                 if os.path.exists(manifest_path):
                     with open(manifest_path, 'r') as f:
-                        content = f.read()
+                        original = f.read()
 
                     # Update package attribute
                     content = re.sub(
                         r'package="[^"]*"',
                         f'package="{package_name}"',
-                        content
+                        original
                     )
 
-                    with open(manifest_path, 'w') as f:
-                        f.write(content)
+                    self.write_file(manifest_path, content, original)
 
             except Exception as e:
                 print(f"⚠️ Error updating {manifest_path}: {e}")
@@ -185,22 +186,21 @@ class EnvironmentManager:
 
     def update_ios_info_plist(self, bundle_id: str):
         """Update iOS Info.plist with new bundle identifier"""
-        info_plist_path = 'ios/Runner/Info.plist'
+        info_plist_path = self.project_path('ios/Runner/Info.plist')
 
         try:
             if os.path.exists(info_plist_path):
                 with open(info_plist_path, 'r') as f:
-                    content = f.read()
+                    original = f.read()
 
                 # Update CFBundleIdentifier
                 content = re.sub(
                     r'<key>CFBundleIdentifier</key>\s*<string>[^<]*</string>',
                     f'<key>CFBundleIdentifier</key>\n\t<string>{bundle_id}</string>',
-                    content
+                    original
                 )
 
-                with open(info_plist_path, 'w') as f:
-                    f.write(content)
+                self.write_file(info_plist_path, content, original)
 
         except Exception as e:
             print(f"⚠️ Error updating Info.plist: {e}")
@@ -217,9 +217,8 @@ class EnvironmentManager:
 """
 
         try:
-            os.makedirs('ios/configuration', exist_ok=True)
-            with open('ios/configuration/environment.txt', 'w') as f:
-                f.write(config_note)
+            os.makedirs(self.project_path('ios/configuration'), exist_ok=True)
+            self.write_file(self.project_path('ios/configuration/environment.txt'), config_note)
         except Exception as e:
             print(f"⚠️ Error creating iOS config note: {e}")
 
@@ -235,10 +234,9 @@ class EnvironmentManager:
         }
 
         try:
-            os.makedirs('build_config', exist_ok=True)
-            with open('build_config/environment.json', 'w') as f:
-                import json
-                json.dump(env_info, f, indent=2)
+            os.makedirs(self.project_path('build_config'), exist_ok=True)
+            import json
+            self.write_file(self.project_path('build_config/environment.json'), json.dumps(env_info, indent=2))
 
             print(f"✅ Created environment info: build_config/environment.json")
 
@@ -250,15 +248,17 @@ class EnvironmentManager:
         try:
             # Import and use config manager
             from config_manager import ConfigManager
-            config_manager = ConfigManager(self.environment)
+            config_manager = ConfigManager(self.environment, project_root=self.project_root)
             config_manager.apply_all_configs()
         except ImportError:
             print("⚠️ Config manager not available, skipping Firebase config copy")
         except Exception as e:
             print(f"⚠️ Error copying Firebase configs: {e}")
 
+    # Flushed by the caller, so monorepo workers do not each rewrite the metrics textfile
+    @timed_stage('environment_manager')
     def apply_environment_config(self):
-        """Apply all environment-specific configurations"""
+        """Apply all environment-specific configurations (unchanged files are left untouched)"""
         print(f"🔧 Configuring environment for branch: {self.current_branch}")
         print(f"📱 Environment: {self.environment}")
         print(f"📦 Target package: {self.target_package_name}")
@@ -306,5 +306,15 @@ class EnvironmentManager:
         print("="*60 + "\n")
 
 if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == '--monorepo':
+        from monorepo_manager import MonorepoEnvironmentManager
+        repo_root = sys.argv[2] if len(sys.argv) > 2 else None
+        results = MonorepoEnvironmentManager(repo_root).apply_environment_config()
+        write_textfile()
+        sys.exit(0 if all(r['ok'] for r in results) else 1)
+
     manager = EnvironmentManager()
     manager.apply_environment_config()
+    write_textfile()
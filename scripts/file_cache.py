@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Content-hash file cache shared by the incremental tooling
+Remembers per-file results keyed by SHA-256, with a size/mtime fast path that avoids rehashing
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+CACHE_DIR = '.dart_tool/script_cache'
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FileHashCache:
+    """JSON cache of {path: {size, mtime_ns, sha256, result}} for one tool and settings version"""
+
+    def __init__(self, name: str, version: str = '1', cache_dir: str = CACHE_DIR):
+        self.path = os.path.join(cache_dir, f"{name}.json")
+        self.version = version
+        self.entries: Dict[str, Dict] = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == self.version:
+                self.entries = data.get('entries', {})
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        """Write atomically so an interrupted run never leaves a corrupt cache"""
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump({'version': self.version, 'entries': self.entries}, f, separators=(',', ':'))
+        os.replace(temporary, self.path)
+        self.dirty = False
+
+    def fingerprint(self, path: str) -> Dict:
+        """Current size/mtime/hash, reusing the cached hash when size and mtime are unchanged"""
+        stat = os.stat(path)
+        cached = self.entries.get(path)
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            sha256 = cached['sha256']
+        else:
+            sha256 = file_sha256(path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+
+    def lookup(self, path: str) -> Tuple[Dict, Optional[object]]:
+        """Return (fingerprint, cached result or None when the content changed)"""
+        fingerprint = self.fingerprint(path)
+        cached = self.entries.get(path)
+        if cached and cached['sha256'] == fingerprint['sha256']:
+            if cached['mtime_ns'] != fingerprint['mtime_ns']:
+                cached['mtime_ns'] = fingerprint['mtime_ns']
+                self.dirty = True
+            return fingerprint, cached.get('result')
+        return fingerprint, None
+
+    def store(self, path: str, fingerprint: Dict, result: object):
+        self.entries[path] = {**fingerprint, 'result': result}
+        self.dirty = True
+
+    def prune(self, live_paths: Iterable[str]):
+        """Forget files that no longer exist"""
+        live = set(live_paths)
+        for path in [p for p in self.entries if p not in live]:
+            del self.entries[path]
+            self.dirty = True
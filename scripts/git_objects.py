@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Git object helpers shared by the release tooling
+Reads files at any revision through one git cat-file process (no checkout) and caches
+per-commit results, which never change once computed
+"""
+
+import json
+import os
+import subprocess
+from typing import Dict, Iterable, List, Optional
+
+from file_cache import CACHE_DIR
+from release_metrics import git_timer
+
+
+def _batch(args: List[str], specs: List[str]) -> bytes:
+    requests = ''.join(f"{spec}\n" for spec in specs).encode()
+    with git_timer('cat-file'):
+        return subprocess.run(['git', 'cat-file'] + args, input=requests, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL).stdout
+
+
+def resolve_commits(revisions: Iterable[str]) -> Dict[str, Optional[str]]:
+    """Commit SHA for each tag/branch/revision (None when it does not exist)"""
+    revisions = list(dict.fromkeys(revisions))
+    if not revisions:
+        return {}
+    lines = _batch(['--batch-check'], [f"{rev}^{{commit}}" for rev in revisions]).decode().splitlines()
+    resolved = {}
+    for rev, line in zip(revisions, lines):
+        parts = line.split()
+        resolved[rev] = parts[0] if len(parts) == 3 and parts[1] == 'commit' else None
+    return resolved
+
+
+def read_blobs(specs: Iterable[str]) -> Dict[str, Optional[bytes]]:
+    """Contents of '<revision>:<path>' specs (None when missing), read in one cat-file --batch call"""
+    specs = list(dict.fromkeys(specs))
+    if not specs:
+        return {}
+    output = _batch(['--batch'], specs)
+
+    blobs: Dict[str, Optional[bytes]] = {}
+    offset = 0
+    for spec in specs:
+        newline = output.index(b'\n', offset)
+        header = output[offset:newline].split()
+        offset = newline + 1
+        if len(header) != 3:  # "<spec> missing"
+            blobs[spec] = None
+            continue
+        size = int(header[2])
+        blobs[spec] = output[offset:offset + size]
+        offset += size + 1
+    return blobs
+
+
+class CommitCache:
+    """JSON cache of {commit SHA: result} for one tool and settings version, keeping the newest entries"""
+
+    def __init__(self, name: str, version: str = '1', max_entries: int = 500, cache_dir: str = CACHE_DIR):
+        self.path = os.path.join(cache_dir, f"{name}.json")
+        self.version = version
+        self.max_entries = max_entries
+        self.entries: Dict[str, object] = {}
+        self.dirty = False
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == version:
+                self.entries = data.get('entries', {})
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, commit: str) -> Optional[object]:
+        return self.entries.get(commit)
+
+    def put(self, commit: str, result: object):
+        self.entries.pop(commit, None)
+        self.entries[commit] = result
+        while len(self.entries) > self.max_entries:
+            del self.entries[next(iter(self.entries))]
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump({'version': self.version, 'entries': self.entries}, f, separators=(',', ':'))
+        os.replace(temporary, self.path)
+        self.dirty = False
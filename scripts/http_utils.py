@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+HTTP helpers shared by the release integrations
+Retries rate-limited and failed requests to Slack, Notion, Trello and Jira, recording latency and
+status per provider
+"""
+
+import os
+import threading
+import time
+from typing import Optional, Set
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from release_metrics import HTTP_DURATION, HTTP_REQUESTS, HTTP_RETRIES, provider_of
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# A 5xx can arrive after the server committed a create or an append, so requests that are not
+# idempotent are only retried when they were certainly not processed
+NON_IDEMPOTENT_RETRY_STATUSES = {429}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+# Upper bound for a server-sent Retry-After, so one response cannot stall a release
+MAX_RETRY_AFTER = 60.0
+DEFAULT_TIMEOUT = 30
+
+
+def get_max_retries() -> int:
+    """Number of retries after the first attempt (HTTP_MAX_RETRIES, default 3)"""
+    try:
+        return max(0, int(os.getenv('HTTP_MAX_RETRIES', '3')))
+    except ValueError:
+        return 3
+
+
+def retry_statuses(method: str) -> Set[int]:
+    """Response statuses that are retried for an HTTP method"""
+    return RETRY_STATUSES if method.upper() in IDEMPOTENT_METHODS else NON_IDEMPOTENT_RETRY_STATUSES
+
+
+def request_not_sent(error: requests.ConnectionError) -> bool:
+    """Whether a connection error happened before the request reached the server (timeout or refused
+    while connecting); a connection dropped later may have been processed"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', error.args[0]) if error.args else None
+    return isinstance(reason, (NewConnectionError, ConnectionRefusedError))
+
+
+def retry_delay(response: Optional[requests.Response], attempt: int, backoff: float) -> float:
+    """Honour Retry-After (capped at MAX_RETRY_AFTER) when present, otherwise back off exponentially"""
+    if response is not None:
+        retry_after = response.headers.get('Retry-After')
+        if retry_after:
+            try:
+                return min(MAX_RETRY_AFTER, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+    return backoff * (2 ** attempt)
+
+
+class RateLimiter:
+    """Spaces requests at least 1/rate seconds apart across threads (rate <= 0 disables the limit)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_at = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_at)
+            self.next_at = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def request_with_retry(method: str, url: str, max_retries: Optional[int] = None,
+                       backoff: float = 0.5, **kwargs) -> requests.Response:
+    """Send a request, retrying 429 responses and connection failures; 5xx responses and dropped
+    connections are only retried for idempotent methods"""
+    retries = get_max_retries() if max_retries is None else max_retries
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+    statuses = retry_statuses(method)
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    provider = provider_of(url)
+
+    for attempt in range(retries + 1):
+        response = None
+        started = time.monotonic()
+        try:
+            response = requests.request(method, url, **kwargs)
+            HTTP_REQUESTS.inc(provider=provider, method=method, status=response.status_code)
+            if response.status_code not in statuses or attempt == retries:
+                return response
+        except requests.ConnectionError as e:
+            HTTP_REQUESTS.inc(provider=provider, method=method, status='connection_error')
+            if attempt == retries or not (idempotent or request_not_sent(e)):
+                raise
+        finally:
+            HTTP_DURATION.observe(time.monotonic() - started, provider=provider, method=method)
+        HTTP_RETRIES.inc(provider=provider)
+        time.sleep(retry_delay(response, attempt, backoff))
+
+    return response
+
+
+def post_with_retry(url: str, **kwargs) -> requests.Response:
+    """POST with retries (see request_with_retry)"""
+    return request_with_retry('POST', url, **kwargs)
+
+
+def get_with_retry(url: str, **kwargs) -> requests.Response:
+    """GET with retries (see request_with_retry)"""
+    return request_with_retry('GET', url, **kwargs)
@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Mock Integration Server
+Local stand-in for the Slack, Notion, Trello and Jira endpoints used by the release scripts,
+with latency distributions, 429/5xx fault injection and request recording
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from http_utils import retry_statuses
+
+PROVIDERS = ('slack', 'notion', 'trello', 'jira')
+
+
+class LatencyDistribution:
+    """Samples response latency in milliseconds from a spec such as 'normal:120:30'"""
+
+    def __init__(self, spec: str = 'fixed:0'):
+        kind, *params = spec.split(':')
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        if kind not in ('fixed', 'uniform', 'normal', 'lognormal', 'exponential'):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self) -> float:
+        if self.kind == 'fixed':
+            return self.params[0] if self.params else 0.0
+        if self.kind == 'uniform':
+            return random.uniform(*self.params)
+        if self.kind == 'normal':
+            return max(0.0, random.gauss(*self.params))
+        if self.kind == 'lognormal':
+            return random.lognormvariate(*self.params)
+        return random.expovariate(1.0 / self.params[0])
+
+
+class MockBehaviour:
+    """Per-provider latency and error injection settings"""
+
+    def __init__(self, latency: Optional[Dict[str, str]] = None,
+                 errors: Optional[Dict[int, float]] = None, retry_after: float = 0.0):
+        latency = latency or {}
+        default = latency.get('default', 'fixed:0')
+        self.latency = {p: LatencyDistribution(latency.get(p, default)) for p in PROVIDERS}
+        self.errors = errors or {}
+        self.retry_after = retry_after
+
+    def pick_error(self) -> Optional[int]:
+        roll = random.random()
+        for status, rate in self.errors.items():
+            if roll < rate:
+                return status
+            roll -= rate
+        return None
+
+
+class RequestRecorder:
+    """Thread-safe log of every request the mock server handled"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.records: List[Dict] = []
+
+    def add(self, record: Dict):
+        with self.lock:
+            self.records.append(record)
+
+    def snapshot(self) -> List[Dict]:
+        with self.lock:
+            return list(self.records)
+
+    def reset(self):
+        with self.lock:
+            self.records.clear()
+
+
+class MockState:
+    """Objects created through the mock APIs, so status polls return what was created"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.issue_counter = 0
+        self.pages: Dict[str, Dict] = {}
+        self.blocks: Dict[str, List[Dict]] = {}
+        self.comments: Dict[str, List[Dict]] = {}
+        self.checklists: Dict[str, Dict] = {}
+        self.issues: Dict[str, Dict] = {}
+
+    @staticmethod
+    def now() -> str:
+        return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+    def create_page(self, page_id: str, body: Dict):
+        with self.lock:
+            self.pages[page_id] = {'todos': [], 'last_edited_time': self.now()}
+            self.blocks[page_id] = []
+        self.append_blocks(page_id, body.get('children', []))
+
+    def append_blocks(self, parent_id: str, children: List[Dict]) -> bool:
+        """Store blocks as Notion returns them; to-dos on a page are tracked for status polls"""
+        with self.lock:
+            if parent_id not in self.blocks:
+                return False
+            for block in children:
+                block_type = block.get('type')
+                details = block.get(block_type, {})
+                stored = {'object': 'block', 'id': uuid.uuid4().hex, 'type': block_type, 'has_children': False,
+                          block_type: {**details, 'rich_text': [
+                              {'plain_text': ''.join(part['text']['content'] for part in details.get('rich_text', []))}
+                          ]}}
+                self.blocks[parent_id].append(stored)
+                self.blocks[stored['id']] = []
+                if block_type == 'to_do' and parent_id in self.pages:
+                    self.pages[parent_id]['todos'].append(stored[block_type])
+                    stored[block_type].setdefault('checked', False)
+            if parent_id in self.pages:
+                self.pages[parent_id]['last_edited_time'] = self.now()
+            return True
+
+    def children(self, parent_id: str, cursor: int, page_size: int) -> Optional[Dict]:
+        with self.lock:
+            if parent_id not in self.blocks:
+                return None
+            blocks = self.blocks[parent_id]
+            end = cursor + page_size
+            return {'object': 'list', 'results': blocks[cursor:end],
+                    'has_more': end < len(blocks), 'next_cursor': str(end) if end < len(blocks) else None}
+
+    def create_checklist(self, checklist_id: str, card_id: str, name: str):
+        with self.lock:
+            self.checklists[checklist_id] = {'idCard': card_id, 'name': name, 'checkItems': []}
+
+    def add_check_item(self, checklist_id: str, item_id: str, name: str, position: float):
+        with self.lock:
+            checklist = self.checklists.setdefault(checklist_id, {'idCard': None, 'name': '', 'checkItems': []})
+            checklist['checkItems'].append({'id': item_id, 'name': name, 'pos': position, 'state': 'incomplete'})
+
+    def create_issue(self) -> str:
+        with self.lock:
+            self.issue_counter += 1
+            key = f'QA-{self.issue_counter}'
+            self.issues[key] = {'status': 'To Do', 'done': False, 'updated': time.time()}
+            return key
+
+    def complete_all(self):
+        """Check off every QA item, as a tester finishing all releases would"""
+        with self.lock:
+            for page in self.pages.values():
+                for todo in page['todos']:
+                    todo['checked'] = True
+                page['last_edited_time'] = self.now()
+            for checklist in self.checklists.values():
+                for item in checklist['checkItems']:
+                    item['state'] = 'complete'
+            for issue in self.issues.values():
+                issue.update(status='Done', done=True, updated=time.time())
+
+
+class MockIntegrationHandler(BaseHTTPRequestHandler):
+    server_version = 'MockIntegrations/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith('/__mock__/requests'):
+            self.send_json(200, self.server.recorder.snapshot())
+        else:
+            self.handle_provider_request()
+
+    def do_POST(self):
+        if self.path.startswith('/__mock__/reset'):
+            self.server.recorder.reset()
+            self.send_json(200, {'ok': True})
+        elif self.path.startswith('/__mock__/complete'):
+            self.server.state.complete_all()
+            self.send_json(200, {'ok': True})
+        else:
+            self.handle_provider_request()
+
+    do_PATCH = do_POST
+    do_PUT = do_POST
+
+    def handle_provider_request(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        provider, route = self.split_path()
+        behaviour: MockBehaviour = self.server.behaviour
+
+        latency_ms = behaviour.latency[provider].sample() if provider in PROVIDERS else 0.0
+        time.sleep(latency_ms / 1000.0)
+
+        error = behaviour.pick_error() if provider in PROVIDERS else None
+        if error:
+            status, payload = error, {'error': 'injected failure'}
+        else:
+            status, payload = self.route(provider, route, body)
+
+        headers = {}
+        if status == 429:
+            headers['Retry-After'] = str(behaviour.retry_after)
+        if self.command == 'GET' and status == 200:
+            etag = '"' + hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest() + '"'
+            headers['ETag'] = etag
+            if self.headers.get('If-None-Match') == etag:
+                status, payload = 304, ''
+
+        self.server.recorder.add({
+            'provider': provider,
+            'method': self.command,
+            'path': route,
+            'status': status,
+            'latency_ms': round(latency_ms, 3),
+            'request_bytes': len(body),
+            'received_at': time.time(),
+        })
+
+        self.send_json(status, payload, headers)
+
+    def split_path(self) -> Tuple[str, str]:
+        """'/notion/v1/pages?x=1' -> ('notion', '/v1/pages')"""
+        path = self.path.split('?', 1)[0]
+        _, provider, *rest = path.split('/')
+        return provider, '/' + '/'.join(rest)
+
+    def route(self, provider: str, route: str, body: bytes = b'') -> Tuple[int, object]:
+        """Minimal successful responses shaped like the real APIs"""
+        object_id = uuid.uuid4().hex
+        state: MockState = self.server.state
+        query = parse_qs(urlsplit(self.path).query)
+        form = {key: values[0] for key, values in parse_qs(body.decode(errors='replace')).items()}
+        parts = route.strip('/').split('/')
+
+        if provider == 'slack':
+            return 200, 'ok'
+
+        if provider == 'notion' and self.command in ('POST', 'PATCH'):
+            error = self.notion_validation_error(json.loads(body or b'{}'), len(body))
+            if error:
+                return 400, {'object': 'error', 'code': 'validation_error', 'message': error}
+        if provider == 'notion' and self.command == 'POST' and route.startswith('/v1/pages'):
+            state.create_page(object_id, json.loads(body or b'{}'))
+            return 200, {'object': 'page', 'id': object_id, 'url': f'https://notion.so/{object_id}'}
+        if provider == 'notion' and route.startswith('/v1/pages/'):
+            page = state.pages.get(parts[2])
+            if page is None:
+                return 404, {'object': 'error', 'code': 'object_not_found'}
+            return 200, {'object': 'page', 'id': parts[2], 'last_edited_time': page['last_edited_time']}
+        if provider == 'notion' and route.startswith('/v1/blocks/') and route.endswith('/children'):
+            if self.command == 'PATCH':
+                if not state.append_blocks(parts[2], json.loads(body or b'{}').get('children', [])):
+                    return 404, {'object': 'error', 'code': 'object_not_found'}
+                return 200, {'object': 'list', 'results': []}
+            cursor = int(query.get('start_cursor', ['0'])[0])
+            page_size = min(100, int(query.get('page_size', ['100'])[0]))
+            listing = state.children(parts[2], cursor, page_size)
+            if listing is None:
+                return 404, {'object': 'error', 'code': 'object_not_found'}
+            return 200, listing
+
+        if provider == 'trello' and route.startswith('/1/batch'):
+            responses = []
+            for url in query.get('urls', [''])[0].split(','):
+                card_id = url.strip('/').split('/')[1] if url.count('/') >= 2 else ''
+                responses.append({'200': [{'id': checklist_id, **checklist}
+                                          for checklist_id, checklist in state.checklists.items()
+                                          if checklist['idCard'] == card_id]})
+            return 200, responses
+        if provider == 'trello' and route.startswith('/1/cards'):
+            return 200, {'id': object_id, 'shortUrl': f'https://trello.com/c/{object_id[:8]}'}
+        if provider == 'trello' and route.endswith('/checkItems'):
+            state.add_check_item(parts[2], object_id, form.get('name', ''), float(form.get('pos', 0)))
+            return 200, {'id': object_id, 'state': 'incomplete'}
+        if provider == 'trello' and route.startswith('/1/checklists'):
+            state.create_checklist(object_id, form.get('idCard'), form.get('name', ''))
+            return 200, {'id': object_id, 'checkItems': []}
+
+        if provider == 'jira' and route.startswith('/rest/api/3/search'):
+            return 200, self.search_issues(query.get('jql', [''])[0])
+        if provider == 'jira' and route.startswith('/rest/api/3/issue/bulk'):
+            issues = []
+            for _ in json.loads(body or b'{}').get('issueUpdates', []):
+                key = state.create_issue()
+                issues.append({'id': key.split('-')[1], 'key': key})
+            return 201, {'issues': issues, 'errors': []}
+        if provider == 'jira' and route.endswith('/comment'):
+            with state.lock:
+                state.comments.setdefault(parts[4], []).append(json.loads(body or b'{}'))
+            return 201, {'id': object_id}
+        if provider == 'jira' and route.startswith('/rest/api/3/issue'):
+            key = state.create_issue()
+            return 201, {'id': key.split('-')[1], 'key': key}
+        return 404, {'error': f'no mock for {provider} {route}'}
+
+    @staticmethod
+    def notion_validation_error(body: Dict, size: int) -> Optional[str]:
+        """The request limits Notion enforces on created blocks"""
+        if size > 500 * 1000:
+            return f'Request body too large: {size} bytes'
+        children = body.get('children', [])
+        if len(children) > 100:
+            return f'body.children.length should be ≤ 100, instead was {len(children)}'
+        for block in children:
+            rich_text = block.get(block.get('type'), {}).get('rich_text', [])
+            if len(rich_text) > 100:
+                return f'rich_text.length should be ≤ 100, instead was {len(rich_text)}'
+            for part in rich_text:
+                if len(part['text']['content']) > 2000:
+                    return f"text.content.length should be ≤ 2000, instead was {len(part['text']['content'])}"
+        return None
+
+    def search_issues(self, jql: str) -> Dict:
+        """Supports the 'key in (...)' and 'updated >= -Nm' clauses the status sync sends"""
+        keys = re.search(r'key in \(([^)]*)\)', jql)
+        wanted = [key.strip() for key in keys.group(1).split(',')] if keys else list(self.server.state.issues)
+        since = re.search(r'updated >= -(\d+)m', jql)
+        cutoff = time.time() - int(since.group(1)) * 60 if since else 0
+        issues = []
+        for key in wanted:
+            issue = self.server.state.issues.get(key)
+            if issue and issue['updated'] >= cutoff:
+                issues.append({'key': key, 'fields': {'status': {
+                    'name': issue['status'], 'statusCategory': {'key': 'done' if issue['done'] else 'new'}}}})
+        return {'startAt': 0, 'maxResults': len(issues), 'total': len(issues), 'issues': issues}
+
+    def send_json(self, status: int, payload: object, headers: Optional[Dict[str, str]] = None):
+        data = (payload if isinstance(payload, str) else json.dumps(payload)).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockIntegrationServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 512
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, behaviour: Optional[MockBehaviour] = None):
+        super().__init__((host, port), MockIntegrationHandler)
+        self.behaviour = behaviour or MockBehaviour()
+        self.recorder = RequestRecorder()
+        self.state = MockState()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def environment(self) -> Dict[str, str]:
+        """Environment variables that point the release scripts at this server"""
+        return {
+            'SLACK_WEBHOOK_URL': f'{self.base_url}/slack/webhook',
+            'NOTION_API_URL': f'{self.base_url}/notion',
+            'NOTION_TOKEN': 'mock-token',
+            'NOTION_QA_DATABASE_ID': 'mock-database',
+            'TRELLO_API_URL': f'{self.base_url}/trello',
+            'TRELLO_API_KEY': 'mock-key',
+            'TRELLO_TOKEN': 'mock-token',
+            'TRELLO_QA_LIST_ID': 'mock-list',
+            'JIRA_URL': f'{self.base_url}/jira',
+            'JIRA_EMAIL': 'qa@example.com',
+            'JIRA_API_TOKEN': 'mock-token',
+            'JIRA_PROJECT_KEY': 'QA',
+        }
+
+    def start_in_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def run_load_test(server: MockIntegrationServer, releases: int, concurrency: int) -> Dict:
+    """Fire N simultaneous releases (Slack + QA integrations) at the mock server"""
+    os.environ.update(server.environment())
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    # Imported after the environment is set so the endpoint overrides are picked up
+    from post_deployment import PostDeploymentAutomation
+    from qa_automation import QAAutomation
+
+    # Created item records hold mock IDs; kept out of the real qa/ so qa_status_sync.py never polls them
+    with tempfile.TemporaryDirectory(prefix='qa-loadtest-') as qa_dir:
+        def fire(index: int) -> Tuple[float, Dict[str, bool]]:
+            started = time.perf_counter()
+            version = f'0.{index}.0'
+            PostDeploymentAutomation('android', version, str(index), 'staging').send_slack_notification()
+            results = QAAutomation('android', version, str(index), '- mock change',
+                                   qa_dir=qa_dir).trigger_all_qa_processes()
+            return time.perf_counter() - started, results
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor, redirect_stdout(io.StringIO()):
+            outcomes = list(executor.map(fire, range(releases)))
+    elapsed = time.perf_counter() - started
+
+    records = server.recorder.snapshot()
+    durations = [duration for duration, _ in outcomes]
+    status_counts: Dict[str, int] = {}
+    for record in records:
+        key = f"{record['provider']} {record['status']}"
+        status_counts[key] = status_counts.get(key, 0) + 1
+
+    return {
+        'releases': releases,
+        'concurrency': concurrency,
+        'elapsed_s': elapsed,
+        'releases_per_s': releases / elapsed if elapsed else 0.0,
+        'requests': len(records),
+        # Only responses the client retries for that method (POSTs are not retried on 5xx)
+        'retries': sum(1 for record in records if record['status'] in retry_statuses(record['method'])),
+        'release_latency_s': {
+            'p50': statistics.median(durations),
+            'p90': percentile(durations, 90),
+            'p99': percentile(durations, 99),
+        },
+        'integration_failures': sum(1 for _, results in outcomes for ok in results.values() if not ok),
+        'status_counts': status_counts,
+    }
+
+
+def parse_latency(values: List[str]) -> Dict[str, str]:
+    """['normal:100:20', 'jira=uniform:200:400'] -> {'default': ..., 'jira': ...}"""
+    latency = {}
+    for value in values or []:
+        provider, _, spec = value.rpartition('=')
+        latency[provider or 'default'] = spec
+    return latency
+
+
+def parse_errors(values: List[str]) -> Dict[int, float]:
+    """['429=0.05', '503=0.01'] -> {429: 0.05, 503: 0.01}"""
+    errors = {}
+    for value in values or []:
+        status, rate = value.split('=')
+        errors[int(status)] = float(rate)
+    return errors
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Local Slack/Notion/Trello/Jira stand-in server')
+    parser.add_argument('mode', choices=('serve', 'loadtest'), nargs='?', default='serve')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', action='append', metavar='[PROVIDER=]KIND:ARGS',
+                        help='latency in ms, e.g. normal:120:30 or jira=uniform:200:400')
+    parser.add_argument('--error', action='append', metavar='STATUS=RATE',
+                        help='inject an error status with the given probability, e.g. 429=0.05')
+    parser.add_argument('--retry-after', type=float, default=0.0, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--record', help='write recorded requests to this JSON file on exit')
+    parser.add_argument('--releases', type=int, default=100, help='loadtest: releases to fire')
+    parser.add_argument('--concurrency', type=int, default=100, help='loadtest: releases in flight')
+    args = parser.parse_args(argv)
+
+    behaviour = MockBehaviour(parse_latency(args.latency), parse_errors(args.error), args.retry_after)
+    port = 0 if args.mode == 'loadtest' else args.port
+    server = MockIntegrationServer(args.host, port, behaviour)
+
+    try:
+        if args.mode == 'loadtest':
+            server.start_in_background()
+            report = run_load_test(server, args.releases, args.concurrency)
+            print(json.dumps(report, indent=2))
+        else:
+            print(f"🧪 Mock integrations listening on {server.base_url}")
+            print("   Point the release scripts at it with:")
+            for key, value in server.environment().items():
+                print(f"   export {key}={value}")
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.record:
+            with open(args.record, 'w') as f:
+                json.dump(server.recorder.snapshot(), f, indent=2)
+            print(f"✅ Recorded requests written to {args.record}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Monorepo Environment Manager
+Applies branch-based environment switching to every Flutter app in a repository
+"""
+
+import io
+import os
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Dict, List, Optional
+
+from environment_manager import EnvironmentManager
+from release_metrics import merge_pending, take_pending, write_textfile
+
+# Directories that never contain an app root worth configuring
+SKIPPED_DIRS = {
+    '.git', '.dart_tool', '.idea', '.vscode', 'build', 'node_modules',
+    'Pods', 'android', 'ios', 'linux', 'macos', 'web', 'windows',
+}
+
+
+def configure_app(app_root: str, branch: str) -> Dict:
+    """Apply environment configuration to a single app (runs in a worker process)"""
+    started = time.monotonic()
+    output = io.StringIO()
+    result = {'app_root': app_root, 'ok': True}
+
+    try:
+        with redirect_stdout(output):
+            manager = EnvironmentManager(project_root=app_root, branch=branch)
+            manager.apply_environment_config()
+        result.update({
+            'environment': manager.environment,
+            'flutter_package_name': manager.target_package_name,
+            'android_package_name': manager.get_android_package_name(),
+            'ios_bundle_id': manager.get_ios_bundle_id(),
+        })
+    except Exception as e:
+        result.update({'ok': False, 'error': str(e)})
+
+    log = output.getvalue()
+    result['log'] = log
+    result['warnings'] = sum(1 for line in log.splitlines() if line.startswith(('⚠️', '❌')))
+    result['duration'] = time.monotonic() - started
+    # Metrics recorded in this worker go back to the parent, which writes the textfile once
+    result['metrics'] = take_pending()
+    return result
+
+
+class MonorepoEnvironmentManager:
+    def __init__(self, repo_root: Optional[str] = None, max_workers: Optional[int] = None,
+                 verbose: bool = False):
+        self.repo_root = os.path.abspath(repo_root or os.getcwd())
+        self.max_workers = max_workers
+        self.verbose = verbose
+        self.current_branch = self.get_current_branch()
+
+    def get_current_branch(self) -> str:
+        """Resolve the Git branch once for every app in the repository"""
+        try:
+            return subprocess.check_output(
+                ['git', 'rev-parse', '--abbrev-ref', 'HEAD'], cwd=self.repo_root
+            ).decode().strip()
+        except:
+            return os.getenv('GITHUB_REF_NAME', 'main')
+
+    def discover_app_roots(self) -> List[str]:
+        """Find every directory with a pubspec.yaml plus android/ and ios/ folders"""
+        app_roots = []
+
+        for current, dirs, files in os.walk(self.repo_root):
+            if ('pubspec.yaml' in files and
+                    os.path.isdir(os.path.join(current, 'android')) and
+                    os.path.isdir(os.path.join(current, 'ios'))):
+                app_roots.append(current)
+
+            dirs[:] = [d for d in dirs if d not in SKIPPED_DIRS and not d.startswith('.')]
+
+        return sorted(app_roots)
+
+    def apply_environment_config(self) -> List[Dict]:
+        """Configure all discovered apps in parallel and print one summary"""
+        app_roots = self.discover_app_roots()
+        if not app_roots:
+            print(f"⚠️ No Flutter apps found under {self.repo_root}")
+            return []
+
+        print(f"🔧 Configuring {len(app_roots)} apps for branch: {self.current_branch}")
+
+        started = time.monotonic()
+        workers = min(len(app_roots), self.max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                configure_app, app_roots, [self.current_branch] * len(app_roots)
+            ))
+        elapsed = time.monotonic() - started
+        for result in results:
+            merge_pending(result.pop('metrics'))
+
+        if self.verbose:
+            for result in results:
+                print(f"\n--- {self.relative_path(result['app_root'])} ---")
+                print(result['log'].rstrip())
+
+        self.display_summary(results, elapsed)
+        return results
+
+    def relative_path(self, path: str) -> str:
+        """Display an app root relative to the repository root"""
+        return os.path.relpath(path, self.repo_root)
+
+    def display_summary(self, results: List[Dict], elapsed: float):
+        """Display the aggregated configuration summary"""
+        print("\n" + "="*60)
+        print("📱 MONOREPO ENVIRONMENT CONFIGURATION SUMMARY")
+        print("="*60)
+        print(f"🌿 Branch: {self.current_branch}")
+        print(f"📦 Apps: {len(results)}")
+        print(f"⏱️  Duration: {elapsed:.2f}s")
+        print("="*60)
+
+        for result in results:
+            app = self.relative_path(result['app_root'])
+            if not result['ok']:
+                print(f"❌ {app}: {result['error']}")
+                continue
+
+            status = "⚠️" if result['warnings'] else "✅"
+            print(f"{status} {app} [{result['environment'].upper()}]")
+            print(f"   - Flutter Package: {result['flutter_package_name']}")
+            print(f"   - Android Package: {result['android_package_name']}")
+            print(f"   - iOS Bundle ID: {result['ios_bundle_id']}")
+            if result['warnings']:
+                print(f"   - Warnings: {result['warnings']} (re-run with --verbose for details)")
+
+        failed = sum(1 for r in results if not r['ok'])
+        print("="*60)
+        print(f"✅ Configured {len(results) - failed}/{len(results)} apps")
+        print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    manager = MonorepoEnvironmentManager(
+        repo_root=args[0] if args else None,
+        verbose='--verbose' in sys.argv
+    )
+    results = manager.apply_environment_config()
+    write_textfile()
+    sys.exit(0 if all(r['ok'] for r in results) else 1)
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Image Asset Pipeline
+Flags oversized or over-resolution images under the asset directories and, with --in-place,
+recompresses them or splits them into 1.0x/2.0x/3.0x resolution variants in a process pool,
+skipping unchanged assets via a hash cache
+"""
+
+import argparse
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from file_cache import FileHashCache
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+ASSET_DIRS = ['assets/images', 'assets/icons']
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.gif')
+VARIANT_DIRS = ('1.5x', '2.0x', '3.0x', '4.0x')
+DEFAULTS = {
+    'max_bytes': 200 * 1024,
+    'max_dimension': 2048,
+    'max_1x_dimension': 1024,
+    'jpeg_quality': 85,
+    'webp_quality': 80,
+}
+
+
+def read_image_size(path: str) -> Optional[Tuple[int, int]]:
+    """Width/height from the file header (PNG, GIF, JPEG, WebP) without decoding"""
+    with open(path, 'rb') as f:
+        head = f.read(64)
+        if head[:8] == b'\x89PNG\r\n\x1a\n':
+            return struct.unpack('>II', head[16:24])
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', head[6:10])
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            chunk = head[12:16]
+            if chunk == b'VP8 ':
+                width, height = struct.unpack('<HH', head[26:30])
+                return width & 0x3FFF, height & 0x3FFF
+            if chunk == b'VP8L':
+                bits = int.from_bytes(head[21:25], 'little')
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b'VP8X':
+                return int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1
+            return None
+        if head[:2] == b'\xff\xd8':
+            f.seek(2)
+            while True:
+                marker = f.read(2)
+                if len(marker) < 2 or marker[0] != 0xFF:
+                    return None
+                if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+                    continue
+                length = struct.unpack('>H', f.read(2))[0]
+                if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                    height, width = struct.unpack('>xHH', f.read(5))
+                    return width, height
+                f.seek(length - 2, os.SEEK_CUR)
+    return None
+
+
+def variant_path(path: str, scale: str) -> str:
+    directory, name = os.path.split(path)
+    return os.path.join(directory, scale, name)
+
+
+def is_variant(path: str) -> bool:
+    return os.path.basename(os.path.dirname(path)) in VARIANT_DIRS
+
+
+def existing_variants(path: str) -> List[str]:
+    return [scale for scale in VARIANT_DIRS if os.path.exists(variant_path(path, scale))]
+
+
+def inspect_asset(path: str, settings: Dict) -> Dict:
+    """Findings for one image (runs in a worker process)"""
+    size = os.path.getsize(path)
+    dimensions = read_image_size(path)
+    variants = [] if is_variant(path) else existing_variants(path)
+    findings = []
+
+    if size > settings['max_bytes']:
+        findings.append(f"{size // 1024} KB exceeds {settings['max_bytes'] // 1024} KB")
+    if dimensions and max(dimensions) > settings['max_dimension']:
+        findings.append(f"{dimensions[0]}x{dimensions[1]} exceeds {settings['max_dimension']} px")
+    needs_variants = bool(
+        dimensions and not is_variant(path)
+        and max(dimensions) > settings['max_1x_dimension']
+        and not variants
+    )
+    if needs_variants:
+        findings.append(f"{dimensions[0]}x{dimensions[1]} base image has no 2.0x/3.0x variants")
+
+    # Variants are part of the result, so a cached result is stale once variants are added or removed
+    return {'size': size, 'dimensions': list(dimensions) if dimensions else None,
+            'findings': findings, 'needs_variants': needs_variants, 'variants': variants}
+
+
+def save_image(image, path: str, settings: Dict):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jpg', '.jpeg'):
+        image.convert('RGB').save(path, quality=settings['jpeg_quality'], optimize=True, progressive=True)
+    elif extension == '.webp':
+        image.save(path, quality=settings['webp_quality'], method=6)
+    elif extension == '.png':
+        image.save(path, optimize=True)
+    else:
+        image.save(path)
+
+
+def optimize_asset(path: str, settings: Dict) -> Dict:
+    """Recompress one image or split it into 1.0x/2.0x/3.0x variants; without settings['in_place'] nothing is
+    written and the planned changes are reported (runs in a worker process)"""
+    report = inspect_asset(path, settings)
+    if Image is None or path.lower().endswith('.gif'):
+        return {**report, 'actions': []}
+
+    actions = []
+    with Image.open(path) as source:
+        source.load()
+        image = source.copy()
+
+    if report['needs_variants']:
+        # Treat the oversized base as the 3.0x source (as exported by design tools), capped at max_dimension.
+        # Variants are only written together with the 1.0x base: an Image.asset's logical size comes from
+        # its 1.0x file, so a full-size base next to smaller variants would change size per pixel ratio
+        fit = min(1.0, settings['max_dimension'] / max(image.size))
+        width, height = image.size[0] * fit, image.size[1] * fit
+        sizes = [(scale, (max(1, round(width * factor)), max(1, round(height * factor))))
+                 for scale, factor in (('3.0x', 1.0), ('2.0x', 2 / 3), ('1.0x', 1 / 3))]
+        if not settings['in_place']:
+            planned = ', '.join(f"{scale} {size[0]}x{size[1]}" for scale, size in sizes)
+            actions.append(f"would write {planned} (the 1.0x replaces the base) with --in-place")
+        else:
+            for scale, size in sizes:
+                resized = image if size == image.size else image.resize(size, Image.LANCZOS)
+                target = path if scale == '1.0x' else variant_path(path, scale)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                save_image(resized, target, settings)
+                actions.append(f"wrote {scale} {size[0]}x{size[1]}")
+    else:
+        temporary = f"{path}.optimized{os.path.splitext(path)[1]}"
+        save_image(image, temporary, settings)
+        optimized_size = os.path.getsize(temporary)
+        if optimized_size < report['size'] and settings['in_place']:
+            os.replace(temporary, path)
+            actions.append(f"recompressed {report['size'] // 1024} KB → {optimized_size // 1024} KB")
+        else:
+            os.remove(temporary)
+            if optimized_size < report['size']:
+                actions.append(f"could recompress {report['size'] // 1024} KB → {optimized_size // 1024} KB "
+                               f"with --in-place")
+
+    return {**inspect_asset(path, settings), 'actions': actions}
+
+
+def process_asset(path: str, settings: Dict, optimize: bool) -> Dict:
+    """Inspect or optimize one image; a truncated or corrupt file becomes a finding instead of
+    aborting the whole run (runs in a worker process)"""
+    try:
+        return optimize_asset(path, settings) if optimize else inspect_asset(path, settings)
+    except Exception as e:
+        return {'size': os.path.getsize(path), 'dimensions': None, 'needs_variants': False, 'variants': [],
+                'findings': [f"unreadable image ({type(e).__name__}: {e})"], 'actions': []}
+
+
+def find_images(directories: List[str]) -> List[str]:
+    images = []
+    for directory in directories:
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            images.extend(os.path.join(root, name) for name in sorted(files)
+                          if name.lower().endswith(IMAGE_EXTENSIONS))
+    return images
+
+
+def run_pipeline(directories: List[str], settings: Dict, optimize: bool,
+                 max_workers: Optional[int] = None) -> Dict[str, Dict]:
+    """Inspect (and optionally optimize) every changed image; unchanged ones come from the cache"""
+    cache = FileHashCache('asset_pipeline', version=f"3:{sorted(settings.items())}")
+    images = find_images(directories)
+    results, pending = {}, []
+
+    for path in images:
+        fingerprint, cached = cache.lookup(path)
+        fresh = (cached is not None and (not optimize or cached.get('optimized'))
+                 and cached.get('variants') == ([] if is_variant(path) else existing_variants(path)))
+        if fresh:
+            results[path] = {**cached, 'cached': True}
+        else:
+            pending.append((path, fingerprint))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = executor.map(process_asset, [path for path, _ in pending], [settings] * len(pending),
+                                    [optimize] * len(pending),
+                                    chunksize=max(1, len(pending) // ((os.cpu_count() or 1) * 4)))
+            for (path, fingerprint), outcome in zip(pending, outcomes):
+                outcome['optimized'] = optimize
+                if optimize and outcome.get('actions'):
+                    fingerprint = cache.fingerprint(path)
+                results[path] = {**outcome, 'cached': False}
+                cache.store(path, fingerprint, {**outcome, 'actions': []})
+
+    # Variants written during this run are new files; record them so the next run skips them
+    if optimize:
+        for path in find_images(directories):
+            if path not in results:
+                fingerprint, _ = cache.lookup(path)
+                outcome = {**process_asset(path, settings, False), 'optimized': True, 'actions': []}
+                cache.store(path, fingerprint, outcome)
+                results[path] = {**outcome, 'cached': False}
+
+    cache.prune(results)
+    cache.save()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Flag and optimize image assets')
+    parser.add_argument('mode', choices=('check', 'optimize'), nargs='?', default='check')
+    parser.add_argument('directories', nargs='*', default=ASSET_DIRS)
+    parser.add_argument('--max-bytes', type=int, default=DEFAULTS['max_bytes'])
+    parser.add_argument('--max-dimension', type=int, default=DEFAULTS['max_dimension'])
+    parser.add_argument('--max-1x-dimension', type=int, default=DEFAULTS['max_1x_dimension'],
+                        help='base images larger than this need 2.0x/3.0x variants')
+    parser.add_argument('--in-place', action='store_true',
+                        help='optimize mode: recompress images and replace oversized ones with 1.0x/2.0x/3.0x '
+                             'variants (lossy; overwrites committed files); without it changes are only reported')
+    parser.add_argument('--jobs', type=int, help='worker processes')
+    args = parser.parse_args(argv)
+
+    settings = {**DEFAULTS, 'max_bytes': args.max_bytes, 'max_dimension': args.max_dimension,
+                'max_1x_dimension': args.max_1x_dimension, 'in_place': args.in_place}
+    optimize = args.mode == 'optimize'
+    if optimize and Image is None:
+        print("⚠️ Pillow not installed (pip install Pillow); only checking assets")
+        optimize = False
+
+    results = run_pipeline([d for d in args.directories if os.path.isdir(d)], settings, optimize, args.jobs)
+
+    flagged = 0
+    for path, result in sorted(results.items()):
+        for action in result.get('actions') or []:
+            # Without --in-place actions are only planned ("would ..."/"could ...")
+            print(f"{'✅' if args.in_place else 'ℹ️ '} {path}: {action}")
+        for finding in result['findings']:
+            print(f"⚠️ {path}: {finding}")
+        flagged += bool(result['findings'])
+
+    cached = sum(1 for result in results.values() if result['cached'])
+    print(f"🖼️  {len(results)} images checked ({cached} unchanged, skipped), {flagged} flagged")
+    return 1 if flagged and not optimize else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+Performance Regression Report
+Stream-reads exported Firebase Performance traces and Analytics performance_metric events (CSV, JSON
+array or JSON lines, optionally gzipped), computes p50/p90/p99 duration per operation and app version
+from log-scaled histograms, and compares consecutive releases from logs/release_history.json.
+Memory stays bounded by the number of operation/version pairs, not the number of rows
+"""
+
+import argparse
+import csv
+import fnmatch
+import gzip
+import json
+import math
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+HISTORY_FILE = 'logs/release_history.json'
+PERCENTILES = (('p50', 0.50), ('p90', 0.90), ('p99', 0.99))
+
+# Histogram buckets: 32 per doubling from 0.1 ms (~1.1% relative error) up to ~1 hour
+MIN_MS = 0.1
+BUCKETS_PER_DOUBLING = 32
+BUCKET_COUNT = 1 + BUCKETS_PER_DOUBLING * 26
+CHUNK_ROWS = 1 << 18
+
+OPERATION_FIELDS = ('trace_name', 'operation', 'metric_name', 'event_name')
+VERSION_FIELDS = ('app_version', 'app_display_version', 'version')
+# PerformanceService names image traces after the file, which would give one operation per image
+OPERATION_GROUPS = [(re.compile(r'^image_load_.+'), 'image_load')]
+DEFAULT_KEY_OPERATIONS = ['app_startup', 'screen_load_*']
+
+Key = Tuple[str, str]
+
+
+def bucket_index(duration_ms: float) -> int:
+    if duration_ms <= MIN_MS:
+        return 0
+    return min(BUCKET_COUNT - 1, int(math.log2(duration_ms / MIN_MS) * BUCKETS_PER_DOUBLING) + 1)
+
+
+def bucket_value(index: int) -> float:
+    """Representative duration of a bucket (geometric midpoint)"""
+    if index == 0:
+        return MIN_MS
+    return MIN_MS * 2 ** ((index - 0.5) / BUCKETS_PER_DOUBLING)
+
+
+def group_operation(name: str) -> str:
+    for pattern, group in OPERATION_GROUPS:
+        if pattern.match(name):
+            return group
+    return name
+
+
+def _first(row: Dict, fields: Iterable[str]) -> Optional[str]:
+    for field in fields:
+        value = row.get(field)
+        if value not in (None, ''):
+            return str(value)
+    return None
+
+
+def _float(value: object) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def extract_sample(row: Dict) -> Optional[Tuple[str, str, float]]:
+    """(operation, version, duration_ms) from a flat export row or a BigQuery export record"""
+    if 'event_params' in row:
+        # Google Analytics BigQuery export: performance_metric events from AnalyticsService.trackPerformance
+        if row.get('event_name') != 'performance_metric':
+            return None
+        params = {}
+        for param in row.get('event_params') or []:
+            values = [v for v in (param.get('value') or {}).values() if v is not None]
+            params[param.get('key')] = values[0] if values else None
+        if params.get('unit', 'ms') != 'ms':
+            return None
+        operation, duration = params.get('metric_name'), _float(params.get('value'))
+        version = (row.get('app_info') or {}).get('version')
+    elif isinstance(row.get('trace_info'), dict):
+        # Firebase Performance BigQuery export: duration traces
+        operation, version = row.get('event_name'), row.get('app_display_version')
+        duration = _float(row['trace_info'].get('duration_us'))
+        duration = duration / 1000.0 if duration is not None else None
+    else:
+        operation, version = _first(row, OPERATION_FIELDS), _first(row, VERSION_FIELDS)
+        if row.get('duration_ms') not in (None, ''):
+            duration = _float(row['duration_ms'])
+        elif row.get('duration_us') not in (None, ''):
+            duration = _float(row['duration_us'])
+            duration = duration / 1000.0 if duration is not None else None
+        elif row.get('unit') in (None, '', 'ms'):
+            duration = _float(row.get('value'))
+        else:
+            duration = None
+
+    if not operation or not version or duration is None or not math.isfinite(duration) or duration < 0:
+        return None
+    return str(operation), str(version), duration
+
+
+def _open(path: str, binary: bool = False):
+    mode = 'rb' if binary else 'rt'
+    if path.endswith('.gz'):
+        return gzip.open(path, mode) if binary else gzip.open(path, mode, encoding='utf-8', newline='')
+    return open(path, mode) if binary else open(path, mode, encoding='utf-8', newline='')
+
+
+def iter_csv_samples(path: str) -> Iterator[Tuple[str, str, float]]:
+    """CSV rows read as tuples with column positions resolved once from the header"""
+    with _open(path) as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return
+        columns = {name.strip(): index for index, name in enumerate(header)}
+        operation = next((columns[name] for name in OPERATION_FIELDS if name in columns), None)
+        version = next((columns[name] for name in VERSION_FIELDS if name in columns), None)
+        if operation is None or version is None:
+            raise ValueError(f"{path}: needs an operation column ({', '.join(OPERATION_FIELDS)}) "
+                             f"and a version column ({', '.join(VERSION_FIELDS)})")
+        if 'duration_ms' in columns:
+            duration, scale, unit = columns['duration_ms'], 1.0, None
+        elif 'duration_us' in columns:
+            duration, scale, unit = columns['duration_us'], 0.001, None
+        elif 'value' in columns:
+            duration, scale, unit = columns['value'], 1.0, columns.get('unit')
+        else:
+            raise ValueError(f"{path}: needs a duration_ms, duration_us or value column")
+        width = max(operation, version, duration, unit if unit is not None else 0) + 1
+
+        for row in reader:
+            if len(row) < width or (unit is not None and row[unit] not in ('', 'ms')):
+                continue
+            try:
+                value = float(row[duration]) * scale
+            except ValueError:
+                continue
+            if row[operation] and row[version] and math.isfinite(value) and value >= 0:
+                yield row[operation], row[version], value
+
+
+def iter_json_samples(path: str) -> Iterator[Tuple[str, str, float]]:
+    """JSON lines, or a top-level JSON array (streamed with ijson, which is required for arrays)"""
+    with _open(path, binary=True) as f:
+        head = f.read(1)
+        while head and head.isspace():
+            head = f.read(1)
+        f.seek(0)
+        if head == b'[':
+            # Loading a whole export array would defeat the bounded memory of the histograms
+            if ijson is None:
+                raise RuntimeError(f"{path} is a JSON array export; install ijson (pip install ijson) "
+                                   f"to stream it, or export JSON lines")
+            rows = ijson.items(f, 'item', use_float=True)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            sample = extract_sample(row) if isinstance(row, dict) else None
+            if sample:
+                yield sample
+
+
+def iter_samples(path: str) -> Iterator[Tuple[str, str, float]]:
+    name = path[:-3] if path.endswith('.gz') else path
+    return iter_csv_samples(path) if name.endswith('.csv') else iter_json_samples(path)
+
+
+class DurationHistograms:
+    """Log-bucket duration histograms per (operation, version); vectorised with numpy when available"""
+
+    def __init__(self, group: bool = True):
+        self.group = group
+        self.keys: List[Key] = []
+        self.index: Dict[Key, int] = {}
+        # Ungrouped (operation, version) -> slot, so grouping patterns run once per distinct name
+        self.raw_index: Dict[Key, int] = {}
+        self.rows = 0
+        if np is not None:
+            self.counts = np.zeros((64, BUCKET_COUNT), dtype=np.int64)
+            self.sums = np.zeros(64, dtype=np.float64)
+        else:
+            self.counts = []
+            self.sums = []
+
+    def key_id(self, operation: str, version: str) -> int:
+        key_id = self.raw_index.get((operation, version))
+        if key_id is None:
+            key = (group_operation(operation) if self.group else operation, version)
+            key_id = self.raw_index[(operation, version)] = self.slot(key)
+        return key_id
+
+    def slot(self, key: Key) -> int:
+        key_id = self.index.get(key)
+        if key_id is None:
+            key_id = self.index[key] = len(self.keys)
+            self.keys.append(key)
+            if np is None:
+                self.counts.append([0] * BUCKET_COUNT)
+                self.sums.append(0.0)
+            elif key_id == len(self.sums):
+                self.counts = np.concatenate([self.counts, np.zeros_like(self.counts)])
+                self.sums = np.concatenate([self.sums, np.zeros_like(self.sums)])
+        return key_id
+
+    def add_samples(self, samples: Iterable[Tuple[str, str, float]]):
+        if np is None:
+            for operation, version, duration in samples:
+                key_id = self.key_id(operation, version)
+                self.counts[key_id][bucket_index(duration)] += 1
+                self.sums[key_id] += duration
+                self.rows += 1
+            return
+
+        key_ids: List[int] = []
+        durations: List[float] = []
+        for operation, version, duration in samples:
+            key_ids.append(self.key_id(operation, version))
+            durations.append(duration)
+            if len(durations) == CHUNK_ROWS:
+                self._flush(key_ids, durations)
+                key_ids, durations = [], []
+        if durations:
+            self._flush(key_ids, durations)
+
+    def _flush(self, key_ids: List[int], durations: List[float]):
+        keys = np.asarray(key_ids, dtype=np.int64)
+        values = np.asarray(durations, dtype=np.float64)
+        buckets = np.zeros(len(values), dtype=np.int64)
+        above = values > MIN_MS
+        buckets[above] = np.minimum(
+            BUCKET_COUNT - 1, (np.log2(values[above] / MIN_MS) * BUCKETS_PER_DOUBLING).astype(np.int64) + 1
+        )
+        size = len(self.keys)
+        self.counts[:size] += np.bincount(keys * BUCKET_COUNT + buckets,
+                                          minlength=size * BUCKET_COUNT).reshape(size, BUCKET_COUNT)
+        self.sums[:size] += np.bincount(keys, weights=values, minlength=size)
+        self.rows += len(values)
+
+    def merge(self, other: 'DurationHistograms'):
+        for key_id, key in enumerate(other.keys):
+            target = self.slot(key)
+            if np is None:
+                self.counts[target] = [a + b for a, b in zip(self.counts[target], other.counts[key_id])]
+            else:
+                self.counts[target] += other.counts[key_id]
+            self.sums[target] += other.sums[key_id]
+        self.rows += other.rows
+
+    def summary(self) -> Dict[str, Dict[str, Dict]]:
+        """operation -> version -> count, mean and percentiles (ms)"""
+        size = len(self.keys)
+        if size == 0:
+            return {}
+        if np is not None:
+            counts = self.counts[:size]
+            totals = counts.sum(axis=1)
+            cumulative = counts.cumsum(axis=1)
+            values = np.array([bucket_value(i) for i in range(BUCKET_COUNT)])
+            percentiles = {name: values[(cumulative >= np.ceil(totals * q)[:, None]).argmax(axis=1)]
+                           for name, q in PERCENTILES}
+            totals, sums = totals.tolist(), self.sums[:size].tolist()
+            percentiles = {name: column.tolist() for name, column in percentiles.items()}
+        else:
+            totals = [sum(row) for row in self.counts]
+            sums = self.sums
+            percentiles = {name: [] for name, _ in PERCENTILES}
+            for row, total in zip(self.counts, totals):
+                for name, q in PERCENTILES:
+                    target, running = math.ceil(total * q), 0
+                    for index, count in enumerate(row):
+                        running += count
+                        if running >= target:
+                            percentiles[name].append(bucket_value(index))
+                            break
+
+        result: Dict[str, Dict[str, Dict]] = {}
+        for key_id, (operation, version) in enumerate(self.keys):
+            stats = {'count': int(totals[key_id]), 'mean': round(sums[key_id] / max(1, totals[key_id]), 2)}
+            stats.update({name: round(percentiles[name][key_id], 2) for name, _ in PERCENTILES})
+            result.setdefault(operation, {})[version] = stats
+        return result
+
+
+def histograms_for_file(path: str, group: bool = True) -> DurationHistograms:
+    histograms = DurationHistograms(group)
+    histograms.add_samples(iter_samples(path))
+    return histograms
+
+
+def build_histograms(paths: List[str], group: bool = True, max_workers: Optional[int] = None) -> DurationHistograms:
+    """One histogram set per export file, in parallel when there are several, merged at the end"""
+    if len(paths) == 1:
+        return histograms_for_file(paths[0], group)
+    merged = DurationHistograms(group)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for histograms in executor.map(histograms_for_file, paths, [group] * len(paths)):
+            merged.merge(histograms)
+    return merged
+
+
+def version_sort_key(version: str) -> List:
+    return [(0, int(part)) if part.isdigit() else (1, part) for part in re.split(r'(\d+)', version) if part]
+
+
+def load_releases(history_file: str = HISTORY_FILE) -> List[Dict]:
+    """Released versions in release order, from PostDeploymentAutomation.log_metadata"""
+    if not os.path.exists(history_file):
+        return []
+    with open(history_file, 'r') as f:
+        history = json.load(f)
+    releases: Dict[str, Dict] = {}
+    for entry in history:
+        version = entry.get('version')
+        if not version:
+            continue
+        release = releases.setdefault(version, {'version': version, 'released_at': entry.get('timestamp', ''),
+                                                'platforms': []})
+        release['released_at'] = min(release['released_at'], entry.get('timestamp', '')) or release['released_at']
+        if entry.get('platform') and entry['platform'] not in release['platforms']:
+            release['platforms'].append(entry['platform'])
+    return sorted(releases.values(), key=lambda release: release['released_at'])
+
+
+def find_regressions(operations: Dict[str, Dict[str, Dict]], releases: List[Dict], metric: str = 'p90',
+                     threshold: float = 10.0, min_samples: int = 50,
+                     key_operations: Optional[List[str]] = None) -> List[Dict]:
+    """Compare each release with the closest earlier release that has enough samples per operation"""
+    key_operations = DEFAULT_KEY_OPERATIONS if key_operations is None else key_operations
+    if not releases:
+        # No release history: fall back to version order over the versions seen in the traces
+        versions = sorted({version for by_version in operations.values() for version in by_version},
+                          key=version_sort_key)
+        releases = [{'version': version, 'released_at': None, 'platforms': []} for version in versions]
+
+    report = []
+    previous_by_operation: Dict[str, Tuple[str, Dict]] = {}
+    for release in releases:
+        entry = {**release, 'operations': 0, 'regressions': []}
+        for operation, by_version in sorted(operations.items()):
+            stats = by_version.get(release['version'])
+            if not stats or stats['count'] < min_samples:
+                continue
+            entry['operations'] += 1
+            previous = previous_by_operation.get(operation)
+            previous_by_operation[operation] = (release['version'], stats)
+            if not previous or previous[1][metric] <= 0:
+                continue
+            change = (stats[metric] - previous[1][metric]) / previous[1][metric] * 100
+            if change > threshold:
+                entry['regressions'].append({
+                    'operation': operation,
+                    'metric': metric,
+                    'previous_version': previous[0],
+                    'previous_ms': previous[1][metric],
+                    'current_ms': stats[metric],
+                    'change_percent': round(change, 1),
+                    'key': any(fnmatch.fnmatch(operation, pattern) for pattern in key_operations),
+                })
+        report.append(entry)
+    return report
+
+
+def expand_inputs(inputs: List[str]) -> List[str]:
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for name in sorted(os.listdir(item)):
+                base = name[:-3] if name.endswith('.gz') else name
+                if base.endswith(('.csv', '.json', '.jsonl', '.ndjson')):
+                    paths.append(os.path.join(item, name))
+        else:
+            paths.append(item)
+    return paths
+
+
+def print_report(releases: List[Dict], metric: str):
+    print(f"\n📈 Release performance ({metric}, regressions only)")
+    for release in releases:
+        key_regressions = [r for r in release['regressions'] if r['key']]
+        icon = '🚨' if key_regressions else ('⚠️' if release['regressions'] else '✅')
+        released = f" ({release['released_at'][:10]})" if release.get('released_at') else ''
+        print(f"{icon} v{release['version']}{released}: {release['operations']} operations, "
+              f"{len(release['regressions'])} regressed")
+        for regression in sorted(release['regressions'], key=lambda r: (not r['key'], -r['change_percent'])):
+            marker = ' [key]' if regression['key'] else ''
+            print(f"   - {regression['operation']}{marker}: {regression['previous_ms']:.1f} → "
+                  f"{regression['current_ms']:.1f} ms (+{regression['change_percent']}% vs "
+                  f"v{regression['previous_version']})")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Per-release performance percentiles and regressions')
+    parser.add_argument('inputs', nargs='+', help='export files or directories (.csv/.json/.jsonl, optionally .gz)')
+    parser.add_argument('--history', default=HISTORY_FILE, help='release history JSON')
+    parser.add_argument('--metric', choices=[name for name, _ in PERCENTILES], default='p90')
+    parser.add_argument('--threshold', type=float, default=10.0, help='regression threshold in percent')
+    parser.add_argument('--min-samples', type=int, default=50, help='ignore operation/version pairs with fewer')
+    parser.add_argument('--key-operation', action='append',
+                        help=f"operation pattern whose regression fails --check "
+                             f"(default: {', '.join(DEFAULT_KEY_OPERATIONS)})")
+    parser.add_argument('--no-group', action='store_true', help='keep per-image image_load_* operations')
+    parser.add_argument('--json', action='store_true', help='print the full report as JSON')
+    parser.add_argument('--check', action='store_true',
+                        help='exit 1 when a key operation regressed in the checked release')
+    parser.add_argument('--version', help='release gated by --check (default: the newest release)')
+    args = parser.parse_args(argv)
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        print("❌ No export files found")
+        return 1
+
+    try:
+        histograms = build_histograms(paths, group=not args.no_group)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    operations = histograms.summary()
+    releases = find_regressions(operations, load_releases(args.history), args.metric, args.threshold,
+                                args.min_samples, args.key_operation)
+
+    if args.json:
+        print(json.dumps({'rows': histograms.rows, 'files': paths, 'operations': operations,
+                          'releases': releases}, indent=2))
+    else:
+        engine = 'numpy' if np is not None else 'pure Python'
+        print(f"📊 {histograms.rows:,} samples from {len(paths)} file(s), "
+              f"{len(operations)} operations ({engine})")
+        print_report(releases, args.metric)
+
+    if not args.check or not releases:
+        return 0
+    # Earlier releases' regressions are history; only the release being shipped can fail the gate
+    checked = next((release for release in releases if release['version'] == args.version), None) \
+        if args.version else releases[-1]
+    if checked is None:
+        print(f"❌ Version {args.version} not found in the release history or exports")
+        return 1
+    return 1 if any(r['key'] for r in checked['regressions']) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Pipeline Runner
+Runs the local CI pipeline as a step graph: independent steps run in parallel within a core budget,
+and a step whose inputs hash the same as on its last successful run is skipped with its previous result
+"""
+
+import argparse
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+from file_cache import CACHE_DIR, FileHashCache
+
+PIPELINE_CACHE_VERSION = '2'
+STEP_RESULTS_FILE = os.path.join(CACHE_DIR, 'pipeline_steps.json')
+LOG_DIR = 'logs/pipeline'
+# Directories that are tool output or caches, never step inputs
+SKIPPED_DIRS = {'.git', '.dart_tool', '.idea', '.vscode', '.gradle', '.symlinks', '.artifact_store',
+                'build', 'coverage', 'logs', 'Pods', 'ephemeral', 'node_modules', '__pycache__'}
+GENERATED_PATTERNS = ['*.g.dart', '*.freezed.dart', '*.gr.dart']
+# Sources build_runner generates from: the ones declaring a generated part file
+CODEGEN_PART_RE = re.compile(r"^part\s+['\"]([^'\"]+\.(?:g|freezed|gr)\.dart)['\"]", re.MULTILINE)
+ANALYZE_ISSUE_RE = re.compile(r'^\s*(error|warning|info)\s+[•-]\s', re.MULTILINE)
+
+DART_SOURCES = ['lib/*.dart', 'test/*.dart', 'bin/*.dart', 'integration_test/*.dart']
+PUB_INPUTS = ['pubspec.yaml', 'pubspec.lock']
+APP_INPUTS = ['lib/*', 'assets/*', 'l10n.yaml'] + PUB_INPUTS
+
+# Step graph. needs: steps that must finish first; inputs/exclude: fnmatch patterns (relative, '*'
+# spans directories) whose content keys the cache; outputs: files that must still exist for a cache hit
+# (codegen_sources steps also need every declared part file, since generated files are not committed);
+# cores: share of the core budget; blocking: a failure fails the run and skips dependent steps;
+# rewrites_inputs: the step edits its own inputs, so its cache key is taken after it ran;
+# cache: False always runs the step
+STEPS = [
+    {'name': 'pub_get', 'command': ['flutter', 'pub', 'get'],
+     'inputs': PUB_INPUTS, 'outputs': ['.dart_tool/package_config.json'], 'cores': 1, 'blocking': True},
+    {'name': 'build_runner', 'command': ['dart', 'run', 'build_runner', 'build', '--delete-conflicting-outputs'],
+     'needs': ['pub_get'], 'inputs': ['build.yaml'] + PUB_INPUTS, 'codegen_sources': True,
+     'cores': 2, 'blocking': True},
+    {'name': 'format', 'command': ['dart', 'format', '.'],
+     'needs': ['build_runner'], 'inputs': DART_SOURCES, 'cores': 1, 'rewrites_inputs': True},
+    {'name': 'import_sorter', 'command': ['dart', 'run', 'import_sorter:main', '--no-comments'],
+     'needs': ['format'], 'inputs': DART_SOURCES + ['import_sorter.yaml', 'pubspec.yaml'],
+     'exclude': GENERATED_PATTERNS, 'cores': 1, 'rewrites_inputs': True},
+    # One run reports errors, warnings and infos; --no-fatal-* keeps the exit code for real failures
+    {'name': 'analyze', 'command': ['flutter', 'analyze', '--no-fatal-infos', '--no-fatal-warnings'],
+     'needs': ['import_sorter'], 'inputs': DART_SOURCES + ['analysis_options.yaml'] + PUB_INPUTS,
+     'cores': 2, 'summary': 'analyze'},
+    {'name': 'dependency_validator', 'command': ['dart', 'run', 'dependency_validator'],
+     'needs': ['import_sorter'], 'inputs': DART_SOURCES + PUB_INPUTS + ['dart_dependency_validator.yaml'],
+     'cores': 1},
+    {'name': 'test', 'command': ['flutter', 'test', '--coverage', '--concurrency={cores}'],
+     'needs': ['import_sorter'], 'inputs': DART_SOURCES + APP_INPUTS, 'outputs': ['coverage/lcov.info'],
+     'cores': 4, 'blocking': True},
+    {'name': 'build_apk', 'command': ['flutter', 'build', 'apk', '--debug'],
+     'needs': ['import_sorter'], 'inputs': APP_INPUTS + ['android/*'],
+     'outputs': ['build/app/outputs/flutter-apk/app-debug.apk'], 'cores': 4},
+    {'name': 'build_web', 'command': ['flutter', 'build', 'web'],
+     'needs': ['import_sorter'], 'inputs': APP_INPUTS + ['web/*'], 'outputs': ['build/web/main.dart.js'],
+     'cores': 2},
+    {'name': 'build_ios', 'command': ['flutter', 'build', 'ios', '--no-codesign'],
+     'needs': ['import_sorter'], 'inputs': APP_INPUTS + ['ios/*'], 'outputs': ['build/ios/iphoneos/Runner.app'],
+     'cores': 4, 'platforms': ['darwin']},
+    {'name': 'coverage', 'command': [sys.executable, 'scripts/coverage_delta.py'],
+     'needs': ['test'], 'cores': 1, 'cache': False},
+]
+
+STATUS_ICONS = {'ok': '✅', 'warning': '⚠️', 'failed': '❌', 'cached': '♻️', 'blocked': '⏭️', 'unsupported': '➖'}
+
+
+def select_steps(only: List[str], skip: List[str]) -> List[Dict]:
+    """Steps to run in declaration order: the --only steps plus everything they need, minus --skip"""
+    by_name = {step['name']: step for step in STEPS}
+    unknown = [name for name in only + skip if name not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown step(s): {', '.join(unknown)} (choose from {', '.join(by_name)})")
+    if only:
+        selected = set()
+        stack = list(only)
+        while stack:
+            name = stack.pop()
+            if name not in selected:
+                selected.add(name)
+                stack.extend(by_name[name].get('needs', []))
+    else:
+        selected = set(by_name)
+    return [step for step in STEPS if step['name'] in selected and step['name'] not in skip]
+
+
+def summarize_analyze(output: str) -> str:
+    counts = {'error': 0, 'warning': 0, 'info': 0}
+    for level in ANALYZE_ISSUE_RE.findall(output):
+        counts[level] += 1
+    if not any(counts.values()):
+        return 'No issues found'
+    return ', '.join(f"{count} {level}{'s' if count != 1 else ''}" for level, count in counts.items())
+
+
+def last_line(output: str) -> str:
+    # Skip separator rules so reports ending in a ==== banner summarise by their last real line
+    lines = [line.strip() for line in output.splitlines() if line.strip().strip('=-')]
+    return lines[-1][:100] if lines else ''
+
+
+def run_command(name: str, command: List[str]) -> Dict:
+    """Run one step with its output captured to logs/pipeline/<step>.log (runs in a worker thread)"""
+    started = time.monotonic()
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_path = os.path.join(LOG_DIR, f"{name}.log")
+    try:
+        completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   stdin=subprocess.DEVNULL)
+        output = completed.stdout.decode('utf-8', errors='replace')
+        returncode = completed.returncode
+    except OSError as e:
+        output = f"{e}\n"
+        returncode = 127
+    with open(log_path, 'w') as f:
+        f.write(f"$ {' '.join(command)}\n{output}")
+    return {'returncode': returncode, 'output': output, 'log': log_path,
+            'duration': time.monotonic() - started}
+
+
+class PipelineRunner:
+    def __init__(self, steps: List[Dict], cores: Optional[int] = None, use_cache: bool = True,
+                 verbose: bool = False):
+        self.steps = steps
+        self.cores = max(1, cores or os.cpu_count() or 1)
+        self.use_cache = use_cache
+        self.verbose = verbose
+        self.hashes = FileHashCache('pipeline_inputs', version=PIPELINE_CACHE_VERSION)
+        self.previous = self.load_results()
+        self.results: Dict[str, Dict] = {}
+        self.seen_paths = set()
+        # Part files declared by the codegen sources of each codegen_sources step, found by input_key
+        self.generated_parts: Dict[str, List[str]] = {}
+
+    def load_results(self) -> Dict[str, Dict]:
+        try:
+            with open(STEP_RESULTS_FILE, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == PIPELINE_CACHE_VERSION:
+                return data.get('steps', {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def save_results(self):
+        """Keep the last good run of every step, including steps this run did not select"""
+        steps = dict(self.previous)
+        for name, result in self.results.items():
+            if result['status'] in ('ok', 'warning'):
+                steps[name] = {key: result[key] for key in ('key', 'status', 'summary', 'duration')}
+            elif result['status'] == 'failed':
+                steps.pop(name, None)
+        os.makedirs(os.path.dirname(STEP_RESULTS_FILE), exist_ok=True)
+        temporary = f"{STEP_RESULTS_FILE}.{os.getpid()}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump({'version': PIPELINE_CACHE_VERSION, 'steps': steps}, f, indent=2, sort_keys=True)
+        os.replace(temporary, STEP_RESULTS_FILE)
+
+    def list_files(self) -> List[str]:
+        paths = []
+        for root, dirs, files in os.walk('.'):
+            dirs[:] = sorted(d for d in dirs if d not in SKIPPED_DIRS)
+            for name in sorted(files):
+                paths.append(os.path.relpath(os.path.join(root, name)).replace(os.sep, '/'))
+        self.seen_paths.update(paths)
+        return paths
+
+    def file_info(self, path: str) -> Tuple[str, Dict]:
+        """(sha256, {'codegen': bool, 'parts': [...]}) with the hash and content scan reused while unchanged"""
+        fingerprint, info = self.hashes.lookup(path)
+        if info is None:
+            info = {}
+            if path.endswith('.dart'):
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    info['parts'] = CODEGEN_PART_RE.findall(f.read())
+                info['codegen'] = bool(info['parts'])
+            self.hashes.store(path, fingerprint, info)
+        return fingerprint['sha256'], info
+
+    def input_key(self, step: Dict) -> str:
+        """Hash of the step definition and the content of every input file, computed once its needs are done"""
+        digest = hashlib.sha256(json.dumps([PIPELINE_CACHE_VERSION, step['command']]).encode())
+        include = step.get('inputs', [])
+        exclude = step.get('exclude', [])
+        parts = []
+        for path in self.list_files():
+            if any(fnmatch.fnmatch(path, pattern) for pattern in exclude):
+                continue
+            matched = any(fnmatch.fnmatch(path, pattern) for pattern in include)
+            if not matched and not step.get('codegen_sources'):
+                continue
+            sha256, info = self.file_info(path)
+            if matched or (path.startswith('lib/') and info.get('codegen')):
+                digest.update(f"{path}\0{sha256}\n".encode())
+            if step.get('codegen_sources') and path.startswith('lib/'):
+                parts.extend(os.path.join(os.path.dirname(path), part) for part in info.get('parts', []))
+        if step.get('codegen_sources'):
+            self.generated_parts[step['name']] = parts
+        return digest.hexdigest()
+
+    def outputs_present(self, step: Dict) -> bool:
+        return (all(glob.glob(pattern) for pattern in step.get('outputs', []))
+                and all(os.path.exists(path) for path in self.generated_parts.get(step['name'], [])))
+
+    def command_for(self, step: Dict) -> List[str]:
+        cores = str(self.step_cores(step))
+        return [part.replace('{cores}', cores) for part in step['command']]
+
+    def step_cores(self, step: Dict) -> int:
+        return min(step.get('cores', 1), self.cores)
+
+    def finish(self, step: Dict, status: str, key: Optional[str] = None, summary: str = '',
+               duration: float = 0.0, log: Optional[str] = None):
+        self.results[step['name']] = {'status': status, 'key': key, 'summary': summary,
+                                      'duration': duration, 'log': log}
+        icon = STATUS_ICONS[status]
+        timing = f" ({duration:.1f}s)" if status in ('ok', 'warning', 'failed') else ''
+        print(f"{icon} {step['name']}{timing}{': ' + summary if summary else ''}")
+
+    def prepare(self, step: Dict) -> Optional[str]:
+        """Resolve a ready step without running it; returns its input key when it has to run"""
+        platforms = step.get('platforms')
+        if platforms and not any(sys.platform.startswith(platform) for platform in platforms):
+            self.finish(step, 'unsupported', summary=f"only runs on {', '.join(platforms)}")
+            return None
+
+        key = self.input_key(step)
+        previous = self.previous.get(step['name'])
+        if (self.use_cache and step.get('cache', True) and previous and previous.get('key') == key
+                and self.outputs_present(step)):
+            self.results[step['name']] = {'status': 'cached', 'key': key, 'summary': previous.get('summary', ''),
+                                          'duration': 0.0, 'log': None,
+                                          'cached_duration': previous.get('duration', 0.0),
+                                          'cached_status': previous.get('status', 'ok')}
+            print(f"♻️ {step['name']}: inputs unchanged since the last {previous.get('status', 'ok')} run "
+                  f"({previous.get('duration', 0.0):.1f}s saved)")
+            return None
+        return key
+
+    def complete(self, step: Dict, key: str, outcome: Dict):
+        output = outcome['output']
+        summary = summarize_analyze(output) if step.get('summary') == 'analyze' else last_line(output)
+        if outcome['returncode'] == 0:
+            if step.get('rewrites_inputs'):
+                key = self.input_key(step)
+            self.finish(step, 'ok', key, summary, outcome['duration'], outcome['log'])
+        else:
+            status = 'failed' if step.get('blocking') else 'warning'
+            self.finish(step, status, key, summary, outcome['duration'], outcome['log'])
+            if status == 'failed' or self.verbose:
+                tail = output.rstrip().splitlines()[-15:]
+                for line in tail:
+                    print(f"   │ {line}")
+                print(f"   └ full log: {outcome['log']}")
+
+    def run(self) -> bool:
+        """Run the selected steps; returns False when a blocking step failed"""
+        started = time.monotonic()
+        names = {step['name'] for step in self.steps}
+        waiting = list(self.steps)
+        ready: List[Tuple[Dict, str]] = []
+        running = {}
+        cores_in_use = 0
+        print(f"🚀 Running {len(self.steps)} pipeline steps with a budget of {self.cores} cores")
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(self.steps) or 1) as executor:
+                while waiting or ready or running:
+                    progressed = False
+                    for step in list(waiting):
+                        needs = [name for name in step.get('needs', []) if name in names]
+                        if any(self.results.get(name, {}).get('status') in ('failed', 'blocked') for name in needs):
+                            waiting.remove(step)
+                            self.finish(step, 'blocked', summary='a step it needs failed')
+                            progressed = True
+                        elif all(name in self.results for name in needs):
+                            waiting.remove(step)
+                            progressed = True
+                            key = self.prepare(step)
+                            if key is not None:
+                                ready.append((step, key))
+
+                    # Longest step first (by its last run) so tests and builds are not starved by small steps
+                    ready.sort(key=lambda item: (-self.previous.get(item[0]['name'], {}).get('duration', 0.0),
+                                                 -self.step_cores(item[0])))
+                    while ready:
+                        step, key = ready[0]
+                        cores = self.step_cores(step)
+                        if running and cores_in_use + cores > self.cores:
+                            break
+                        ready.pop(0)
+                        command = self.command_for(step)
+                        print(f"▶️  {step['name']}: {' '.join(command)}")
+                        running[executor.submit(run_command, step['name'], command)] = (step, key, cores)
+                        cores_in_use += cores
+
+                    if progressed or not running:
+                        continue
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        step, key, cores = running.pop(future)
+                        cores_in_use -= cores
+                        self.complete(step, key, future.result())
+        finally:
+            self.hashes.prune(self.seen_paths)
+            self.hashes.save()
+            self.save_results()
+
+        self.display_summary(time.monotonic() - started)
+        return not any(result['status'] in ('failed', 'blocked') for result in self.results.values())
+
+    def display_summary(self, elapsed: float):
+        print("\n" + "="*72)
+        print("⏱️  PIPELINE TIMING SUMMARY")
+        print("="*72)
+        serial = 0.0
+        saved = 0.0
+        for step in self.steps:
+            result = self.results.get(step['name'])
+            if not result:
+                continue
+            if result['status'] == 'cached':
+                saved += result['cached_duration']
+                timing = f"cached ({result['cached_duration']:.1f}s)"
+            elif result['status'] in ('blocked', 'unsupported'):
+                timing = 'skipped'
+            else:
+                serial += result['duration']
+                timing = f"{result['duration']:.1f}s"
+            print(f"{STATUS_ICONS[result['status']]} {step['name']:<22}{timing:>18}  {result['summary'][:60]}")
+        print("-"*72)
+        print(f"Wall time: {elapsed:.1f}s | step time: {serial:.1f}s "
+              f"(parallel speedup {serial / elapsed if elapsed else 1:.1f}x) | skipped by cache: {saved:.1f}s")
+        failed = [name for name, result in self.results.items() if result['status'] in ('failed', 'blocked')]
+        if failed:
+            print(f"❌ Pipeline failed: {', '.join(failed)}")
+        else:
+            print("🎉 Pipeline passed")
+        print("="*72 + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Cached, parallel local CI pipeline')
+    parser.add_argument('--cores', type=int, default=int(os.getenv('PIPELINE_CORES', '0')) or None,
+                        help='core budget shared by parallel steps (default: all cores)')
+    parser.add_argument('--only', action='append', default=[], metavar='STEP',
+                        help='run only this step and the steps it needs (repeatable)')
+    parser.add_argument('--skip', action='append', default=[], metavar='STEP', help='leave out a step (repeatable)')
+    parser.add_argument('--no-cache', action='store_true', help='run every step even when its inputs are unchanged')
+    parser.add_argument('--verbose', action='store_true', help='show output of non-blocking failures too')
+    parser.add_argument('--list', action='store_true', help='show the step graph and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for step in STEPS:
+            needs = ', '.join(step.get('needs', [])) or '-'
+            print(f"{step['name']:<22} needs: {needs:<16} cores: {step.get('cores', 1)}"
+                  f"{'  blocking' if step.get('blocking') else ''}")
+        return 0
+
+    try:
+        steps = select_steps(args.only, args.skip)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    runner = PipelineRunner(steps, args.cores, use_cache=not args.no_cache, verbose=args.verbose)
+    return 0 if runner.run() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
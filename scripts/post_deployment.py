@@ -8,33 +8,49 @@ import os
 import json
 import csv
 import subprocess
-import requests
 from datetime import datetime
 from typing import Dict, List, Optional
 import yaml
 
+from http_utils import post_with_retry
+from bundle_size_analyzer import (PLATFORM_ANALYSIS_PREFIXES, analyze as analyze_code_size,
+                                  find_latest_analysis, save_summary)
+from size_ledger import SizeLedger, measure_artifacts
+from artifact_fingerprint import fingerprint_paths, without_file_lists
+from artifact_store import ArtifactStore
+from branch_classifier import classify_branch, normalize_environment
+from pubspec_lock_diff import LOCK_FILE, release_notes_diff
+from qa_automation import CHECKLIST_ITEMS
+from release_metrics import ARTIFACT_SIZE, git_timer, stage, timed_stage
+from release_notes_index import update_index
+from slack_templates import RELEASE_TEMPLATE, platform_slots
+
 class PostDeploymentAutomation:
     def __init__(self, platform: str, version: str, build_number: str, environment: str = None):
         self.platform = platform.lower()
         self.version = version
         self.build_number = build_number
-        self.environment = environment or self.determine_environment()
+        self.environment = normalize_environment(environment) if environment else self.determine_environment()
         self.timestamp = datetime.now().isoformat()
         self.commit_hash = self.get_commit_hash()
         self.branch_name = self.get_branch_name()
         self.triggered_by = self.get_triggered_by()
+        self.artifacts = None
+        self.fingerprints = None
 
     def get_commit_hash(self) -> str:
         """Get current commit hash"""
         try:
-            return subprocess.check_output(['git', 'rev-parse', 'HEAD']).decode().strip()
+            with git_timer('rev-parse'):
+                return subprocess.check_output(['git', 'rev-parse', 'HEAD']).decode().strip()
         except:
             return "unknown"
 
     def get_branch_name(self) -> str:
         """Get current branch name"""
         try:
-            return subprocess.check_output(['git', 'rev-parse', '--abbrev-ref', 'HEAD']).decode().strip()
+            with git_timer('rev-parse'):
+                return subprocess.check_output(['git', 'rev-parse', '--abbrev-ref', 'HEAD']).decode().strip()
         except:
             return os.getenv('GITHUB_REF_NAME', 'unknown')
 
@@ -43,96 +59,66 @@ class PostDeploymentAutomation:
         return os.getenv('GITHUB_ACTOR', 'automated')
 
     def determine_environment(self) -> str:
-        """Determine environment based on branch name"""
-        branch = self.get_branch_name().lower()
-
-        if branch.startswith('release/') or branch == 'main':
-            return 'production'
-        elif branch in ['development', 'develop', 'dev'] or branch.startswith('qa/'):
-            return 'staging'
-        else:
-            return 'development'
+        """Determine environment based on branch name (rules in config/branch_environments.yaml)"""
+        return classify_branch(self.get_branch_name())
 
     def generate_changelog(self) -> str:
         """Generate changelog from git commits since last release"""
         try:
             # Get last release tag
-            last_tag = subprocess.check_output(['git', 'describe', '--tags', '--abbrev=0']).decode().strip()
+            with git_timer('describe'):
+                last_tag = subprocess.check_output(['git', 'describe', '--tags', '--abbrev=0']).decode().strip()
             # Get commits since last tag
-            commits = subprocess.check_output([
-                'git', 'log', f'{last_tag}..HEAD', '--pretty=format:- %s (%h)'
-            ]).decode().strip()
+            with git_timer('log'):
+                commits = subprocess.check_output([
+                    'git', 'log', f'{last_tag}..HEAD', '--pretty=format:- %s (%h)'
+                ]).decode().strip()
             return commits if commits else "- Initial release"
         except:
             # If no previous tags, get recent commits
             try:
-                commits = subprocess.check_output([
-                    'git', 'log', '--oneline', '-10', '--pretty=format:- %s (%h)'
-                ]).decode().strip()
+                with git_timer('log'):
+                    commits = subprocess.check_output([
+                        'git', 'log', '--oneline', '-10', '--pretty=format:- %s (%h)'
+                    ]).decode().strip()
                 return commits
             except:
                 return "- No changelog available"
 
-    def send_slack_notification(self):
-        """Send release notification to Slack"""
+    def send_slack_notification(self) -> Optional[bool]:
+        """Send release notification to Slack; None when no webhook is configured"""
         webhook_url = os.getenv('SLACK_WEBHOOK_URL')
         if not webhook_url:
             print("⚠️ SLACK_WEBHOOK_URL not configured")
-            return
+            return None
 
         changelog = self.generate_changelog()
-        platform_emoji = "🍎" if self.platform == "ios" else "🤖"
-        store_name = "TestFlight" if self.platform == "ios" else "Play Store Internal"
         env_emoji = {"production": "🚀", "staging": "🧪", "development": "🔧"}.get(self.environment, "🔧")
 
-        message = {
-            "text": f"{platform_emoji} New {self.platform.upper()} Release Available!",
-            "blocks": [
-                {
-                    "type": "header",
-                    "text": {
-                        "type": "plain_text",
-                        "text": f"{env_emoji} {self.platform.upper()} Release - v{self.version} ({self.environment.upper()})"
-                    }
-                },
-                {
-                    "type": "section",
-                    "fields": [
-                        {"type": "mrkdwn", "text": f"*Version:* {self.version}"},
-                        {"type": "mrkdwn", "text": f"*Build:* {self.build_number}"},
-                        {"type": "mrkdwn", "text": f"*Environment:* {self.environment.upper()}"},
-                        {"type": "mrkdwn", "text": f"*Platform:* {store_name}"},
-                        {"type": "mrkdwn", "text": f"*Branch:* {self.branch_name}"},
-                        {"type": "mrkdwn", "text": f"*Commit:* {self.commit_hash[:8]}"},
-                        {"type": "mrkdwn", "text": f"*Triggered by:* {self.triggered_by}"},
-                        {"type": "mrkdwn", "text": f"*Upload time:* {self.timestamp}"}
-                    ]
-                },
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"*📝 What's New:*\n```{changelog}```"
-                    }
-                },
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"*📱 Download Instructions:*\n{self.get_download_instructions()}"
-                    }
-                }
-            ]
-        }
+        message = RELEASE_TEMPLATE.render(
+            **platform_slots(self.platform),
+            version=self.version,
+            build_number=self.build_number,
+            environment=self.environment.upper(),
+            env_emoji=env_emoji,
+            branch_name=self.branch_name,
+            commit=self.commit_hash[:8],
+            triggered_by=self.triggered_by,
+            timestamp=self.timestamp,
+            changelog=changelog,
+            download_instructions=self.get_download_instructions()
+        )
 
         try:
-            response = requests.post(webhook_url, json=message)
+            response = post_with_retry(webhook_url, data=message.encode('utf-8'),
+                                       headers={'Content-Type': 'application/json'})
             if response.status_code == 200:
                 print("✅ Slack notification sent successfully")
-            else:
-                print(f"❌ Failed to send Slack notification: {response.status_code}")
+                return True
+            print(f"❌ Failed to send Slack notification: {response.status_code}")
         except Exception as e:
             print(f"❌ Error sending Slack notification: {e}")
+        return False
 
     def get_download_instructions(self) -> str:
         """Get platform-specific download instructions"""
@@ -141,6 +127,10 @@ class PostDeploymentAutomation:
         else:
             return "• Open Play Console Internal Testing link\n• Download and install the latest AAB\n• Test on your Android device"
 
+    def release_date(self) -> str:
+        """Release date shown in the release notes"""
+        return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
     def create_release_notes(self):
         """Create/update release notes document"""
         changelog = self.generate_changelog()
@@ -149,7 +139,7 @@ class PostDeploymentAutomation:
 ## 📱 {self.platform.upper()} Release
 - **Version:** {self.version}
 - **Build Number:** {self.build_number}
-- **Release Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+- **Release Date:** {self.release_date()}
 - **Platform:** {self.platform.upper()}
 - **Branch:** {self.branch_name}
 - **Commit:** {self.commit_hash}
@@ -161,6 +151,12 @@ class PostDeploymentAutomation:
 ## 📱 Download
 {self.get_download_instructions()}
 
+## 📦 Dependencies
+{self.dependency_changes()}
+
+## 🔐 Artifacts
+{self.get_artifact_summary()}
+
 ## 🧪 QA Checklist
 - [ ] App launches successfully
 - [ ] Core functionality works
@@ -180,12 +176,74 @@ class PostDeploymentAutomation:
         with open(filename, 'w') as f:
             f.write(release_notes)
         print(f"✅ Release notes created: {filename}")
+        self.index_release_notes()
 
         return release_notes
 
-    def log_metadata(self):
-        """Log release metadata for historical tracking"""
-        metadata = {
+    def dependency_changes(self) -> str:
+        """Dependency table since the previous release of this platform, with code size change when measured"""
+        try:
+            with git_timer('describe'):
+                previous_tag = subprocess.check_output(
+                    ['git', 'describe', '--tags', '--abbrev=0', '--match', f'release-{self.platform}-v*'],
+                    stderr=subprocess.DEVNULL
+                ).decode().strip()
+        except (subprocess.CalledProcessError, OSError):
+            return "No previous release to compare."
+        try:
+            analysis = find_latest_analysis(self.platform) if self.platform in PLATFORM_ANALYSIS_PREFIXES else None
+            return release_notes_diff(previous_tag, LOCK_FILE, analysis)
+        except Exception as e:
+            print(f"⚠️ Could not diff dependencies: {e}")
+            return "Dependency changes not available."
+
+    def index_release_notes(self):
+        """Refresh docs/releases/INDEX.md and the search index (only changed notes are re-read)"""
+        try:
+            stats = update_index()
+            print(f"✅ Release notes index updated: {stats['notes']} releases")
+        except Exception as e:
+            print(f"⚠️ Could not update release notes index: {e}")
+
+    def collect_artifact_metadata(self) -> Dict[str, Dict]:
+        """Measure and fingerprint the uploaded artifacts once (size, components and digests)"""
+        if self.artifacts is None:
+            try:
+                self.artifacts = measure_artifacts(self.platform)
+                self.fingerprints = fingerprint_paths(
+                    {name: details['path'] for name, details in self.artifacts.items()}
+                )
+                for name, digests in without_file_lists(self.fingerprints).items():
+                    self.artifacts[name].update({
+                        key: digests[key] for key in ('sha256', 'blake2b_tree', 'blake2b_manifest')
+                        if key in digests
+                    })
+            except Exception as e:
+                print(f"⚠️ Could not measure build artifacts: {e}")
+                self.artifacts = {}
+            for name, details in self.artifacts.items():
+                ARTIFACT_SIZE.set(details['size'], platform=self.platform, artifact=name)
+        return self.artifacts
+
+    def get_artifact_summary(self) -> str:
+        """Markdown list of artifact sizes and digests for the release notes"""
+        artifacts = self.collect_artifact_metadata()
+        if not artifacts:
+            return "- No build artifacts found"
+        lines = []
+        for name, details in sorted(artifacts.items()):
+            lines.append(f"- **{name}** ({details['size']:,} bytes)")
+            if 'sha256' in details:
+                lines.append(f"  - SHA-256: `{details['sha256']}`")
+            if 'blake2b_tree' in details:
+                lines.append(f"  - BLAKE2b tree: `{details['blake2b_tree']}`")
+            if 'blake2b_manifest' in details:
+                lines.append(f"  - BLAKE2b manifest: `{details['blake2b_manifest']}`")
+        return "\n".join(lines)
+
+    def release_metadata(self) -> Dict[str, str]:
+        """One release history row (without artifacts)"""
+        return {
             'timestamp': self.timestamp,
             'platform': self.platform,
             'version': self.version,
@@ -196,6 +254,10 @@ class PostDeploymentAutomation:
             'status': 'success'
         }
 
+    def log_metadata(self):
+        """Log release metadata for historical tracking"""
+        metadata = self.release_metadata()
+
         # JSON log
         os.makedirs('logs', exist_ok=True)
         json_file = 'logs/release_history.json'
@@ -206,7 +268,8 @@ class PostDeploymentAutomation:
             with open(json_file, 'r') as f:
                 history = json.load(f)
 
-        history.append(metadata)
+        artifacts = self.collect_artifact_metadata()
+        history.append({**metadata, 'artifacts': artifacts})
 
         with open(json_file, 'w') as f:
             json.dump(history, f, indent=2)
@@ -223,18 +286,64 @@ class PostDeploymentAutomation:
 
         print(f"✅ Metadata logged to {json_file} and {csv_file}")
 
-    def create_git_tag(self):
+        # Size ledger (feeds the size budget gate and trend queries)
+        if artifacts:
+            SizeLedger().record(self.version, self.build_number, self.platform, self.commit_hash, artifacts)
+            print(f"✅ Artifact sizes recorded in size ledger")
+
+        self.store_size_summary()
+
+    def store_size_summary(self):
+        """Keep this build's --analyze-size breakdown as logs/bundle_size/v<version>-<platform>.json"""
+        if self.platform not in PLATFORM_ANALYSIS_PREFIXES:
+            return  # flutter build web has no --analyze-size
+        source = find_latest_analysis(self.platform)
+        if not source:
+            print(f"ℹ️  No {self.platform} --analyze-size output found; size summary not stored")
+            return
+        try:
+            target = save_summary(analyze_code_size(source), self.version, self.platform)
+            print(f"✅ Size summary stored: {target}")
+        except Exception as e:
+            print(f"⚠️ Could not store size summary: {e}")
+
+    def store_artifacts(self) -> Optional[bool]:
+        """Keep this release's artifacts in the content-addressed artifact store; None when there are none"""
+        artifacts = self.collect_artifact_metadata()
+        if not artifacts:
+            print("⚠️ No build artifacts to store")
+            return None
+
+        try:
+            store = ArtifactStore()
+            stats = store.ingest_release(
+                self.platform, self.version, self.build_number, self.commit_hash,
+                {name: details['path'] for name, details in artifacts.items()},
+                self.fingerprints
+            )
+            print(f"✅ Artifacts stored in {store.root}: {stats['bytes_stored']:,} new bytes, "
+                  f"{stats['bytes_saved']:,} bytes deduplicated")
+            return True
+        except Exception as e:
+            print(f"❌ Error storing artifacts: {e}")
+            return False
+
+    def create_git_tag(self) -> bool:
         """Create and push git tag for release"""
         tag_name = f"release-{self.platform}-v{self.version}"
 
         try:
             # Create tag
-            subprocess.run(['git', 'tag', '-a', tag_name, '-m', f'{self.platform.upper()} release v{self.version}'], check=True)
+            with git_timer('tag'):
+                subprocess.run(['git', 'tag', '-a', tag_name, '-m', f'{self.platform.upper()} release v{self.version}'], check=True)
             # Push tag
-            subprocess.run(['git', 'push', 'origin', tag_name], check=True)
+            with git_timer('push'):
+                subprocess.run(['git', 'push', 'origin', tag_name], check=True)
             print(f"✅ Git tag created and pushed: {tag_name}")
+            return True
         except subprocess.CalledProcessError as e:
             print(f"❌ Failed to create git tag: {e}")
+            return False
 
     def trigger_qa_process(self):
         """Trigger QA checklist process"""
@@ -248,16 +357,7 @@ class PostDeploymentAutomation:
             'build_number': self.build_number,
             'download_instructions': self.get_download_instructions(),
             'changelog': self.generate_changelog(),
-            'checklist': [
-                'App launches successfully',
-                'Core functionality works',
-                'UI/UX is consistent',
-                'Performance is acceptable',
-                'No crashes or critical bugs',
-                'Firebase analytics working',
-                'Push notifications working (if applicable)',
-                'Regression testing completed'
-            ],
+            'checklist': list(CHECKLIST_ITEMS),
             'assigned_qa': os.getenv('QA_ASSIGNEE', 'QA Team'),
             'created_at': self.timestamp
         }
@@ -275,24 +375,37 @@ class PostDeploymentAutomation:
         # - Trello API for creating cards
         # - Jira API for creating tickets
 
+    @timed_stage('post_deployment', flush=True)
     def run_all_tasks(self):
-        """Execute all post-deployment tasks"""
+        """Execute all post-deployment tasks (timed per stage in the release metrics).
+
+        Tasks that report their own errors return False, which records the stage as failed.
+        """
         print(f"🚀 Starting post-deployment automation for {self.platform.upper()} v{self.version}")
 
         # 1. Send notifications
-        self.send_slack_notification()
+        with stage('post_deployment', 'send_slack_notification') as status:
+            status['ok'] = self.send_slack_notification()
 
         # 2. Create release notes
-        self.create_release_notes()
+        with stage('post_deployment', 'create_release_notes'):
+            self.create_release_notes()
 
         # 3. Log metadata
-        self.log_metadata()
+        with stage('post_deployment', 'log_metadata'):
+            self.log_metadata()
+
+        # 4. Store artifacts
+        with stage('post_deployment', 'store_artifacts') as status:
+            status['ok'] = self.store_artifacts()
 
-        # 4. Create git tag
-        self.create_git_tag()
+        # 5. Create git tag
+        with stage('post_deployment', 'create_git_tag') as status:
+            status['ok'] = self.create_git_tag()
 
-        # 5. Trigger QA process
-        self.trigger_qa_process()
+        # 6. Trigger QA process
+        with stage('post_deployment', 'trigger_qa_process'):
+            self.trigger_qa_process()
 
         print(f"✅ Post-deployment automation completed for {self.platform.upper()} v{self.version}")
 
@@ -26,6 +26,15 @@ print_error() {
     echo -e "${RED}[ERROR]${NC} $1"
 }
 
+# Check ARB localization files without running flutter gen-l10n
+if git diff --cached --name-only --diff-filter=ACM | grep -q '\.arb$'; then
+    print_status "Checking localization files..."
+    if ! python3 scripts/arb_checker.py; then
+        print_error "Localization issues found in ARB files."
+        exit 1
+    fi
+fi
+
 # Get list of changed Dart files
 DART_FILES=$(git diff --cached --name-only --diff-filter=ACM | grep '\.dart$' | grep -v '\.g\.dart$' | grep -v '\.freezed\.dart$' | grep -v '\.gr\.dart$' || true)
 
@@ -47,17 +56,17 @@ fi
 print_status "Sorting imports..."
 dart run import_sorter:main
 
-# 3. Analysis
+# 3. Analysis (--fatal-infos also fails on warnings and errors, so one run covers both levels)
 print_status "Running analysis..."
-if ! flutter analyze $DART_FILES; then
+if ! flutter analyze --fatal-infos $DART_FILES; then
     print_error "Analysis issues found. Please fix them before committing."
     exit 1
 fi
 
-# 4. Advanced analysis for changed files
-print_status "Running advanced analysis..."
-if ! flutter analyze --fatal-infos $DART_FILES; then
-    print_error "Advanced analysis issues found"
+# 4. Performance anti-patterns (only files changed since the last run are rescanned)
+print_status "Scanning for performance anti-patterns..."
+if ! python3 scripts/dart_perf_scanner.py $DART_FILES; then
+    print_error "Performance issues found. Fix them or add '// perf-ignore: <rule>' with a reason."
     exit 1
 fi
 
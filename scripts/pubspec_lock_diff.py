@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Pubspec Lock Diff
+Parses pubspec.lock at any two revisions straight from git objects (no checkout), lists the
+packages added, removed, upgraded or downgraded between them and attributes the code size change
+of each one from the stored --analyze-size summaries
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from bundle_size_analyzer import format_size, history_path, load_summary
+from git_objects import CommitCache, read_blobs, resolve_commits
+
+LOCK_FILE = 'pubspec.lock'
+PARSER_VERSION = '1'
+TAG_RE = re.compile(r'^release-(?P<platform>[a-z]+)-v(?P<version>.+)$')
+STATUS_ORDER = ('added', 'removed', 'upgraded', 'downgraded', 'changed')
+STATUS_ICONS = {'added': '🆕', 'removed': '🗑️', 'upgraded': '⬆️', 'downgraded': '⬇️', 'changed': '🔀'}
+
+
+def _scalar(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        return value[1:-1]
+    return value
+
+
+def parse_lock(text: str) -> Dict[str, Dict]:
+    """{'packages': {name: {version, dependency, source, id}}, 'sdks': {...}} from pubspec.lock text.
+
+    The lock file is machine-written with a fixed two-space layout, so a line scanner is enough and
+    much faster than a YAML load. 'id' pins the resolved content: the hosted sha256, the git
+    resolved-ref or the path, whichever the source records.
+    """
+    packages: Dict[str, Dict] = {}
+    sdks: Dict[str, str] = {}
+    section = None
+    package: Optional[Dict] = None
+    description: Dict[str, str] = {}
+
+    def finish():
+        if package is not None:
+            package['id'] = (description.get('sha256') or description.get('resolved-ref')
+                             or description.get('path') or package.get('description', ''))
+            package.pop('description', None)
+
+    for line in text.splitlines():
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        indent = len(line) - len(line.lstrip(' '))
+        key, _, value = line.strip().partition(':')
+        if indent == 0:
+            finish()
+            package = None
+            section = key
+        elif section == 'sdks' and indent == 2:
+            sdks[key] = _scalar(value)
+        elif section == 'packages' and indent == 2:
+            finish()
+            package, description = {}, {}
+            packages[key] = package
+        elif package is not None and indent == 4:
+            package[key] = _scalar(value)
+        elif package is not None and indent == 6:
+            description[key] = _scalar(value)
+    finish()
+    return {'packages': packages, 'sdks': sdks}
+
+
+def load_lock_file(path: str) -> Dict[str, Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_lock(f.read())
+
+
+def load_locks(references: List[str], cache: Optional[CommitCache] = None) -> Dict[str, Optional[Dict]]:
+    """Parsed lock per reference: a pubspec.lock path, or any revision (read from git, cached per commit)"""
+    locks: Dict[str, Optional[Dict]] = {}
+    revisions = []
+    for reference in references:
+        if os.path.isfile(reference):
+            locks[reference] = load_lock_file(reference)
+        else:
+            revisions.append(reference)
+
+    commits = resolve_commits(revisions)
+    parsed: Dict[str, Dict] = {}
+    for commit in dict.fromkeys(commits.values()):
+        if commit and cache is not None and cache.get(commit) is not None:
+            parsed[commit] = cache.get(commit)
+    missing = [commit for commit in dict.fromkeys(commits.values()) if commit and commit not in parsed]
+    for spec, content in read_blobs(f"{commit}:{LOCK_FILE}" for commit in missing).items():
+        if content is None:
+            continue
+        commit = spec.split(':', 1)[0]
+        parsed[commit] = parse_lock(content.decode('utf-8', errors='replace'))
+        if cache is not None:
+            cache.put(commit, parsed[commit])
+
+    for revision in revisions:
+        locks[revision] = parsed.get(commits.get(revision))
+    return locks
+
+
+def version_key(version: str) -> Tuple:
+    """Sort key for pub versions: numeric release parts, then pre-releases before the release"""
+    core, _, _build = version.partition('+')
+    release, dash, prerelease = core.partition('-')
+    numbers = tuple(int(part) if part.isdigit() else 0 for part in release.split('.'))
+    return numbers, 0 if dash else 1, prerelease
+
+
+def diff_locks(old: Dict, new: Dict) -> List[Dict]:
+    """One row per package whose resolution differs, ordered by status then name"""
+    before, after = old['packages'], new['packages']
+    rows = []
+    for name in before.keys() | after.keys():
+        previous, current = before.get(name), after.get(name)
+        if previous is None:
+            status = 'added'
+        elif current is None:
+            status = 'removed'
+        elif previous.get('version') != current.get('version'):
+            newer = version_key(current.get('version', '')) > version_key(previous.get('version', ''))
+            status = 'upgraded' if newer else 'downgraded'
+        elif any(previous.get(field) != current.get(field) for field in ('source', 'id', 'dependency')):
+            status = 'changed'
+        else:
+            continue
+        rows.append({
+            'package': name,
+            'status': status,
+            'old_version': (previous or {}).get('version'),
+            'new_version': (current or {}).get('version'),
+            'dependency': (current or previous).get('dependency', ''),
+            'old_dependency': (previous or {}).get('dependency'),
+            'source': (current or previous).get('source', ''),
+        })
+    rows.sort(key=lambda row: (STATUS_ORDER.index(row['status']), row['package']))
+    return rows
+
+
+def size_reference(revision: str) -> Optional[str]:
+    """Stored size summary ('version:platform') for a release tag, when one exists"""
+    match = TAG_RE.match(revision)
+    if match and os.path.exists(history_path(match.group('version'), match.group('platform'))):
+        return f"{match.group('version')}:{match.group('platform')}"
+    return None
+
+
+def attribute_sizes(rows: List[Dict], old_summary: Optional[Dict], new_summary: Optional[Dict]) -> Dict:
+    """Add old/new/delta code size to each row; returns the package size totals"""
+    old_sizes = (old_summary or {}).get('packages', {})
+    new_sizes = (new_summary or {}).get('packages', {})
+    changed = 0
+    for row in rows:
+        row['old_size'] = old_sizes.get(row['package'], 0) if old_summary else None
+        row['new_size'] = new_sizes.get(row['package'], 0) if new_summary else None
+        if old_summary and new_summary:
+            row['size_delta'] = row['new_size'] - row['old_size']
+            changed += row['size_delta']
+        else:
+            row['size_delta'] = None
+    if not (old_summary and new_summary):
+        return {}
+    total = sum(new_sizes.values()) - sum(old_sizes.values())
+    return {'packages_delta': total, 'dependency_changes_delta': changed, 'other_packages_delta': total - changed}
+
+
+def counts(lock: Dict) -> Dict[str, int]:
+    result: Dict[str, int] = {}
+    for package in lock['packages'].values():
+        kind = package.get('dependency', 'unknown')
+        result[kind] = result.get(kind, 0) + 1
+    return result
+
+
+def _version_change(row: Dict) -> str:
+    if row['status'] == 'added':
+        return row['new_version']
+    if row['status'] == 'removed':
+        return row['old_version']
+    if row['status'] == 'changed':
+        previous = row['old_dependency']
+        return f"{row['new_version']} ({previous} → {row['dependency']})" if previous != row['dependency'] \
+            else f"{row['new_version']} ({row['source']} content changed)"
+    return f"{row['old_version']} → {row['new_version']}"
+
+
+def _size_change(row: Dict) -> str:
+    if row.get('size_delta') is None:
+        return ''
+    return f"{'+' if row['size_delta'] > 0 else ''}{format_size(row['size_delta'])}"
+
+
+def print_diff(old_name: str, new_name: str, rows: List[Dict], totals: Dict):
+    print("\n" + "="*60)
+    print(f"📦 DEPENDENCY CHANGES {old_name} → {new_name}")
+    print("="*60)
+    if not rows:
+        print("✅ No dependency changes")
+    for status in STATUS_ORDER:
+        group = [row for row in rows if row['status'] == status]
+        if not group:
+            continue
+        print(f"\n{STATUS_ICONS[status]} {status.capitalize()} ({len(group)}):")
+        for row in group:
+            kind = '' if row['dependency'] == 'transitive' else f" [{row['dependency']}]"
+            print(f"   {_size_change(row):>12}  {row['package']} {_version_change(row)}{kind}")
+    if totals:
+        print(f"\n📏 Package code size: {_signed(totals['packages_delta'])} "
+              f"({_signed(totals['dependency_changes_delta'])} from changed dependencies, "
+              f"{_signed(totals['other_packages_delta'])} elsewhere)")
+    print("="*60 + "\n")
+
+
+def _signed(size: int) -> str:
+    return f"{'+' if size > 0 else ''}{format_size(size)}"
+
+
+def markdown_diff(rows: List[Dict], totals: Dict) -> str:
+    """Dependency section for release notes"""
+    if not rows:
+        return "No dependency changes."
+    sized = totals != {}
+    lines = ["| Package | Change | Version |" + (" Size |" if sized else ""),
+             "|---------|--------|---------|" + ("------|" if sized else "")]
+    for row in rows:
+        line = f"| {row['package']} | {STATUS_ICONS[row['status']]} {row['status']} | {_version_change(row)} |"
+        lines.append(line + (f" {_size_change(row)} |" if sized else ""))
+    if sized:
+        lines.append("")
+        lines.append(f"Package code size: {_signed(totals['packages_delta'])} "
+                     f"({_signed(totals['dependency_changes_delta'])} from changed dependencies)")
+    return "\n".join(lines)
+
+
+def release_notes_diff(old: str, new: str, new_size: Optional[str] = None) -> str:
+    """markdown_diff between two references, sized from stored summaries (or new_size) when available"""
+    cache = CommitCache('pubspec_lock', PARSER_VERSION)
+    locks = load_locks([old, new], cache)
+    cache.save()
+    for reference in (old, new):
+        if locks[reference] is None:
+            return f"No {LOCK_FILE} at {reference}."
+    rows = diff_locks(locks[old], locks[new])
+    old_size = size_reference(old)
+    new_size = new_size or size_reference(new)
+    totals = attribute_sizes(rows, load_summary(old_size) if old_size else None,
+                             load_summary(new_size) if new_size else None)
+    return markdown_diff(rows, totals)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='pubspec.lock dependency diff with size attribution')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    summary_parser = subparsers.add_parser('summary', help='count resolved packages by dependency kind')
+    summary_parser.add_argument('reference', nargs='?', default=LOCK_FILE, help='pubspec.lock path or revision')
+    summary_parser.add_argument('--count', metavar='KIND',
+                                help="print only the number of 'direct' (main, dev, overridden), "
+                                     "'transitive' or 'all' packages")
+
+    diff_parser = subparsers.add_parser('diff', help='packages changed between two revisions')
+    diff_parser.add_argument('old', help='revision or release tag (or a pubspec.lock path)')
+    diff_parser.add_argument('new', nargs='?', default='HEAD', help='revision or pubspec.lock path (default HEAD)')
+    diff_parser.add_argument('--old-size', help="size summary for old: file or 'version:platform' "
+                                                "(defaults to the stored one for release tags)")
+    diff_parser.add_argument('--new-size', help="size summary for new, as --old-size")
+    output = diff_parser.add_mutually_exclusive_group()
+    output.add_argument('--json', action='store_true', help='print the rows as JSON')
+    output.add_argument('--markdown', action='store_true', help='print a release notes table')
+
+    args = parser.parse_args(argv)
+    cache = CommitCache('pubspec_lock', PARSER_VERSION)
+
+    if args.command == 'summary':
+        lock = load_locks([args.reference], cache)[args.reference]
+        cache.save()
+        if lock is None:
+            print(f"❌ No {LOCK_FILE} at {args.reference}")
+            return 1
+        by_kind = counts(lock)
+        if args.count:
+            direct = sum(count for kind, count in by_kind.items() if kind.startswith('direct'))
+            print({'direct': direct, 'transitive': by_kind.get('transitive', 0),
+                   'all': len(lock['packages'])}.get(args.count, 0))
+            return 0
+        print(f"📦 {len(lock['packages'])} resolved packages: "
+              + ", ".join(f"{count} {kind}" for kind, count in sorted(by_kind.items())))
+        if lock['sdks']:
+            print("🎯 SDKs: " + ", ".join(f"{name} {constraint}" for name, constraint in lock['sdks'].items()))
+        return 0
+
+    locks = load_locks([args.old, args.new], cache)
+    cache.save()
+    for reference in (args.old, args.new):
+        if locks[reference] is None:
+            print(f"❌ No {LOCK_FILE} at {reference}")
+            return 1
+
+    rows = diff_locks(locks[args.old], locks[args.new])
+    old_size = args.old_size or size_reference(args.old)
+    new_size = args.new_size or size_reference(args.new)
+    totals = attribute_sizes(rows, load_summary(old_size) if old_size else None,
+                             load_summary(new_size) if new_size else None)
+
+    if args.json:
+        print(json.dumps({'old': args.old, 'new': args.new, 'packages': rows, 'size': totals}, indent=2))
+    elif args.markdown:
+        print(markdown_diff(rows, totals))
+    else:
+        print_diff(args.old, args.new, rows, totals)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,16 +5,59 @@ Supports Notion, Trello, and Jira integrations
 """
 
 import os
+import sys
 import json
-import requests
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from http_utils import RateLimiter, get_with_retry, post_with_retry, request_with_retry
+from release_metrics import QA_INTEGRATIONS, timed_stage
+from qa_payloads import (NotionPagePlan, jira_changelog_comment, jira_changelog_parts, jira_code_block,
+                         jira_heading, notion_block, notion_text, plan_notion_page)
+
+NOTION_API_URL = os.getenv('NOTION_API_URL', 'https://api.notion.com').rstrip('/')
+TRELLO_API_URL = os.getenv('TRELLO_API_URL', 'https://api.trello.com').rstrip('/')
+# Settings each integration needs; without them it is skipped rather than failed
+INTEGRATION_SETTINGS = {
+    'notion': ('NOTION_TOKEN', 'NOTION_QA_DATABASE_ID'),
+    'trello': ('TRELLO_API_KEY', 'TRELLO_TOKEN', 'TRELLO_QA_LIST_ID'),
+    'jira': ('JIRA_URL', 'JIRA_EMAIL', 'JIRA_API_TOKEN', 'JIRA_PROJECT_KEY'),
+}
+# Parallel checklist item requests per release; Trello allows 100 requests per 10s per token
+TRELLO_MAX_CONCURRENCY = int(os.getenv('TRELLO_MAX_CONCURRENCY', '4'))
+# Follow-up requests for oversized pages and issues; Notion averages 3 requests per second per integration
+NOTION_MAX_CONCURRENCY = int(os.getenv('NOTION_MAX_CONCURRENCY', '3'))
+NOTION_REQUESTS_PER_SECOND = float(os.getenv('NOTION_REQUESTS_PER_SECOND', '3'))
+JIRA_MAX_CONCURRENCY = int(os.getenv('JIRA_MAX_CONCURRENCY', '4'))
+JIRA_REQUESTS_PER_SECOND = float(os.getenv('JIRA_REQUESTS_PER_SECOND', '10'))
+# Jira rejects bulk requests with more than 50 issues
+JIRA_BULK_LIMIT = 50
+
+CHECKLIST_ITEMS = [
+    "App launches successfully",
+    "Core functionality works",
+    "UI/UX is consistent",
+    "Performance is acceptable",
+    "No crashes or critical bugs",
+    "Firebase analytics working",
+    "Push notifications working (if applicable)",
+    "Regression testing completed"
+]
 
 class QAAutomation:
-    def __init__(self, platform: str, version: str, build_number: str, changelog: str):
+    def __init__(self, platform: str, version: str, build_number: str, changelog: str,
+                 platforms: Optional[List[str]] = None, qa_dir: str = 'qa'):
         self.platform = platform
         self.version = version
         self.build_number = build_number
         self.changelog = changelog
+        # A multi-platform release gets one Jira issue and one Trello checklist per platform
+        self.platforms = platforms or [platform]
+        # Created Notion pages, Trello cards and Jira issues, saved to qa_dir for qa_status_sync.py
+        self.created_items: List[Dict] = []
+        self.qa_dir = qa_dir
+        # Changelog chunks: the first goes into the Jira description, the rest into comments
+        self.jira_changelog = jira_changelog_parts(changelog)
         
     def create_notion_page(self) -> bool:
         """Create QA checklist page in Notion"""
@@ -38,14 +81,14 @@ class QAAutomation:
                     "title": [
                         {
                             "text": {
-                                "content": f"QA Testing - {self.platform.upper()} v{self.version}"
+                                "content": f"QA Testing - {self.platform_label()} v{self.version}"
                             }
                         }
                     ]
                 },
                 "Platform": {
                     "select": {
-                        "name": self.platform.upper()
+                        "name": self.platform_label()
                     }
                 },
                 "Version": {
@@ -67,83 +110,43 @@ class QAAutomation:
                         "name": "High"
                     }
                 }
-            },
-            "children": [
-                {
-                    "object": "block",
-                    "type": "heading_2",
-                    "heading_2": {
-                        "rich_text": [{"type": "text", "text": {"content": "📱 Release Information"}}]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "paragraph",
-                    "paragraph": {
-                        "rich_text": [
-                            {"type": "text", "text": {"content": f"Platform: {self.platform.upper()}\n"}},
-                            {"type": "text", "text": {"content": f"Version: {self.version}\n"}},
-                            {"type": "text", "text": {"content": f"Build: {self.build_number}\n"}}
-                        ]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "heading_2",
-                    "heading_2": {
-                        "rich_text": [{"type": "text", "text": {"content": "📝 What's New"}}]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "code",
-                    "code": {
-                        "rich_text": [{"type": "text", "text": {"content": self.changelog}}],
-                        "language": "plain text"
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "heading_2",
-                    "heading_2": {
-                        "rich_text": [{"type": "text", "text": {"content": "🧪 QA Checklist"}}]
-                    }
-                }
-            ]
+            }
         }
-        
-        # Add checklist items
-        checklist_items = [
-            "App launches successfully",
-            "Core functionality works",
-            "UI/UX is consistent",
-            "Performance is acceptable",
-            "No crashes or critical bugs",
-            "Firebase analytics working",
-            "Push notifications working (if applicable)",
-            "Regression testing completed"
-        ]
-        
-        for item in checklist_items:
-            page_data["children"].append({
+        intro = [
+            notion_block('heading_2', "📱 Release Information"),
+            {
                 "object": "block",
-                "type": "to_do",
-                "to_do": {
-                    "rich_text": [{"type": "text", "text": {"content": item}}],
-                    "checked": False
+                "type": "paragraph",
+                "paragraph": {
+                    "rich_text": [
+                        notion_text(f"Platform: {self.platform_label()}\n"),
+                        notion_text(f"Version: {self.version}\n"),
+                        notion_text(f"Build: {self.build_number}\n")
+                    ]
                 }
-            })
+            },
+            notion_block('heading_2', "📝 What's New")
+        ]
+        checklist = [notion_block('heading_2', "🧪 QA Checklist")]
+        checklist.extend(notion_block('to_do', item, checked=False) for item in CHECKLIST_ITEMS)
+        
+        # Large changelogs don't fit in one request; the rest is appended once the page exists
+        plan = plan_notion_page(page_data, intro, self.changelog, checklist)
         
         try:
-            response = requests.post(
-                'https://api.notion.com/v1/pages',
+            response = post_with_retry(
+                f'{NOTION_API_URL}/v1/pages',
                 headers=headers,
-                json=page_data
+                json=plan.page
             )
             
             if response.status_code == 200:
-                page_url = response.json().get('url', '')
-                print(f"✅ Notion QA page created: {page_url}")
+                page = response.json()
+                # Recorded before completing so a partially filled page is tracked rather than recreated
+                self.created_items.append({'provider': 'notion', 'id': page['id'], 'platforms': self.platforms})
+                if not self.complete_notion_page(page['id'], plan, headers):
+                    return False
+                print(f"✅ Notion QA page created: {page.get('url', '')}")
                 return True
             else:
                 print(f"❌ Failed to create Notion page: {response.status_code}")
@@ -153,8 +156,62 @@ class QAAutomation:
             print(f"❌ Error creating Notion page: {e}")
             return False
     
+    def complete_notion_page(self, page_id: str, plan: NotionPagePlan, headers: Dict[str, str]) -> bool:
+        """Send the blocks that did not fit in the page's create request"""
+        limiter = RateLimiter(NOTION_REQUESTS_PER_SECOND)
+        
+        def append(block_id: str, children: List[Dict]) -> int:
+            limiter.wait()
+            return request_with_retry(
+                'PATCH',
+                f'{NOTION_API_URL}/v1/blocks/{block_id}/children',
+                headers=headers,
+                json={'children': children}
+            ).status_code
+        
+        # Top-level batches land at the end of the page, so they are sent one after another
+        for batch in plan.appends:
+            status = append(page_id, batch)
+            if status != 200:
+                print(f"❌ Failed to append blocks to Notion page: {status}")
+                return False
+        
+        if not plan.sections:
+            return True
+        
+        toggle_ids = self.notion_toggle_ids(page_id, headers, limiter)
+        if len(toggle_ids) != len(plan.sections):
+            print(f"❌ Expected {len(plan.sections)} changelog sections on the Notion page, found {len(toggle_ids)}")
+            return False
+        
+        with ThreadPoolExecutor(max_workers=max(1, NOTION_MAX_CONCURRENCY)) as executor:
+            statuses = list(executor.map(append, toggle_ids, plan.sections))
+        
+        failed = sum(1 for status in statuses if status != 200)
+        if failed:
+            print(f"❌ Failed to add {failed}/{len(statuses)} changelog sections to the Notion page")
+            return False
+        return True
+    
+    def notion_toggle_ids(self, page_id: str, headers: Dict[str, str], limiter: RateLimiter) -> List[str]:
+        """IDs of the page's top-level toggle blocks, in page order"""
+        toggle_ids = []
+        cursor = None
+        while True:
+            query = f'page_size=100&start_cursor={cursor}' if cursor else 'page_size=100'
+            limiter.wait()
+            response = get_with_retry(f'{NOTION_API_URL}/v1/blocks/{page_id}/children?{query}', headers=headers)
+            if response.status_code != 200:
+                print(f"❌ Failed to read Notion page blocks: {response.status_code}")
+                return []
+            children = response.json()
+            toggle_ids.extend(block['id'] for block in children.get('results', []) if block.get('type') == 'toggle')
+            if not children.get('has_more'):
+                return toggle_ids
+            cursor = children.get('next_cursor')
+    
     def create_trello_card(self) -> bool:
-        """Create QA checklist card in Trello"""
+        """Create QA card in Trello with a real checklist per platform"""
         trello_key = os.getenv('TRELLO_API_KEY')
         trello_token = os.getenv('TRELLO_TOKEN')
         trello_list_id = os.getenv('TRELLO_QA_LIST_ID')
@@ -167,9 +224,9 @@ class QAAutomation:
             'key': trello_key,
             'token': trello_token,
             'idList': trello_list_id,
-            'name': f'QA Testing - {self.platform.upper()} v{self.version}',
+            'name': f'QA Testing - {self.platform_label()} v{self.version}',
             'desc': f"""## 📱 Release Information
-Platform: {self.platform.upper()}
+Platform: {self.platform_label()}
 Version: {self.version}
 Build: {self.build_number}
 
@@ -178,16 +235,6 @@ Build: {self.build_number}
 {self.changelog}
 ```
 
-## 🧪 QA Checklist
-- [ ] App launches successfully
-- [ ] Core functionality works
-- [ ] UI/UX is consistent
-- [ ] Performance is acceptable
-- [ ] No crashes or critical bugs
-- [ ] Firebase analytics working
-- [ ] Push notifications working (if applicable)
-- [ ] Regression testing completed
-
 ## 📱 Download Instructions
 {self.get_download_instructions()}
 """,
@@ -195,102 +242,206 @@ Build: {self.build_number}
         }
         
         try:
-            response = requests.post(
-                'https://api.trello.com/1/cards',
+            response = post_with_retry(
+                f'{TRELLO_API_URL}/1/cards',
                 data=card_data
             )
             
-            if response.status_code == 200:
-                card_url = response.json().get('shortUrl', '')
-                print(f"✅ Trello QA card created: {card_url}")
-                return True
-            else:
+            if response.status_code != 200:
                 print(f"❌ Failed to create Trello card: {response.status_code}")
                 return False
+            
+            card = response.json()
+            auth = {'key': trello_key, 'token': trello_token}
+            self.created_items.append({'provider': 'trello', 'id': card['id'], 'platforms': self.platforms})
+            if not self.create_trello_checklists(card['id'], auth):
+                return False
+            
+            print(f"✅ Trello QA card created: {card.get('shortUrl', '')}")
+            return True
                 
         except Exception as e:
             print(f"❌ Error creating Trello card: {e}")
             return False
     
-    def create_jira_ticket(self) -> bool:
-        """Create QA testing ticket in Jira"""
-        jira_url = os.getenv('JIRA_URL')
-        jira_email = os.getenv('JIRA_EMAIL')
-        jira_token = os.getenv('JIRA_API_TOKEN')
-        jira_project_key = os.getenv('JIRA_PROJECT_KEY')
-        
-        if not all([jira_url, jira_email, jira_token, jira_project_key]):
-            print("⚠️ Jira credentials not configured")
+    def create_trello_checklists(self, card_id: str, auth: Dict[str, str]) -> bool:
+        """Add one QA checklist per platform to a card.
+        
+        Each checklist is copied in a single request from TRELLO_QA_CHECKLIST_TEMPLATE_ID or, when that is
+        unset, from the first platform's checklist; only that first checklist is filled item by item, with
+        at most TRELLO_MAX_CONCURRENCY requests in flight. Set the template to avoid per-item requests.
+        """
+        source_id = os.getenv('TRELLO_QA_CHECKLIST_TEMPLATE_ID')
+        
+        for platform in self.platforms:
+            checklist_data = {**auth, 'idCard': card_id, 'name': f'{platform.upper()} QA Checklist'}
+            if source_id:
+                checklist_data['idChecklistSource'] = source_id
+            
+            response = post_with_retry(f'{TRELLO_API_URL}/1/checklists', data=checklist_data)
+            if response.status_code != 200:
+                print(f"❌ Failed to create Trello checklist for {platform}: {response.status_code}")
+                return False
+            
+            if not source_id:
+                source_id = response.json()['id']
+                if not self.add_trello_checklist_items(source_id, auth):
+                    return False
+        return True
+    
+    def add_trello_checklist_items(self, checklist_id: str, auth: Dict[str, str]) -> bool:
+        def add_item(item: Tuple[int, str]) -> int:
+            index, name = item
+            # Explicit positions keep the order even though items are created concurrently
+            return post_with_retry(
+                f'{TRELLO_API_URL}/1/checklists/{checklist_id}/checkItems',
+                data={**auth, 'name': name, 'pos': (index + 1) * 1024, 'checked': 'false'}
+            ).status_code
+        
+        with ThreadPoolExecutor(max_workers=max(1, TRELLO_MAX_CONCURRENCY)) as executor:
+            statuses = list(executor.map(add_item, enumerate(CHECKLIST_ITEMS)))
+        
+        failed = sum(1 for status in statuses if status != 200)
+        if failed:
+            print(f"❌ Failed to add {failed}/{len(statuses)} Trello checklist items")
             return False
+        return True
+    
+    def get_jira_credentials(self) -> Optional[Dict[str, str]]:
+        credentials = {
+            'url': os.getenv('JIRA_URL'),
+            'email': os.getenv('JIRA_EMAIL'),
+            'token': os.getenv('JIRA_API_TOKEN'),
+            'project_key': os.getenv('JIRA_PROJECT_KEY')
+        }
+        if not all(credentials.values()):
+            print("⚠️ Jira credentials not configured")
+            return None
+        return credentials
+    
+    def jira_issue_fields(self, platform: str, project_key: str) -> Dict:
+        """Issue fields for one platform's QA ticket; further changelog parts follow as comments"""
+        parts = len(self.jira_changelog)
+        what_is_new = "📝 What's New" if parts == 1 else f"📝 What's New (part 1/{parts})"
+        return {
+            "project": {
+                "key": project_key
+            },
+            "summary": f"QA Testing - {platform.upper()} v{self.version}",
+            "description": {
+                "type": "doc",
+                "version": 1,
+                "content": [
+                    jira_heading("📱 Release Information"),
+                    {
+                        "type": "paragraph",
+                        "content": [
+                            {"type": "text", "text": f"Platform: {platform.upper()}\n"},
+                            {"type": "text", "text": f"Version: {self.version}\n"},
+                            {"type": "text", "text": f"Build: {self.build_number}\n"}
+                        ]
+                    },
+                    jira_heading(what_is_new),
+                    jira_code_block(self.jira_changelog[0])
+                ]
+            },
+            "issuetype": {
+                "name": "Task"
+            },
+            "priority": {
+                "name": "High"
+            }
+        }
+    
+    def create_jira_tickets(self) -> Dict[str, Optional[str]]:
+        """Create one QA ticket per platform through Jira's bulk endpoint; returns platform -> issue key"""
+        credentials = self.get_jira_credentials()
+        if not credentials:
+            return {platform: None for platform in self.platforms}
         
         headers = {
             'Accept': 'application/json',
             'Content-Type': 'application/json'
         }
+        created: Dict[str, Optional[str]] = {}
         
-        ticket_data = {
-            "fields": {
-                "project": {
-                    "key": jira_project_key
-                },
-                "summary": f"QA Testing - {self.platform.upper()} v{self.version}",
-                "description": {
-                    "type": "doc",
-                    "version": 1,
-                    "content": [
-                        {
-                            "type": "heading",
-                            "attrs": {"level": 2},
-                            "content": [{"type": "text", "text": "📱 Release Information"}]
-                        },
-                        {
-                            "type": "paragraph",
-                            "content": [
-                                {"type": "text", "text": f"Platform: {self.platform.upper()}\n"},
-                                {"type": "text", "text": f"Version: {self.version}\n"},
-                                {"type": "text", "text": f"Build: {self.build_number}\n"}
-                            ]
-                        },
-                        {
-                            "type": "heading",
-                            "attrs": {"level": 2},
-                            "content": [{"type": "text", "text": "📝 What's New"}]
-                        },
-                        {
-                            "type": "codeBlock",
-                            "content": [{"type": "text", "text": self.changelog}]
-                        }
-                    ]
-                },
-                "issuetype": {
-                    "name": "Task"
-                },
-                "priority": {
-                    "name": "High"
-                }
+        for start in range(0, len(self.platforms), JIRA_BULK_LIMIT):
+            batch = self.platforms[start:start + JIRA_BULK_LIMIT]
+            bulk_data = {
+                "issueUpdates": [
+                    {"fields": self.jira_issue_fields(platform, credentials['project_key'])} for platform in batch
+                ]
             }
+            
+            try:
+                response = post_with_retry(
+                    f"{credentials['url']}/rest/api/3/issue/bulk",
+                    headers=headers,
+                    json=bulk_data,
+                    auth=(credentials['email'], credentials['token'])
+                )
+            except Exception as e:
+                print(f"❌ Error creating Jira tickets: {e}")
+                created.update({platform: None for platform in batch})
+                continue
+            
+            if response.status_code not in (200, 201):
+                print(f"❌ Failed to create Jira tickets: {response.status_code}")
+                created.update({platform: None for platform in batch})
+                continue
+            
+            # Created issues come back in request order, skipping the failed elements
+            result = response.json()
+            failed = {error.get('failedElementNumber') for error in result.get('errors', [])}
+            issues = iter(result.get('issues', []))
+            for index, platform in enumerate(batch):
+                issue = None if index in failed else next(issues, None)
+                created[platform] = issue.get('key') if issue else None
+                if issue:
+                    self.created_items.append({'provider': 'jira', 'id': issue['key'], 'platforms': [platform]})
+                    print(f"✅ Jira QA ticket created: {credentials['url']}/browse/{issue['key']}")
+                else:
+                    print(f"❌ Failed to create Jira ticket for {platform}")
+        
+        issue_keys = [key for key in created.values() if key]
+        if issue_keys and not self.add_jira_changelog_comments(issue_keys, credentials):
+            # The tickets exist but their changelog is incomplete
+            created = {platform: None for platform in created}
+        return created
+    
+    def add_jira_changelog_comments(self, issue_keys: List[str], credentials: Dict[str, str]) -> bool:
+        """Post the changelog parts after the first as labelled comments, in parallel"""
+        total = len(self.jira_changelog)
+        if total == 1:
+            return True
+        
+        limiter = RateLimiter(JIRA_REQUESTS_PER_SECOND)
+        headers = {
+            'Accept': 'application/json',
+            'Content-Type': 'application/json'
         }
         
-        try:
-            response = requests.post(
-                f'{jira_url}/rest/api/3/issue',
+        def add_comment(issue_key: str, part: int) -> int:
+            limiter.wait()
+            return post_with_retry(
+                f"{credentials['url']}/rest/api/3/issue/{issue_key}/comment",
                 headers=headers,
-                json=ticket_data,
-                auth=(jira_email, jira_token)
-            )
-            
-            if response.status_code == 201:
-                issue_key = response.json().get('key', '')
-                issue_url = f"{jira_url}/browse/{issue_key}"
-                print(f"✅ Jira QA ticket created: {issue_url}")
-                return True
-            else:
-                print(f"❌ Failed to create Jira ticket: {response.status_code}")
-                return False
-                
-        except Exception as e:
-            print(f"❌ Error creating Jira ticket: {e}")
+                json=jira_changelog_comment(self.jira_changelog[part - 1], part, total),
+                auth=(credentials['email'], credentials['token'])
+            ).status_code
+        
+        comments = [(issue_key, part) for issue_key in issue_keys for part in range(2, total + 1)]
+        with ThreadPoolExecutor(max_workers=max(1, JIRA_MAX_CONCURRENCY)) as executor:
+            statuses = list(executor.map(lambda args: add_comment(*args), comments))
+        
+        failed = sum(1 for status in statuses if status != 201)
+        if failed:
+            print(f"❌ Failed to add {failed}/{len(statuses)} Jira changelog comments")
             return False
+        return True
+    
+    def platform_label(self) -> str:
+        return '/'.join(platform.upper() for platform in self.platforms)
     
     def get_download_instructions(self) -> str:
         """Get platform-specific download instructions"""
@@ -299,6 +450,23 @@ Build: {self.build_number}
         else:
             return "• Open Play Console Internal Testing link\n• Download and install the latest AAB\n• Test on your Android device"
     
+    def save_created_items(self, qa_dir: Optional[str] = None) -> str:
+        """Append this run's created items to <qa_dir>/qa-items-v<version>.json"""
+        qa_dir = self.qa_dir if qa_dir is None else qa_dir
+        items_file = os.path.join(qa_dir, f"qa-items-v{self.version}.json")
+        record = {'version': self.version, 'build_number': self.build_number, 'items': []}
+        if os.path.exists(items_file):
+            with open(items_file, 'r') as f:
+                record = json.load(f)
+        
+        record['build_number'] = self.build_number
+        record['items'].extend(self.created_items)
+        os.makedirs(qa_dir, exist_ok=True)
+        with open(items_file, 'w') as f:
+            json.dump(record, f, indent=2)
+        return items_file
+    
+    @timed_stage('qa_automation', flush=True)
     def trigger_all_qa_processes(self) -> Dict[str, bool]:
         """Trigger all configured QA processes"""
         results = {}
@@ -308,7 +476,14 @@ Build: {self.build_number}
         # Try each integration
         results['notion'] = self.create_notion_page()
         results['trello'] = self.create_trello_card()
-        results['jira'] = self.create_jira_ticket()
+        results['jira'] = all(self.create_jira_tickets().values())
+        for integration, ok in results.items():
+            configured = all(os.getenv(name) for name in INTEGRATION_SETTINGS[integration])
+            outcome = 'success' if ok else 'failure' if configured else 'not_configured'
+            QA_INTEGRATIONS.inc(integration=integration, outcome=outcome)
+        
+        if self.created_items:
+            self.save_created_items()
         
         successful = sum(results.values())
         total = len(results)
@@ -316,3 +491,14 @@ Build: {self.build_number}
         print(f"✅ QA automation completed: {successful}/{total} integrations successful")
         
         return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print("Usage: python qa_automation.py <platform>[,<platform>...] <version> <build_number> [changelog]")
+        sys.exit(1)
+    
+    platforms = sys.argv[1].split(',')
+    changelog = sys.argv[4] if len(sys.argv) > 4 else ''
+    results = QAAutomation(platforms[0], sys.argv[2], sys.argv[3], changelog, platforms).trigger_all_qa_processes()
+    sys.exit(0 if all(results.values()) else 1)
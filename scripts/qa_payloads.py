@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+QA Payload Builder
+Splits changelogs and checklists into Notion blocks and Jira documents that stay within the APIs'
+size limits, so large releases are created first and completed with follow-up requests
+"""
+
+import json
+import os
+from typing import Dict, Iterable, Iterator, List
+
+# https://developers.notion.com/reference/request-limits
+NOTION_TEXT_LIMIT = 2000        # characters per rich text object
+NOTION_RICH_TEXT_LIMIT = 100    # rich text objects per block
+NOTION_CHILDREN_LIMIT = 100     # blocks per create/append request
+# Notion accepts 500 KB per request; smaller requests keep each call well clear of timeouts
+NOTION_REQUEST_BYTES = int(os.getenv('NOTION_REQUEST_BYTES', '100000'))
+# Jira rejects rich text fields longer than 32,767 characters
+JIRA_TEXT_LIMIT = 30000
+
+
+def json_size(value: object) -> int:
+    return len(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+
+
+def split_text(text: str, limit: int) -> Iterator[str]:
+    """Chunks of at most limit characters, broken at line ends where possible; joined they give text back"""
+    buffer: List[str] = []
+    size = 0
+    for line in text.splitlines(keepends=True):
+        while len(line) > limit:
+            if buffer:
+                yield ''.join(buffer)
+                buffer, size = [], 0
+            yield line[:limit]
+            line = line[limit:]
+        if size + len(line) > limit:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+        buffer.append(line)
+        size += len(line)
+    if buffer:
+        yield ''.join(buffer)
+
+
+def notion_text(content: str) -> Dict:
+    return {"type": "text", "text": {"content": content}}
+
+
+def notion_block(block_type: str, text: str, **extra) -> Dict:
+    return {"object": "block", "type": block_type, block_type: {"rich_text": [notion_text(text)], **extra}}
+
+
+def notion_code_blocks(text: str, max_bytes: int = NOTION_REQUEST_BYTES) -> Iterator[Dict]:
+    """Plain-text code blocks holding text, each within the rich text and request size limits"""
+    block_budget = max_bytes - 1024  # room for the block and request envelopes
+    rich_text: List[Dict] = []
+    size = 0
+    for chunk in split_text(text, NOTION_TEXT_LIMIT):
+        part = notion_text(chunk)
+        part_size = json_size(part)
+        if rich_text and (len(rich_text) == NOTION_RICH_TEXT_LIMIT or size + part_size > block_budget):
+            yield {"object": "block", "type": "code", "code": {"rich_text": rich_text, "language": "plain text"}}
+            rich_text, size = [], 0
+        rich_text.append(part)
+        size += part_size
+    yield {"object": "block", "type": "code",
+           "code": {"rich_text": rich_text or [notion_text(text)], "language": "plain text"}}
+
+
+def pack_blocks(blocks: Iterable[Dict], max_bytes: int = NOTION_REQUEST_BYTES,
+                first_overhead: int = 0) -> Iterator[List[Dict]]:
+    """Consecutive batches of at most NOTION_CHILDREN_LIMIT blocks and max_bytes each.
+
+    first_overhead reserves room in the first batch, e.g. for the page properties it is sent with.
+    """
+    batch: List[Dict] = []
+    size = first_overhead
+    for block in blocks:
+        block_size = json_size(block) + 1
+        if batch and (len(batch) == NOTION_CHILDREN_LIMIT or size + block_size > max_bytes):
+            yield batch
+            batch, size = [], 0
+        batch.append(block)
+        size += block_size
+    if batch:
+        yield batch
+
+
+class NotionPagePlan:
+    """A QA page split into its create request and the follow-up append requests.
+
+    page      - POST /v1/pages payload
+    appends   - further top-level batches, appended to the page in order
+    sections  - children of each toggle block on the page, in order; toggles are independent
+                parents, so these can be appended in parallel
+    """
+
+    def __init__(self, page: Dict, appends: List[List[Dict]], sections: List[List[Dict]]):
+        self.page = page
+        self.appends = appends
+        self.sections = sections
+
+    @property
+    def request_count(self) -> int:
+        return 1 + len(self.appends) + len(self.sections)
+
+
+def plan_notion_page(page: Dict, intro: List[Dict], changelog: str, checklist: List[Dict],
+                     max_bytes: int = NOTION_REQUEST_BYTES) -> NotionPagePlan:
+    """Lay out intro blocks, the changelog and the checklist blocks on a page.
+
+    A changelog that fits next to everything else is a single inline code block, as before. Larger
+    ones are split into collapsed 'Changelog part i/n' toggles filled after the page exists, which
+    keeps the checklist's to-do blocks at the top level where qa_status_sync.py reads them.
+    """
+    page_overhead = json_size({**page, 'children': []})
+    code_blocks = list(notion_code_blocks(changelog, max_bytes))
+    inline = intro + code_blocks + checklist
+    if len(inline) <= NOTION_CHILDREN_LIMIT and page_overhead + json_size(inline) <= max_bytes:
+        return NotionPagePlan({**page, 'children': inline}, [], [])
+
+    sections = list(pack_blocks(code_blocks, max_bytes))
+    toggles = [notion_block('toggle', f"Changelog part {index}/{len(sections)}")
+               for index in range(1, len(sections) + 1)]
+    batches = list(pack_blocks(intro + toggles + checklist, max_bytes, page_overhead))
+    return NotionPagePlan({**page, 'children': batches[0]}, batches[1:], sections)
+
+
+def jira_changelog_parts(changelog: str, limit: int = JIRA_TEXT_LIMIT) -> List[str]:
+    """Changelog chunks small enough for one Jira rich text field each"""
+    return list(split_text(changelog, limit)) or [changelog]
+
+
+def jira_heading(text: str, level: int = 2) -> Dict:
+    return {"type": "heading", "attrs": {"level": level}, "content": [{"type": "text", "text": text}]}
+
+
+def jira_code_block(text: str) -> Dict:
+    return {"type": "codeBlock", "content": [{"type": "text", "text": text}]}
+
+
+def jira_changelog_comment(text: str, part: int, total: int) -> Dict:
+    """Comment body carrying one changelog part; parts are labelled since comments may be posted concurrently"""
+    return {
+        "body": {
+            "type": "doc",
+            "version": 1,
+            "content": [jira_heading(f"📝 What's New (part {part}/{total})", 3), jira_code_block(text)]
+        }
+    }
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+QA Status Sync
+Polls the Notion pages, Trello cards and Jira issues created by qa_automation.py, checks them off
+against the local QA checklists and prints an aggregated pass/fail view per version. Conditional
+requests, Jira 'updated' filters and a local response cache keep repeated polls cheap
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlencode
+
+from http_utils import get_with_retry
+from qa_automation import CHECKLIST_ITEMS
+
+QA_DIR = 'qa'
+STATUS_CACHE_FILE = os.path.join(QA_DIR, '.status_cache.json')
+TRELLO_BATCH_LIMIT = 10  # Trello's /1/batch accepts at most 10 URLs
+JIRA_SEARCH_LIMIT = 100
+# Statuses meaning the page, card or issue was deleted; reported per item instead of failing the sync
+GONE_STATUSES = {404, 410}
+
+
+def minute_after(timestamp: Optional[str]) -> float:
+    """Notion rounds last_edited_time down to the minute, so it only proves no edits once that minute is over"""
+    if not timestamp:
+        return float('inf')
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp() + 60
+
+
+class ItemGone(RuntimeError):
+    """The polled page, card or issue no longer exists"""
+
+
+class ResponseCache:
+    """GET responses persisted with their ETag/Last-Modified so polls can be conditional"""
+
+    def __init__(self, path: str = STATUS_CACHE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.responses: Dict[str, Dict] = {}
+        self.state: Dict[str, Dict] = {}
+        self.stats = {'requests': 0, 'not_modified': 0, 'skipped': 0}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            self.responses = data.get('responses', {})
+            self.state = data.get('state', {})
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> object:
+        """JSON body of url, reusing the cached body when the server answers 304 Not Modified.
+
+        Credentials belong in headers/auth/params, which are not part of the cache key.
+        """
+        headers = dict(headers or {})
+        with self.lock:
+            cached = self.responses.get(url)
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        response = get_with_retry(url, headers=headers, **kwargs)
+        with self.lock:
+            self.stats['requests'] += 1
+            if response.status_code == 304 and cached:
+                self.stats['not_modified'] += 1
+                return cached['body']
+        if response.status_code in GONE_STATUSES:
+            with self.lock:
+                self.responses.pop(url, None)
+            raise ItemGone(f"GET {url.split('?')[0]} returned {response.status_code}")
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {url.split('?')[0]} returned {response.status_code}")
+
+        body = response.json()
+        with self.lock:
+            self.responses[url] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'body': body,
+            }
+        return body
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump({'responses': self.responses, 'state': self.state}, f, separators=(',', ':'))
+        os.replace(temporary, self.path)
+
+
+class QAStatusSync:
+    def __init__(self, qa_dir: str = QA_DIR, cache: Optional[ResponseCache] = None, max_workers: int = 4):
+        self.qa_dir = qa_dir
+        self.cache = cache or ResponseCache(os.path.join(qa_dir, '.status_cache.json'))
+        self.max_workers = max_workers
+        self.notion_url = os.getenv('NOTION_API_URL', 'https://api.notion.com').rstrip('/')
+        self.trello_url = os.getenv('TRELLO_API_URL', 'https://api.trello.com').rstrip('/')
+        self.jira_url = (os.getenv('JIRA_URL') or '').rstrip('/')
+        # (provider, id) of recorded items the provider no longer has
+        self.missing: Set[Tuple[str, str]] = set()
+
+    def load_items(self, versions: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Created QA items per version from qa/qa-items-v<version>.json"""
+        records = {}
+        for path in sorted(glob.glob(os.path.join(self.qa_dir, 'qa-items-v*.json'))):
+            with open(path, 'r') as f:
+                record = json.load(f)
+            if not versions or record['version'] in versions:
+                records[record['version']] = record
+        return records
+
+    def load_checklist(self, version: str, platform: str) -> Tuple[Optional[str], List[str]]:
+        """Path and items of the local checklist trigger_qa_process wrote, or the default items"""
+        path = os.path.join(self.qa_dir, f"qa-checklist-v{version}-{platform}.json")
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                return path, json.load(f).get('checklist', CHECKLIST_ITEMS)
+        return None, list(CHECKLIST_ITEMS)
+
+    def sync_notion(self, page_ids: List[str]) -> Dict[str, Set[str]]:
+        """Checked to-do texts per page; children are only refetched when the page was edited"""
+        token = os.getenv('NOTION_TOKEN')
+        if not token or not page_ids:
+            return {}
+        headers = {'Authorization': f'Bearer {token}', 'Notion-Version': '2022-06-28'}
+        known = self.cache.state.setdefault('notion', {})
+
+        def poll(page_id: str) -> Tuple[str, Set[str]]:
+            try:
+                return poll_page(page_id)
+            except ItemGone:
+                with self.cache.lock:
+                    self.missing.add(('notion', page_id))
+                known.pop(page_id, None)
+                return page_id, set()
+
+        def poll_page(page_id: str) -> Tuple[str, Set[str]]:
+            page = self.cache.get(f"{self.notion_url}/v1/pages/{page_id}", headers=headers)
+            previous = known.get(page_id)
+            edited = page.get('last_edited_time')
+            if previous and previous['last_edited_time'] == edited and previous['polled_at'] > minute_after(edited):
+                with self.cache.lock:
+                    self.cache.stats['skipped'] += 1
+                return page_id, set(previous['checked'])
+
+            checked, cursor = set(), None
+            while True:
+                query = {'page_size': 100, **({'start_cursor': cursor} if cursor else {})}
+                children = self.cache.get(f"{self.notion_url}/v1/blocks/{page_id}/children?{urlencode(query)}",
+                                          headers=headers)
+                for block in children.get('results', []):
+                    if block.get('type') == 'to_do' and block['to_do'].get('checked'):
+                        checked.add(''.join(part.get('plain_text', '') for part in block['to_do']['rich_text']))
+                if not children.get('has_more'):
+                    break
+                cursor = children.get('next_cursor')
+            known[page_id] = {'last_edited_time': edited, 'polled_at': time.time(), 'checked': sorted(checked)}
+            return page_id, checked
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return dict(executor.map(poll, page_ids))
+
+    def sync_trello(self, card_ids: List[str]) -> Dict[str, Dict[str, Set[str]]]:
+        """Completed check items per card and checklist name, fetched ten cards per batch request"""
+        key, token = os.getenv('TRELLO_API_KEY'), os.getenv('TRELLO_TOKEN')
+        if not key or not token or not card_ids:
+            return {}
+
+        def poll(batch: List[str]) -> Dict[str, Dict[str, Set[str]]]:
+            urls = ','.join(f"/cards/{card_id}/checklists" for card_id in batch)
+            responses = self.cache.get(f"{self.trello_url}/1/batch?{urlencode({'urls': urls})}",
+                                       params={'key': key, 'token': token})
+            cards = {}
+            for card_id, response in zip(batch, responses):
+                # Each batched call answers {'200': body} or its error, e.g. {'statusCode': 404, ...}
+                if '200' not in response and response.get('statusCode') in GONE_STATUSES:
+                    with self.cache.lock:
+                        self.missing.add(('trello', card_id))
+                cards[card_id] = {
+                    checklist['name']: {item['name'] for item in checklist.get('checkItems', [])
+                                        if item.get('state') == 'complete'}
+                    for checklist in response.get('200', [])
+                }
+            return cards
+
+        batches = [card_ids[i:i + TRELLO_BATCH_LIMIT] for i in range(0, len(card_ids), TRELLO_BATCH_LIMIT)]
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for cards in executor.map(poll, batches):
+                results.update(cards)
+        return results
+
+    def sync_jira(self, issue_keys: List[str]) -> Dict[str, bool]:
+        """Done flag per issue; after the first sync only issues updated since the last poll are fetched"""
+        email, token = os.getenv('JIRA_EMAIL'), os.getenv('JIRA_API_TOKEN')
+        if not self.jira_url or not email or not token or not issue_keys:
+            return {}
+        known = self.cache.state.setdefault('jira', {'last_sync': None, 'issues': {}})
+        # Relative JQL dates use the Jira server's clock, so no timezone conversion is needed
+        unseen = [key for key in issue_keys if key not in known['issues']]
+        window = None
+        if known['last_sync'] and not unseen:
+            window = int((time.time() - known['last_sync']) // 60) + 2
+
+        started = time.time()
+        for start in range(0, len(issue_keys), JIRA_SEARCH_LIMIT):
+            batch = issue_keys[start:start + JIRA_SEARCH_LIMIT]
+            jql = f"key in ({','.join(batch)})" + (f" AND updated >= -{window}m" if window else '')
+            # 'warn' turns a deleted key into a warning instead of failing the whole search with a 400
+            query = urlencode({'jql': jql, 'fields': 'status', 'maxResults': JIRA_SEARCH_LIMIT,
+                               'validateQuery': 'warn'})
+            result = self.cache.get(f"{self.jira_url}/rest/api/3/search?{query}", auth=(email, token),
+                                    headers={'Accept': 'application/json'})
+            found = set()
+            for issue in result.get('issues', []):
+                category = issue['fields']['status'].get('statusCategory', {}).get('key')
+                known['issues'][issue['key']] = category == 'done'
+                found.add(issue['key'])
+            if not window:
+                # Without the updated filter every existing issue is returned; missing keys stay unseen,
+                # so later syncs keep searching without the window and keep reporting them
+                self.missing.update(('jira', key) for key in batch if key not in found)
+
+        known['last_sync'] = started
+        return {key: known['issues'].get(key, False) for key in issue_keys}
+
+    def sync(self, versions: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Poll every provider once for all versions and aggregate pass/fail per version and platform"""
+        records = self.load_items(versions)
+        items = [item for record in records.values() for item in record['items']]
+        ids = {provider: sorted({item['id'] for item in items if item['provider'] == provider})
+               for provider in ('notion', 'trello', 'jira')}
+
+        notion = self.sync_notion(ids['notion'])
+        trello = self.sync_trello(ids['trello'])
+        jira = self.sync_jira(ids['jira'])
+
+        report = {}
+        for version, record in sorted(records.items()):
+            missing = [f"{item['provider']} {item['id']}" for item in record['items']
+                       if (item['provider'], item['id']) in self.missing]
+            checked: Dict[str, Set[str]] = {}
+            done_platforms: Set[str] = set()
+            platforms: List[str] = []
+            for item in record['items']:
+                for platform in item['platforms']:
+                    if platform not in platforms:
+                        platforms.append(platform)
+                    platform_checked = checked.setdefault(platform, set())
+                    if item['provider'] == 'notion':
+                        platform_checked |= notion.get(item['id'], set())
+                    elif item['provider'] == 'trello':
+                        for name, complete in trello.get(item['id'], {}).items():
+                            if name.upper().startswith(platform.upper()):
+                                platform_checked |= complete
+                    elif jira.get(item['id']):
+                        done_platforms.add(platform)
+
+            platform_reports = {}
+            for platform in platforms:
+                checklist_path, checklist = self.load_checklist(version, platform)
+                # A resolved Jira issue signs off the whole platform
+                passed_items = checklist if platform in done_platforms else \
+                    [entry for entry in checklist if entry in checked[platform]]
+                platform_reports[platform] = {
+                    'checked': len(passed_items),
+                    'total': len(checklist),
+                    'passed': len(passed_items) == len(checklist),
+                    'pending': [entry for entry in checklist if entry not in passed_items],
+                }
+                if checklist_path:
+                    self.update_checklist(checklist_path, passed_items, platform_reports[platform]['passed'])
+
+            report[version] = {
+                'build_number': record.get('build_number'),
+                'passed': bool(platform_reports) and all(p['passed'] for p in platform_reports.values()),
+                'platforms': platform_reports,
+                'missing': missing,
+            }
+
+        self.cache.save()
+        return report
+
+    def update_checklist(self, path: str, passed_items: List[str], passed: bool):
+        """Record the synced status in the local checklist written by trigger_qa_process"""
+        with open(path, 'r') as f:
+            checklist = json.load(f)
+        status = {'checked': passed_items, 'passed': passed}
+        if {k: checklist.get('qa_status', {}).get(k) for k in status} == status:
+            return
+        checklist['qa_status'] = {**status, 'synced_at': datetime.now().isoformat()}
+        with open(path, 'w') as f:
+            json.dump(checklist, f, indent=2)
+
+
+def print_report(report: Dict[str, Dict], stats: Dict[str, int], verbose: bool):
+    print("\n" + "="*60)
+    print("🧪 QA STATUS BY VERSION")
+    print("="*60)
+    for version, details in report.items():
+        platforms = '  '.join(f"{platform} {p['checked']}/{p['total']}" for platform, p in details['platforms'].items())
+        print(f"{'✅ PASS' if details['passed'] else '❌ FAIL'}  v{version:<10} {platforms}")
+        for item in details['missing']:
+            print(f"         ⚠️ {item} no longer exists")
+        if verbose:
+            for platform, p in details['platforms'].items():
+                for entry in p['pending']:
+                    print(f"         {platform}: [ ] {entry}")
+    if not report:
+        print("No QA items recorded yet (qa/qa-items-v*.json)")
+    print("="*60)
+    print(f"🔄 {stats['requests']} requests, {stats['not_modified']} not modified, "
+          f"{stats['skipped']} unchanged pages skipped\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Aggregate QA progress from Notion, Trello and Jira')
+    parser.add_argument('versions', nargs='*', help='versions to sync (default: all recorded)')
+    parser.add_argument('--qa-dir', default=QA_DIR)
+    parser.add_argument('--verbose', action='store_true', help='list unchecked items')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('--check', action='store_true', help='exit 1 unless every version passed')
+    args = parser.parse_args(argv)
+
+    syncer = QAStatusSync(args.qa_dir)
+    report = syncer.sync(args.versions or None)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, syncer.cache.stats, args.verbose)
+
+    if args.check and not all(details['passed'] for details in report.values()):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
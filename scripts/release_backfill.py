@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Release Backfill
+Replays PostDeploymentAutomation for existing release-<platform>-v<version> tags, rebuilding
+docs/releases/*.md, logs/release_history.{json,csv} and qa/ checklists for releases that predate
+the tooling. Everything comes from the local repository (and the artifact store when it has the
+release): no notifications, no QA tool calls, no tags pushed
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from artifact_store import ArtifactStore
+from git_objects import read_blobs
+from post_deployment import PostDeploymentAutomation
+from pubspec_lock_diff import release_notes_diff, version_key
+from release_notes_index import update_index
+
+TAG_RE = re.compile(r'^release-(?P<platform>[a-z]+)-v(?P<version>.+)$')
+PUBSPEC_VERSION_RE = re.compile(r'^version:\s*["\']?([^\s"\'+]+)(?:\+(\d+))?', re.MULTILINE)
+HISTORY_JSON = 'logs/release_history.json'
+HISTORY_CSV = 'logs/release_history.csv'
+CHANGELOG_FORMAT = '--pretty=format:- %s (%h)'
+FIRST_RELEASE_COMMITS = 10
+REF_FIELDS = ('tag', 'object', 'peeled', 'date', 'tagger', 'author', 'peeled_author')
+
+
+class ReplayedRelease(PostDeploymentAutomation):
+    """A past release rebuilt from its tag; network and tagging steps are no-ops"""
+
+    def __init__(self, release: Dict, store: Optional[ArtifactStore] = None):
+        self.platform = release['platform']
+        self.version = release['version']
+        self.build_number = release['build_number']
+        self.environment = 'production'
+        self.timestamp = release['timestamp']
+        self.commit_hash = release['commit']
+        self.branch_name = 'unknown'
+        self.triggered_by = release['triggered_by']
+        self.changelog = release['changelog']
+        self.tag = release['tag']
+        self.previous_tag = release.get('previous_tag')
+        self.store = store
+        self.artifacts = None
+        self.fingerprints = None
+
+    def generate_changelog(self) -> str:
+        return self.changelog
+
+    def release_date(self) -> str:
+        return datetime.fromisoformat(self.timestamp).strftime('%Y-%m-%d %H:%M:%S')
+
+    def collect_artifact_metadata(self) -> Dict[str, Dict]:
+        """Sizes and digests from the artifact store, if the release was ingested; builds are not on disk"""
+        if self.artifacts is None:
+            self.artifacts = {}
+            if self.store is not None:
+                try:
+                    manifest = self.store.load_manifest(self.platform, self.version)
+                    self.artifacts = {name: {'size': details['size'], 'sha256': details['sha256']}
+                                      for name, details in manifest['artifacts'].items()}
+                except (FileNotFoundError, KeyError, ValueError):
+                    pass
+        return self.artifacts
+
+    def dependency_changes(self) -> str:
+        """Dependency table between the release tags, sized from their stored summaries"""
+        if not self.previous_tag:
+            return "No previous release to compare."
+        try:
+            return release_notes_diff(self.previous_tag, self.tag)
+        except Exception as e:
+            print(f"⚠️ Could not diff dependencies for {self.tag}: {e}")
+            return "Dependency changes not available."
+
+    def send_slack_notification(self):
+        pass
+
+    def store_artifacts(self):
+        pass
+
+    def create_git_tag(self):
+        pass
+
+    def store_size_summary(self):
+        pass  # the analysis files on disk belong to the current build, not to the replayed release
+
+    def index_release_notes(self):
+        pass  # indexed once after all releases are replayed
+
+
+def git_lines(args: List[str]) -> Iterator[str]:
+    """Stream the output lines of a git command"""
+    process = subprocess.Popen(['git'] + args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                               text=True, encoding='utf-8', errors='replace')
+    try:
+        for line in process.stdout:
+            yield line.rstrip('\n')
+    finally:
+        process.stdout.close()
+        process.wait()
+
+
+def list_release_tags(platforms: Optional[List[str]] = None) -> List[Dict]:
+    """release-* tags with their commit, date and tagger, in version order (oldest first)"""
+    fmt = '%09'.join(['%(refname:short)', '%(objectname)', '%(*objectname)', '%(creatordate:iso-strict)',
+                      '%(taggername)', '%(authorname)', '%(*authorname)'])
+    releases = []
+    refs = git_lines(['for-each-ref', f'--format={fmt}', 'refs/tags/release-*'])
+    for line in refs:
+        ref = dict(zip(REF_FIELDS, line.split('\t')))
+        match = TAG_RE.match(ref.get('tag', ''))
+        if not match or (platforms and match.group('platform') not in platforms):
+            continue
+        # Local wall-clock time, like the timestamps written by PostDeploymentAutomation
+        timestamp = datetime.fromisoformat(ref['date'].replace('Z', '+00:00')).astimezone().replace(tzinfo=None).isoformat()
+        releases.append({
+            'tag': ref['tag'],
+            'platform': match.group('platform'),
+            'version': match.group('version'),
+            'commit': ref['peeled'] or ref['object'],
+            'timestamp': timestamp,
+            'triggered_by': ref['tagger'] or ref['peeled_author'] or ref['author'] or 'automated',
+        })
+    # creatordate is the commit date for lightweight tags, not when they were tagged, so it only breaks ties
+    releases.sort(key=lambda release: (version_key(release['version']), release['timestamp']))
+    return releases
+
+
+def read_build_numbers(commits: List[str]) -> Dict[str, str]:
+    """Build number from pubspec.yaml at each commit, read through one git cat-file --batch process"""
+    blobs = read_blobs(f"{commit}:pubspec.yaml" for commit in commits)
+    builds = {}
+    for spec, content in blobs.items():
+        if content is None:
+            continue
+        match = PUBSPEC_VERSION_RE.search(content.decode('utf-8', errors='replace'))
+        if match and match.group(2):
+            builds[spec.rsplit(':', 1)[0]] = match.group(2)
+    return builds
+
+
+def changelog_for(release: Dict) -> str:
+    """Commits since the previous tag of the same platform (the last few for a first release)"""
+    if release.get('previous'):
+        args = ['log', f"{release['previous']}..{release['commit']}", CHANGELOG_FORMAT]
+        empty = "- Initial release"
+    else:
+        args = ['log', f'-{FIRST_RELEASE_COMMITS}', release['commit'], CHANGELOG_FORMAT]
+        empty = "- No changelog available"
+    commits = "\n".join(line for line in git_lines(args) if line)
+    return commits or empty
+
+
+def prepare_releases(platforms: Optional[List[str]] = None, workers: Optional[int] = None) -> List[Dict]:
+    """Tag metadata, build numbers and changelogs for every release tag"""
+    releases = list_release_tags(platforms)
+    previous_by_platform: Dict[str, Dict] = {}
+    for release in releases:
+        previous = previous_by_platform.get(release['platform'])
+        release['previous'] = previous['commit'] if previous else None
+        release['previous_tag'] = previous['tag'] if previous else None
+        previous_by_platform[release['platform']] = release
+
+    builds = read_build_numbers([release['commit'] for release in releases])
+    for release in releases:
+        release['build_number'] = builds.get(release['commit'], 'unknown')
+
+    # One git log per commit range; each is an independent subprocess, so threads parallelise them
+    with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) * 4)) as executor:
+        for release, changelog in zip(releases, executor.map(changelog_for, releases)):
+            release['changelog'] = changelog
+    return releases
+
+
+def write_atomic(path: str, write):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w', newline='') as f:
+        write(f)
+    os.replace(temporary, path)
+
+
+def merge_history(rows: List[Dict]) -> int:
+    """Add backfilled rows missing from the release history; both logs are rewritten once"""
+    history = []
+    if os.path.exists(HISTORY_JSON):
+        with open(HISTORY_JSON, 'r') as f:
+            history = json.load(f)
+
+    known = {(entry.get('platform'), entry.get('version'), entry.get('commit_hash')) for entry in history}
+    added = [row for row in rows if (row['platform'], row['version'], row['commit_hash']) not in known]
+    if not added:
+        return 0
+    history = sorted(history + added, key=lambda entry: entry.get('timestamp', ''))
+
+    write_atomic(HISTORY_JSON, lambda f: json.dump(history, f, indent=2))
+    fieldnames = [key for key in rows[0] if key != 'artifacts']
+
+    def write_csv(f):
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(history)
+
+    write_atomic(HISTORY_CSV, write_csv)
+    return len(added)
+
+
+def backfill(platforms: Optional[List[str]] = None, force: bool = False, workers: Optional[int] = None,
+             verbose: bool = False) -> Dict[str, int]:
+    releases = prepare_releases(platforms, workers)
+    store = ArtifactStore()
+    stats = {'releases': len(releases), 'release_notes': 0, 'qa_checklists': 0, 'history_rows': 0}
+    rows = []
+
+    for release in releases:
+        replay = ReplayedRelease(release, store)
+        notes = f"docs/releases/v{replay.version}-{replay.platform}.md"
+        checklist = f"qa/qa-checklist-v{replay.version}-{replay.platform}.json"
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        with output:
+            if force or not os.path.exists(notes):
+                replay.create_release_notes()
+                stats['release_notes'] += 1
+            if force or not os.path.exists(checklist):
+                replay.trigger_qa_process()
+                stats['qa_checklists'] += 1
+        rows.append({**replay.release_metadata(), 'artifacts': replay.collect_artifact_metadata()})
+
+    if rows:
+        stats['history_rows'] = merge_history(rows)
+    update_index()
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Rebuild release notes, history and QA checklists from release tags')
+    parser.add_argument('--platform', action='append', help='only backfill this platform (repeatable)')
+    parser.add_argument('--force', action='store_true', help='overwrite existing release notes and QA checklists')
+    parser.add_argument('--workers', type=int, help='parallel git log processes')
+    parser.add_argument('--verbose', action='store_true', help='print every file written')
+    args = parser.parse_args(argv)
+
+    started = datetime.now()
+    stats = backfill(args.platform, args.force, args.workers, args.verbose)
+    if not stats['releases']:
+        print("⚠️ No release-<platform>-v<version> tags found")
+        return 0
+
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"✅ Backfilled {stats['releases']} releases in {elapsed:.1f}s: "
+          f"{stats['release_notes']} release notes, {stats['qa_checklists']} QA checklists, "
+          f"{stats['history_rows']} new history rows")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Release Metrics
+Counters, gauges and histograms for the release automation, exported in the Prometheus textfile
+format for node_exporter's textfile collector. Each process merges its increments into the file
+under a lock and replaces it atomically, so counters keep growing across runs and scripts
+"""
+
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Point at node_exporter's --collector.textfile.directory on CI hosts; empty disables the export
+METRICS_FILE = os.getenv('RELEASE_METRICS_FILE', 'logs/metrics/release_automation.prom')
+DURATION_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+HTTP_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+GIT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+PROVIDERS = ('slack', 'notion', 'trello', 'jira', 'atlassian')
+SERIES_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})?$')
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.lock = threading.Lock()
+        self.values: Dict[Labels, object] = {}
+
+    def key(self, labels: Dict[str, object]) -> Labels:
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def series_name(self, suffix: str, key: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = list(zip(self.label_names, key)) + list(extra)
+        if not pairs:
+            return self.name + suffix
+        return self.name + suffix + '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def samples(self) -> Iterator[Tuple[str, float]]:
+        for key, value in self.values.items():
+            yield self.series_name('', key), value
+
+    def owns(self, series: str) -> bool:
+        match = SERIES_RE.match(series)
+        return bool(match) and match.group(1) in self.sample_names()
+
+    def sample_names(self) -> Tuple[str, ...]:
+        return (self.name,)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        with self.lock:
+            self.values[self.key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value: float, **labels):
+        key = self.key(labels)
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * len(self.buckets), 0.0))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self.values[key] = (counts, total + value)
+
+    def samples(self) -> Iterator[Tuple[str, float]]:
+        for key, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield self.series_name('_bucket', key, (('le', _format_value(bound)),)), cumulative
+            yield self.series_name('_sum', key), total
+            yield self.series_name('_count', key), cumulative
+
+    def sample_names(self) -> Tuple[str, ...]:
+        return (f"{self.name}_bucket", f"{self.name}_sum", f"{self.name}_count")
+
+
+STAGE_DURATION = Histogram('release_stage_duration_seconds', 'Duration of release automation stages',
+                           ('script', 'stage'))
+STAGE_RUNS = Counter('release_stage_runs_total', 'Release automation stage runs by outcome',
+                     ('script', 'stage', 'outcome'))
+STAGE_LAST_SUCCESS = Gauge('release_stage_last_success_timestamp_seconds',
+                           'Unix time of the last successful run of a stage', ('script', 'stage'))
+HTTP_DURATION = Histogram('release_http_request_duration_seconds', 'Latency of integration HTTP requests',
+                          ('provider', 'method'), HTTP_BUCKETS)
+HTTP_REQUESTS = Counter('release_http_requests_total', 'Integration HTTP requests by response status',
+                        ('provider', 'method', 'status'))
+HTTP_RETRIES = Counter('release_http_retries_total', 'Integration HTTP requests retried', ('provider',))
+QA_INTEGRATIONS = Counter('release_qa_integrations_total', 'QA integration runs by outcome',
+                          ('integration', 'outcome'))
+GIT_DURATION = Histogram('release_git_command_duration_seconds', 'Time spent in git subprocesses',
+                         ('command',), GIT_BUCKETS)
+FILES = Counter('release_config_files_total', 'Configuration files rewritten or skipped as unchanged',
+                ('script', 'result'))
+ARTIFACT_SIZE = Gauge('release_artifact_size_bytes', 'Size of the last released build artifacts',
+                      ('platform', 'artifact'))
+
+METRICS: List[Metric] = [STAGE_DURATION, STAGE_RUNS, STAGE_LAST_SUCCESS, HTTP_DURATION, HTTP_REQUESTS,
+                         HTTP_RETRIES, QA_INTEGRATIONS, GIT_DURATION, FILES, ARTIFACT_SIZE]
+
+
+def provider_of(url: str) -> str:
+    """Integration an URL belongs to (matches real hosts and the mock server's path prefixes)"""
+    lowered = url.lower()
+    for provider in PROVIDERS:
+        if provider in lowered:
+            return 'jira' if provider == 'atlassian' else provider
+    return 'other'
+
+
+@contextmanager
+def stage(script: str, name: str):
+    """Time a stage and count its outcome; exceptions are recorded as failures and re-raised.
+
+    Yields a status dict: a stage that handles its own errors sets status['ok'] = False to count as failed.
+    """
+    started = time.monotonic()
+    outcome = 'failure'
+    status = {'ok': True}
+    try:
+        yield status
+        outcome = 'failure' if status['ok'] is False else 'success'
+    finally:
+        STAGE_DURATION.observe(time.monotonic() - started, script=script, stage=name)
+        STAGE_RUNS.inc(script=script, stage=name, outcome=outcome)
+        if outcome == 'success':
+            STAGE_LAST_SUCCESS.set(time.time(), script=script, stage=name)
+
+
+def timed_stage(script: str, flush: bool = False) -> Callable:
+    """Decorator recording a method as a stage named after it, optionally writing the textfile after"""
+    def decorator(function: Callable) -> Callable:
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            try:
+                with stage(script, function.__name__):
+                    return function(*args, **kwargs)
+            finally:
+                if flush:
+                    write_textfile()
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def git_timer(command: str):
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        GIT_DURATION.observe(time.monotonic() - started, command=command)
+
+
+def read_textfile(path: str) -> Dict[str, float]:
+    """Series -> value from a previously written textfile, in file order"""
+    series: Dict[str, float] = {}
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                if not line.strip() or line.startswith('#'):
+                    continue
+                name, _, value = line.rstrip('\n').rpartition(' ')
+                try:
+                    series[name] = float(value)
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return series
+
+
+def take_pending() -> Dict[str, Dict[Labels, object]]:
+    """This process's pending values per metric, cleared here; worker processes return them to the parent"""
+    pending = {}
+    for metric in METRICS:
+        with metric.lock:
+            pending[metric.name] = dict(metric.values)
+            metric.values.clear()
+    return pending
+
+
+def merge_pending(pending: Dict[str, Dict[Labels, object]]):
+    """Add values taken from another process to this one's, to be written with its next write_textfile"""
+    for metric in METRICS:
+        with metric.lock:
+            for key, value in pending.get(metric.name, {}).items():
+                if metric.kind == 'gauge' or key not in metric.values:
+                    metric.values[key] = value
+                elif metric.kind == 'histogram':
+                    counts, total = metric.values[key]
+                    other_counts, other_total = value
+                    metric.values[key] = ([a + b for a, b in zip(counts, other_counts)], total + other_total)
+                else:
+                    metric.values[key] += value
+
+
+def render(previous: Dict[str, float]) -> str:
+    """Merge this process's samples into the previous ones: counters and histograms add up, gauges replace"""
+    lines = []
+    claimed = set()
+    for metric in METRICS:
+        merged = {name: value for name, value in previous.items() if metric.owns(name)}
+        claimed.update(merged)
+        with metric.lock:
+            samples = list(metric.samples())
+            if metric.kind != 'gauge':
+                metric.values.clear()  # these increments are now in the file
+        for name, value in samples:
+            merged[name] = value if metric.kind == 'gauge' else merged.get(name, 0) + value
+        if not merged:
+            continue
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(f"{name} {_format_value(value)}" for name, value in merged.items())
+    # Series from metrics this version no longer defines are kept rather than silently dropped
+    lines.extend(f"{name} {_format_value(value)}" for name, value in previous.items() if name not in claimed)
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path: Optional[str] = None):
+    """Merge pending samples into the textfile atomically; later samples start from zero again"""
+    path = METRICS_FILE if path is None else path
+    if not path:
+        return
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(f"{path}.lock", 'w') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            content = render(read_textfile(path))
+            # node_exporter only reads *.prom, so the temporary file is never scraped half-written
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, 'w') as f:
+                f.write(content)
+            os.replace(temporary, path)
+    except OSError as e:
+        print(f"⚠️ Could not write release metrics: {e}")
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Release Notes Index
+Keeps docs/releases/INDEX.md and a compact JSON search index (changelog terms, commits, versions)
+in step with the v<version>-<platform>.md notes. Only notes whose content hash changed are parsed
+again, so updating and searching stay instant with thousands of releases
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Dict, List, Optional, Set
+
+from file_cache import FileHashCache
+from pubspec_lock_diff import version_key
+
+NOTES_DIR = 'docs/releases'
+INDEX_MD = 'INDEX.md'
+SEARCH_INDEX = 'search_index.json'
+INDEX_VERSION = '1'
+NOTE_RE = re.compile(r'^v(?P<version>.+)-(?P<platform>[a-z]+)\.md$')
+FIELD_RE = re.compile(r'^- \*\*(?P<key>[^*]+):\*\* (?P<value>.*)$')
+ENTRY_RE = re.compile(r'^[-*•]\s+(?P<subject>.*?)(?:\s+\((?P<commit>[0-9a-f]{7,40})\))?$')
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9._-]*[a-z0-9]|[a-z0-9]')
+HASH_RE = re.compile(r'^[0-9a-f]{7,40}$')
+SHORT_HASH = 7
+STOPWORDS = frozenset(('a', 'an', 'and', 'the', 'to', 'of', 'in', 'on', 'for', 'with', 'from', 'is'))
+
+
+def tokenize(text: str) -> Set[str]:
+    terms = set(TOKEN_RE.findall(text.lower())) - STOPWORDS
+    hashes = {token for token in terms if len(token) > SHORT_HASH and HASH_RE.match(token)}
+    return (terms - hashes) | {token[:SHORT_HASH] for token in hashes}
+
+
+def parse_note(text: str) -> Dict:
+    """Header fields and changelog entries ([subject, commit]) of one release notes file"""
+    fields: Dict[str, str] = {}
+    entries: List[List[str]] = []
+    section = None
+    for line in text.splitlines():
+        if line.startswith('## '):
+            section = 'changelog' if 'Changelog' in line else line
+            continue
+        if section is None or section.endswith('Release'):
+            match = FIELD_RE.match(line)
+            if match:
+                fields[match.group('key').lower().replace(' ', '_')] = match.group('value').strip()
+        elif section == 'changelog' and line.strip():
+            match = ENTRY_RE.match(line.strip())
+            if match:
+                entries.append([match.group('subject'), match.group('commit') or ''])
+    return {
+        'build': fields.get('build_number', ''),
+        'date': fields.get('release_date', ''),
+        'branch': fields.get('branch', ''),
+        'commit': fields.get('commit', ''),
+        'entries': entries,
+    }
+
+
+def doc_terms(doc: Dict) -> Set[str]:
+    """Release-level terms: version, platform, build and release commit"""
+    return tokenize(f"{doc['version']} {doc['platform']} {doc['build']} {doc['commit']}") | {doc['version'].lower()}
+
+
+def entry_terms(entry: List[str]) -> Set[str]:
+    return tokenize(f"{entry[0]} {entry[1]}")
+
+
+def load_search_index(notes_dir: str = NOTES_DIR) -> Dict:
+    try:
+        with open(os.path.join(notes_dir, SEARCH_INDEX), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') == INDEX_VERSION:
+            return index
+    except (OSError, ValueError):
+        pass
+    return {'version': INDEX_VERSION, 'docs': [], 'terms': {}}
+
+
+def update_index(notes_dir: str = NOTES_DIR, verbose: bool = False) -> Dict[str, int]:
+    """Re-parse changed notes and rewrite INDEX.md and the search index when anything changed.
+
+    Parsed notes live in the search index itself, keyed by content hash; the local file cache only
+    lets unchanged files skip rehashing.
+    """
+    stats = {'notes': 0, 'parsed': 0, 'removed': 0}
+    if not os.path.isdir(notes_dir):
+        return stats
+
+    previous = {doc['file']: doc for doc in load_search_index(notes_dir)['docs']}
+    cache = FileHashCache('release_notes_index', INDEX_VERSION)
+    docs = []
+    live = []
+    for entry in os.scandir(notes_dir):
+        match = NOTE_RE.match(entry.name)
+        if not match or not entry.is_file():
+            continue
+        live.append(entry.path)
+        fingerprint, hashed = cache.lookup(entry.path)
+        if not hashed:
+            cache.store(entry.path, fingerprint, True)
+        doc = previous.pop(entry.name, None)
+        if doc is None or doc['sha256'] != fingerprint['sha256']:
+            with open(entry.path, 'r', encoding='utf-8') as f:
+                doc = {'file': entry.name, 'version': match.group('version'), 'platform': match.group('platform'),
+                       'sha256': fingerprint['sha256'], **parse_note(f.read())}
+            stats['parsed'] += 1
+            if verbose:
+                print(f"   📝 {entry.name}")
+        docs.append(doc)
+
+    cache.prune(live)
+    cache.save()
+    stats['notes'] = len(docs)
+    stats['removed'] = len(previous)
+
+    index_md = os.path.join(notes_dir, INDEX_MD)
+    if not (stats['parsed'] or stats['removed']) and os.path.exists(index_md):
+        return stats
+
+    docs.sort(key=lambda doc: (doc['platform'], version_key(doc['version'])), reverse=True)
+    write_atomic(index_md, render_index(docs))
+    write_atomic(os.path.join(notes_dir, SEARCH_INDEX),
+                 json.dumps(build_search_index(docs), separators=(',', ':'), ensure_ascii=False))
+    return stats
+
+
+def build_search_index(docs: List[Dict]) -> Dict:
+    """{'docs': [...], 'terms': {term: [doc ids]}} with doc ids in listing order"""
+    terms: Dict[str, List[int]] = {}
+    for doc_id, doc in enumerate(docs):
+        text = '\n'.join(f"{subject} {commit}" for subject, commit in doc['entries'])
+        for term in doc_terms(doc) | tokenize(text):
+            terms.setdefault(term, []).append(doc_id)
+    return {'version': INDEX_VERSION, 'docs': docs, 'terms': dict(sorted(terms.items()))}
+
+
+def render_index(docs: List[Dict]) -> str:
+    lines = ["# Release Notes Index", "",
+             "Search changelogs with `python3 scripts/release_notes_index.py search <terms>`.", ""]
+    platforms = sorted({doc['platform'] for doc in docs})
+    for platform in platforms:
+        lines += [f"## {platform.upper()}", "",
+                  "| Version | Build | Release Date | Changes | Commit |",
+                  "|---------|-------|--------------|---------|--------|"]
+        for doc in docs:
+            if doc['platform'] == platform:
+                date = doc['date'][:10]
+                lines.append(f"| [v{doc['version']}]({doc['file']}) | {doc['build']} | {date} | "
+                             f"{len(doc['entries'])} | {doc['commit'][:SHORT_HASH]} |")
+        lines.append("")
+    lines.append("*Generated automatically by scripts/release_notes_index.py*")
+    return "\n".join(lines) + "\n"
+
+
+def write_atomic(path: str, content: str):
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(temporary, path)
+
+
+def search(query: str, notes_dir: str = NOTES_DIR, platform: Optional[str] = None) -> List[Dict]:
+    """Releases containing every query term, with the changelog entries that match"""
+    index = load_search_index(notes_dir)
+    wanted = tokenize(query)
+    if not wanted:
+        return []
+
+    candidates = None
+    for term in wanted:
+        postings = set(index['terms'].get(term, ()))
+        candidates = postings if candidates is None else candidates & postings
+        if not candidates:
+            return []
+
+    results = []
+    for doc_id in sorted(candidates):
+        doc = index['docs'][doc_id]
+        if platform and doc['platform'] != platform:
+            continue
+        entry_wanted = wanted - doc_terms(doc)
+        entries = [entry for entry in doc['entries'] if entry_wanted <= entry_terms(entry)] if entry_wanted \
+            else doc['entries']
+        if entries or not entry_wanted:
+            results.append({**doc, 'entries': entries})
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Index and search the release notes in docs/releases')
+    parser.add_argument('--dir', default=NOTES_DIR, help='release notes directory')
+    subparsers = parser.add_subparsers(dest='command')
+
+    update_parser = subparsers.add_parser('update', help='refresh INDEX.md and the search index (default)')
+    update_parser.add_argument('--verbose', action='store_true', help='list every note parsed again')
+
+    search_parser = subparsers.add_parser('search', help='find releases by changelog words, commit or version')
+    search_parser.add_argument('terms', nargs='+')
+    search_parser.add_argument('--platform', help='only releases of this platform')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'search':
+        if not os.path.exists(os.path.join(args.dir, SEARCH_INDEX)):
+            update_index(args.dir)
+        results = search(' '.join(args.terms), args.dir, args.platform)
+        if not results:
+            print("🔍 No matching releases")
+            return 1
+        for doc in results:
+            print(f"📦 v{doc['version']} ({doc['platform']}, build {doc['build'] or '?'}) - {doc['date'][:10]}"
+                  f"  {os.path.join(args.dir, doc['file'])}")
+            for subject, commit in doc['entries']:
+                print(f"   - {subject}" + (f" ({commit})" if commit else ""))
+        return 0
+
+    stats = update_index(args.dir, getattr(args, 'verbose', False))
+    print(f"✅ Release notes index: {stats['notes']} notes, {stats['parsed']} parsed, {stats['removed']} removed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Size Ledger
+Records artifact sizes per version, build, platform and commit next to the release history,
+enforces size budgets in CI and answers size trend queries
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import yaml
+
+LEDGER_FILE = 'logs/size_ledger.jsonl'
+BUDGETS_FILE = 'config/size_budgets.yaml'
+
+# Default budgets mirror the thresholds analyze_bundle_size.sh has always used
+DEFAULT_BUDGETS = {
+    'artifacts': {
+        'apk': {'max_bytes': 52428800, 'warn_bytes': 20971520},
+        'aab': {'max_bytes': 157286400, 'warn_bytes': 104857600},
+        'main.dart.js': {'max_bytes': 5242880},
+    },
+    'components': {},
+}
+
+# Build outputs measured for each platform: artifact name -> path or glob
+PLATFORM_ARTIFACTS = {
+    'android': {
+        'apk': 'build/app/outputs/flutter-apk/app-release.apk',
+        'aab': 'build/app/outputs/bundle/release/app-release.aab',
+    },
+    'ios': {'ipa': 'build/ios/ipa/*.ipa'},
+    'web': {'web': 'build/web', 'main.dart.js': 'build/web/main.dart.js'},
+}
+
+
+def directory_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def measure_artifacts(platform: str) -> Dict[str, Dict]:
+    """Size (and component breakdown for zip artifacts and the web build) of the build outputs on disk"""
+    measured = {}
+    for artifact, pattern in PLATFORM_ARTIFACTS.get(platform, {}).items():
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            continue
+        path = matches[-1]
+        if os.path.isdir(path):
+            components = {}
+            if artifact == 'web':
+                try:
+                    from web_bundle_analyzer import analyze, ledger_components
+                    components = ledger_components(analyze(path))
+                except ImportError:
+                    pass
+            measured[artifact] = {'path': path, 'size': directory_size(path), 'components': components}
+            continue
+
+        components = {}
+        if artifact in ('apk', 'aab', 'ipa'):
+            try:
+                from artifact_inspector import inspect_artifact
+                report = inspect_artifact(path)
+                components = {name: sizes['compressed'] for name, sizes in report['components'].items()}
+            except ImportError:
+                pass
+        measured[artifact] = {'path': path, 'size': os.path.getsize(path), 'components': components}
+    return measured
+
+
+class SizeLedger:
+    def __init__(self, ledger_file: str = LEDGER_FILE, budgets_file: str = BUDGETS_FILE):
+        self.ledger_file = ledger_file
+        self.budgets = self.load_budgets(budgets_file)
+
+    def load_budgets(self, budgets_file: str) -> Dict:
+        """Load budgets from YAML, falling back to the built-in thresholds"""
+        if not os.path.exists(budgets_file):
+            return DEFAULT_BUDGETS
+        with open(budgets_file, 'r') as f:
+            budgets = yaml.safe_load(f) or {}
+        return {'artifacts': budgets.get('artifacts') or {}, 'components': budgets.get('components') or {}}
+
+    def entries(self, platform: Optional[str] = None, artifact: Optional[str] = None) -> Iterator[Dict]:
+        """Stream ledger entries in recorded order, skipping non-matching lines before decoding"""
+        if not os.path.exists(self.ledger_file):
+            return
+        platform_marker = f'"platform": "{platform}"' if platform else None
+        artifact_marker = f'"artifact": "{artifact}"' if artifact else None
+        with open(self.ledger_file, 'r') as f:
+            for line in f:
+                if platform_marker and platform_marker not in line:
+                    continue
+                if artifact_marker and artifact_marker not in line:
+                    continue
+                yield json.loads(line)
+
+    def record(self, version: str, build_number: str, platform: str, commit: str,
+               artifacts: Dict[str, Dict]) -> List[Dict]:
+        """Append one ledger entry per artifact"""
+        recorded_at = datetime.now().isoformat()
+        rows = [{
+            'recorded_at': recorded_at,
+            'version': version,
+            'build_number': str(build_number),
+            'platform': platform,
+            'commit': commit,
+            'artifact': artifact,
+            'size': details['size'],
+            'components': details.get('components', {}),
+        } for artifact, details in sorted(artifacts.items())]
+
+        os.makedirs(os.path.dirname(self.ledger_file) or '.', exist_ok=True)
+        with open(self.ledger_file, 'a') as f:
+            for row in rows:
+                f.write(json.dumps(row, sort_keys=True) + '\n')
+        return rows
+
+    def previous_entry(self, platform: str, artifact: str, version: str) -> Optional[Dict]:
+        """Most recent entry of the same platform/artifact from a different version"""
+        previous = None
+        for entry in self.entries(platform, artifact):
+            if entry['version'] != version:
+                previous = entry
+        return previous
+
+    def latest_entries(self, platform: str, version: Optional[str] = None) -> Dict[str, Dict]:
+        """Latest entry per artifact for a platform (optionally restricted to one version)"""
+        latest = {}
+        for entry in self.entries(platform):
+            if version is None or entry['version'] == version:
+                latest[entry['artifact']] = entry
+        return latest
+
+    def component_budget(self, component: str) -> Optional[Dict]:
+        for prefix, budget in self.budgets['components'].items():
+            if component == prefix or component.startswith(prefix + '/'):
+                return budget
+        return None
+
+    def evaluate(self, platform: str, artifact: str, size: int, components: Dict[str, int],
+                 version: str) -> List[Dict]:
+        """Check one artifact against its budgets and the previous release"""
+        findings = []
+        previous = self.previous_entry(platform, artifact, version)
+
+        checks = [(artifact, size, self.budgets['artifacts'].get(artifact),
+                   previous['size'] if previous else None)]
+        for component, component_size in components.items():
+            previous_size = previous.get('components', {}).get(component) if previous else None
+            checks.append((f"{artifact}:{component}", component_size,
+                           self.component_budget(component), previous_size))
+
+        for name, current, budget, previous_size in checks:
+            if not budget:
+                continue
+            if budget.get('max_bytes') and current > budget['max_bytes']:
+                findings.append({'level': 'error', 'name': name,
+                                 'message': f"{format_size(current)} exceeds budget {format_size(budget['max_bytes'])}"})
+            elif budget.get('warn_bytes') and current > budget['warn_bytes']:
+                findings.append({'level': 'warning', 'name': name,
+                                 'message': f"{format_size(current)} exceeds soft limit {format_size(budget['warn_bytes'])}"})
+
+            limit = budget.get('max_growth_percent')
+            if limit is not None and previous_size:
+                growth = (current - previous_size) / previous_size * 100
+                if growth > limit:
+                    findings.append({'level': 'error', 'name': name,
+                                     'message': f"grew {growth:.1f}% since v{previous['version']} "
+                                                f"({format_size(previous_size)} → {format_size(current)}), "
+                                                f"limit {limit}%"})
+        return findings
+
+    def gate(self, platform: str, version: Optional[str] = None) -> List[Dict]:
+        """Evaluate a recorded version, or the build outputs currently on disk"""
+        if version:
+            current = {name: entry for name, entry in self.latest_entries(platform, version).items()}
+        else:
+            version = ''
+            current = measure_artifacts(platform)
+
+        findings = []
+        for artifact, details in sorted(current.items()):
+            findings.extend(self.evaluate(platform, artifact, details['size'],
+                                          details.get('components', {}), version))
+        return findings
+
+    def trend(self, platform: str, artifact: str, limit: int = 20) -> List[Dict]:
+        """Size per recorded release for one platform/artifact, oldest first"""
+        rows = [{'version': entry['version'], 'build_number': entry['build_number'],
+                 'commit': entry['commit'][:8], 'recorded_at': entry['recorded_at'], 'size': entry['size']}
+                for entry in self.entries(platform, artifact)]
+        return rows[-limit:]
+
+
+def format_size(size: int) -> str:
+    if size >= 1048576:
+        return f"{size / 1048576:.2f} MB"
+    if size >= 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size} B"
+
+
+def get_commit_hash() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD']).decode().strip()
+    except:
+        return 'unknown'
+
+
+def print_findings(findings: List[Dict]) -> bool:
+    """Print gate findings and return True when the gate passes"""
+    errors = [f for f in findings if f['level'] == 'error']
+    for finding in findings:
+        icon = "❌" if finding['level'] == 'error' else "⚠️"
+        print(f"{icon} {finding['name']}: {finding['message']}")
+    if errors:
+        print(f"❌ Size gate failed: {len(errors)} budget violation(s)")
+    else:
+        print("✅ Size gate passed")
+    return not errors
+
+
+def print_trend(rows: List[Dict], platform: str, artifact: str):
+    print("\n" + "="*72)
+    print(f"📈 SIZE TREND: {platform} / {artifact}")
+    print("="*72)
+    previous = None
+    for row in rows:
+        change = ''
+        if previous:
+            delta = row['size'] - previous
+            change = f"{'+' if delta >= 0 else '-'}{format_size(abs(delta))} ({delta / previous:+.1%})"
+        print(f"v{row['version']:<12} #{row['build_number']:<8} {row['commit']:<10}"
+              f"{format_size(row['size']):>12}  {change}")
+        previous = row['size']
+    print("="*72 + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Per-version artifact size ledger and budget gate')
+    parser.add_argument('--ledger', default=LEDGER_FILE)
+    parser.add_argument('--budgets', default=BUDGETS_FILE)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser('record', help='record the current build outputs')
+    record_parser.add_argument('platform', choices=sorted(PLATFORM_ARTIFACTS))
+    record_parser.add_argument('version')
+    record_parser.add_argument('build_number')
+    record_parser.add_argument('--commit')
+
+    check_parser = subparsers.add_parser('check', help='fail when budgets or growth limits are exceeded')
+    check_parser.add_argument('platform', choices=sorted(PLATFORM_ARTIFACTS))
+    check_parser.add_argument('--version', help='check a recorded version instead of the build outputs on disk')
+
+    trend_parser = subparsers.add_parser('trend', help='show size per release')
+    trend_parser.add_argument('platform', choices=sorted(PLATFORM_ARTIFACTS))
+    trend_parser.add_argument('artifact')
+    trend_parser.add_argument('--limit', type=int, default=20)
+
+    args = parser.parse_args(argv)
+    ledger = SizeLedger(args.ledger, args.budgets)
+
+    if args.command == 'record':
+        rows = ledger.record(args.version, args.build_number, args.platform,
+                             args.commit or get_commit_hash(), measure_artifacts(args.platform))
+        for row in rows:
+            print(f"✅ Recorded {row['artifact']}: {format_size(row['size'])}")
+        if not rows:
+            print(f"⚠️ No {args.platform} build outputs found")
+        return 0
+
+    if args.command == 'check':
+        return 0 if print_findings(ledger.gate(args.platform, args.version)) else 1
+
+    print_trend(ledger.trend(args.platform, args.artifact, args.limit), args.platform, args.artifact)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Slack Template Engine
+Compiles Block Kit message templates once into pre-serialized JSON fragments with typed slots,
+checking Slack's block and text limits at compile time so rendering is a plain string join
+"""
+
+import json
+import re
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+# https://api.slack.com/reference/block-kit/blocks
+MAX_BLOCKS = 50
+MAX_MESSAGE_TEXT = 40000
+TEXT_LIMITS = {'header': 150, 'section': 3000, 'field': 2000, 'button': 75, 'context': 2000, 'url': 3000}
+ELEMENT_LIMITS = {'fields': 10, 'actions': 25, 'context': 10}
+
+PLACEHOLDER_RE = re.compile(r'\{(\w+)\}')
+MARKER = '\x00'
+MARKER_RE = re.compile(r'\\u0000(\w+)\\u0000')
+ELLIPSIS = '…'
+
+
+class TemplateError(ValueError):
+    """Raised when a template can exceed a Slack limit or references an undeclared slot"""
+
+
+class Slot:
+    """Typed template parameter; str values longer than max_length are truncated when rendered"""
+
+    def __init__(self, max_length: int, kind: type = str):
+        self.max_length = max_length
+        self.kind = kind
+
+    def format(self, name: str, value: object) -> str:
+        if self.kind is not str and not isinstance(value, self.kind):
+            raise TypeError(f"Slot '{name}' expects {self.kind.__name__}, got {type(value).__name__}")
+        text = str(value)
+        if len(text) > self.max_length:
+            text = text[:self.max_length - 1] + ELLIPSIS
+        # Escaped for embedding inside an already-serialized JSON string
+        return json.dumps(text, ensure_ascii=False)[1:-1]
+
+
+class CompiledTemplate:
+    def __init__(self, name: str, fragments: List[str], slot_names: List[str], slots: Dict[str, Slot]):
+        self.name = name
+        self.fragments = fragments
+        self.slot_names = slot_names
+        self.slots = slots
+        self.parts: List[Tuple[str, str, Slot]] = [
+            (fragments[i], slot_names[i], slots[slot_names[i]]) for i in range(len(slot_names))
+        ]
+        self.tail = fragments[-1]
+
+    def render(self, **values) -> str:
+        """Serialized JSON message body"""
+        try:
+            rendered = [f"{fragment}{slot.format(name, values[name])}" for fragment, name, slot in self.parts]
+        except KeyError as e:
+            raise TemplateError(f"Template '{self.name}' is missing slot {e}") from None
+        rendered.append(self.tail)
+        return ''.join(rendered)
+
+    def render_dict(self, **values) -> Dict:
+        return json.loads(self.render(**values))
+
+    def render_many(self, rows: Iterable[Dict[str, object]]) -> Iterator[str]:
+        """Render one message per row, e.g. for digests and backfills"""
+        render = self.render
+        for row in rows:
+            yield render(**row)
+
+
+def max_length(text: str, slots: Dict[str, Slot], template: str) -> int:
+    """Longest possible rendering of a template string"""
+    length = len(PLACEHOLDER_RE.sub('', text))
+    for name in PLACEHOLDER_RE.findall(text):
+        if name not in slots:
+            raise TemplateError(f"Template '{template}' uses undeclared slot '{name}'")
+        length += slots[name].max_length
+    return length
+
+
+def check_limit(text: str, limit: int, where: str, slots: Dict[str, Slot], template: str):
+    longest = max_length(text, slots, template)
+    if longest > limit:
+        raise TemplateError(f"Template '{template}': {where} can reach {longest} characters (limit {limit})")
+
+
+def validate(message: Dict, slots: Dict[str, Slot], name: str):
+    """Check every limited field of a Block Kit message against its worst-case length"""
+    blocks = message.get('blocks', [])
+    if len(blocks) > MAX_BLOCKS:
+        raise TemplateError(f"Template '{name}' has {len(blocks)} blocks (limit {MAX_BLOCKS})")
+    if 'text' in message:
+        check_limit(message['text'], MAX_MESSAGE_TEXT, 'text', slots, name)
+
+    for index, block in enumerate(blocks):
+        where = f"block {index} ({block['type']})"
+        if block['type'] == 'header':
+            check_limit(block['text']['text'], TEXT_LIMITS['header'], where, slots, name)
+        elif block['type'] == 'section':
+            if 'text' in block:
+                check_limit(block['text']['text'], TEXT_LIMITS['section'], where, slots, name)
+            fields = block.get('fields', [])
+            if len(fields) > ELEMENT_LIMITS['fields']:
+                raise TemplateError(f"Template '{name}': {where} has {len(fields)} fields "
+                                    f"(limit {ELEMENT_LIMITS['fields']})")
+            for field in fields:
+                check_limit(field['text'], TEXT_LIMITS['field'], f"{where} field", slots, name)
+        elif block['type'] in ('actions', 'context'):
+            elements = block.get('elements', [])
+            if len(elements) > ELEMENT_LIMITS[block['type']]:
+                raise TemplateError(f"Template '{name}': {where} has {len(elements)} elements "
+                                    f"(limit {ELEMENT_LIMITS[block['type']]})")
+            for element in elements:
+                if element.get('type') == 'button':
+                    check_limit(element['text']['text'], TEXT_LIMITS['button'], f"{where} button", slots, name)
+                    check_limit(element.get('url', ''), TEXT_LIMITS['url'], f"{where} url", slots, name)
+                elif 'text' in element:
+                    text = element['text'] if isinstance(element['text'], str) else element['text']['text']
+                    check_limit(text, TEXT_LIMITS['context'], f"{where} element", slots, name)
+
+
+def _mark_slots(node: Union[Dict, List, str, object]) -> Union[Dict, List, str, object]:
+    """Replace {slot} placeholders with markers that survive JSON serialization"""
+    if isinstance(node, dict):
+        return {key: _mark_slots(value) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_mark_slots(value) for value in node]
+    if isinstance(node, str):
+        return PLACEHOLDER_RE.sub(lambda m: f"{MARKER}{m.group(1)}{MARKER}", node)
+    return node
+
+
+def compile_template(name: str, message: Dict, slots: Dict[str, Slot]) -> CompiledTemplate:
+    """Validate a message template and split its serialized JSON into static fragments and slots"""
+    validate(message, slots, name)
+    serialized = json.dumps(_mark_slots(message), ensure_ascii=False, separators=(',', ':'))
+    pieces = MARKER_RE.split(serialized)
+    return CompiledTemplate(name, pieces[0::2], pieces[1::2], slots)
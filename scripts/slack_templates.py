@@ -1,124 +1,250 @@
 #!/usr/bin/env python3
 """
 Slack notification templates for different release scenarios
+Each template is compiled once at import (see slack_template_engine.py); the get_* helpers fill its slots
 """
 
-def get_success_template(platform: str, version: str, build_number: str, changelog: str, metadata: dict) -> dict:
-    """Template for successful release notification"""
-    platform_emoji = "🍎" if platform == "ios" else "🤖"
-    store_name = "TestFlight" if platform == "ios" else "Play Store Internal"
-    
-    return {
-        "text": f"{platform_emoji} New {platform.upper()} Release Available!",
-        "blocks": [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": f"{platform_emoji} {platform.upper()} Release - v{version}",
-                    "emoji": True
-                }
-            },
-            {
-                "type": "section",
-                "fields": [
-                    {"type": "mrkdwn", "text": f"*Version:* {version}"},
-                    {"type": "mrkdwn", "text": f"*Build:* {build_number}"},
-                    {"type": "mrkdwn", "text": f"*Platform:* {store_name}"},
-                    {"type": "mrkdwn", "text": f"*Branch:* {metadata.get('branch_name', 'unknown')}"},
-                    {"type": "mrkdwn", "text": f"*Commit:* `{metadata.get('commit_hash', 'unknown')[:8]}`"},
-                    {"type": "mrkdwn", "text": f"*Triggered by:* @{metadata.get('triggered_by', 'automated')}"}
-                ]
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"*📝 What's New:*\n```{changelog}```"
-                }
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"*📱 Download Instructions:*\n{get_download_instructions(platform)}"
+from slack_template_engine import Slot, compile_template
+
+SLOTS = {
+    'platform': Slot(16),
+    'platform_name': Slot(16),
+    'platform_emoji': Slot(4),
+    'store_name': Slot(32),
+    'version': Slot(32),
+    'build_number': Slot(16),
+    'environment': Slot(16),
+    'env_emoji': Slot(4),
+    'branch_name': Slot(128),
+    'commit': Slot(40),
+    'triggered_by': Slot(64),
+    'timestamp': Slot(40),
+    'repo': Slot(140),
+    'qa_assignee': Slot(64),
+    'changelog': Slot(2900),
+    'download_instructions': Slot(1000),
+    'error_message': Slot(2900),
+}
+
+SUCCESS_TEMPLATE = compile_template('success', {
+    "text": "{platform_emoji} New {platform_name} Release Available!",
+    "blocks": [
+        {
+            "type": "header",
+            "text": {
+                "type": "plain_text",
+                "text": "{platform_emoji} {platform_name} Release - v{version}",
+                "emoji": True
+            }
+        },
+        {
+            "type": "section",
+            "fields": [
+                {"type": "mrkdwn", "text": "*Version:* {version}"},
+                {"type": "mrkdwn", "text": "*Build:* {build_number}"},
+                {"type": "mrkdwn", "text": "*Platform:* {store_name}"},
+                {"type": "mrkdwn", "text": "*Branch:* {branch_name}"},
+                {"type": "mrkdwn", "text": "*Commit:* `{commit}`"},
+                {"type": "mrkdwn", "text": "*Triggered by:* @{triggered_by}"}
+            ]
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "*📝 What's New:*\n```{changelog}```"
+            }
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "*📱 Download Instructions:*\n{download_instructions}"
+            }
+        },
+        {
+            "type": "actions",
+            "elements": [
+                {
+                    "type": "button",
+                    "text": {
+                        "type": "plain_text",
+                        "text": "📋 View QA Checklist",
+                        "emoji": True
+                    },
+                    "style": "primary",
+                    "url": "https://github.com/{repo}/blob/main/qa/qa-checklist-v{version}-{platform}.json"
+                },
+                {
+                    "type": "button",
+                    "text": {
+                        "type": "plain_text",
+                        "text": "📖 Release Notes",
+                        "emoji": True
+                    },
+                    "url": "https://github.com/{repo}/blob/main/docs/releases/v{version}-{platform}.md"
                 }
-            },
-            {
-                "type": "actions",
-                "elements": [
-                    {
-                        "type": "button",
-                        "text": {
-                            "type": "plain_text",
-                            "text": "📋 View QA Checklist",
-                            "emoji": True
-                        },
-                        "style": "primary",
-                        "url": f"https://github.com/{metadata.get('repo', 'your-repo')}/blob/main/qa/qa-checklist-v{version}-{platform}.json"
+            ]
+        }
+    ]
+}, SLOTS)
+
+# Sent by PostDeploymentAutomation.send_slack_notification
+RELEASE_TEMPLATE = compile_template('release', {
+    "text": "{platform_emoji} New {platform_name} Release Available!",
+    "blocks": [
+        {
+            "type": "header",
+            "text": {
+                "type": "plain_text",
+                "text": "{env_emoji} {platform_name} Release - v{version} ({environment})"
+            }
+        },
+        {
+            "type": "section",
+            "fields": [
+                {"type": "mrkdwn", "text": "*Version:* {version}"},
+                {"type": "mrkdwn", "text": "*Build:* {build_number}"},
+                {"type": "mrkdwn", "text": "*Environment:* {environment}"},
+                {"type": "mrkdwn", "text": "*Platform:* {store_name}"},
+                {"type": "mrkdwn", "text": "*Branch:* {branch_name}"},
+                {"type": "mrkdwn", "text": "*Commit:* {commit}"},
+                {"type": "mrkdwn", "text": "*Triggered by:* {triggered_by}"},
+                {"type": "mrkdwn", "text": "*Upload time:* {timestamp}"}
+            ]
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "*📝 What's New:*\n```{changelog}```"
+            }
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "*📱 Download Instructions:*\n{download_instructions}"
+            }
+        }
+    ]
+}, SLOTS)
+
+FAILURE_TEMPLATE = compile_template('failure', {
+    "text": "❌ {platform_name} Release Failed!",
+    "blocks": [
+        {
+            "type": "header",
+            "text": {
+                "type": "plain_text",
+                "text": "❌ {platform_emoji} {platform_name} Release Failed - v{version}",
+                "emoji": True
+            }
+        },
+        {
+            "type": "section",
+            "fields": [
+                {"type": "mrkdwn", "text": "*Version:* {version}"},
+                {"type": "mrkdwn", "text": "*Platform:* {platform_name}"},
+                {"type": "mrkdwn", "text": "*Branch:* {branch_name}"},
+                {"type": "mrkdwn", "text": "*Triggered by:* @{triggered_by}"}
+            ]
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "*🚨 Error Details:*\n```{error_message}```"
+            }
+        },
+        {
+            "type": "actions",
+            "elements": [
+                {
+                    "type": "button",
+                    "text": {
+                        "type": "plain_text",
+                        "text": "🔍 View Logs",
+                        "emoji": True
                     },
-                    {
-                        "type": "button",
-                        "text": {
-                            "type": "plain_text",
-                            "text": "📖 Release Notes",
-                            "emoji": True
-                        },
-                        "url": f"https://github.com/{metadata.get('repo', 'your-repo')}/blob/main/docs/releases/v{version}-{platform}.md"
-                    }
-                ]
+                    "style": "danger",
+                    "url": "https://github.com/{repo}/actions"
+                }
+            ]
+        }
+    ]
+}, SLOTS)
+
+QA_REMINDER_TEMPLATE = compile_template('qa_reminder', {
+    "text": "🧪 QA Testing Required - {platform_name} v{version}",
+    "blocks": [
+        {
+            "type": "header",
+            "text": {
+                "type": "plain_text",
+                "text": "🧪 QA Testing Required - {platform_emoji} v{version}",
+                "emoji": True
+            }
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "Hey @{qa_assignee}! 👋\n\nA new {platform_name} build is ready for testing. Please complete the QA checklist and report any issues."
             }
-        ]
+        },
+        {
+            "type": "section",
+            "fields": [
+                {"type": "mrkdwn", "text": "*Platform:* {platform_name}"},
+                {"type": "mrkdwn", "text": "*Version:* {version}"},
+                {"type": "mrkdwn", "text": "*Assigned to:* @{qa_assignee}"},
+                {"type": "mrkdwn", "text": "*Priority:* High"}
+            ]
+        }
+    ]
+}, SLOTS)
+
+TEMPLATES = {
+    'success': SUCCESS_TEMPLATE,
+    'release': RELEASE_TEMPLATE,
+    'failure': FAILURE_TEMPLATE,
+    'qa_reminder': QA_REMINDER_TEMPLATE,
+}
+
+def platform_slots(platform: str) -> dict:
+    """Slots derived from the platform name"""
+    return {
+        'platform': platform,
+        'platform_name': platform.upper(),
+        'platform_emoji': "🍎" if platform == "ios" else "🤖",
+        'store_name': "TestFlight" if platform == "ios" else "Play Store Internal",
     }
 
+def get_success_template(platform: str, version: str, build_number: str, changelog: str, metadata: dict) -> dict:
+    """Template for successful release notification"""
+    return SUCCESS_TEMPLATE.render_dict(
+        **platform_slots(platform),
+        version=version,
+        build_number=build_number,
+        changelog=changelog,
+        download_instructions=get_download_instructions(platform),
+        branch_name=metadata.get('branch_name', 'unknown'),
+        commit=metadata.get('commit_hash', 'unknown')[:8],
+        triggered_by=metadata.get('triggered_by', 'automated'),
+        repo=metadata.get('repo', 'your-repo')
+    )
+
 def get_failure_template(platform: str, version: str, error_message: str, metadata: dict) -> dict:
     """Template for failed release notification"""
-    platform_emoji = "🍎" if platform == "ios" else "🤖"
-    
-    return {
-        "text": f"❌ {platform.upper()} Release Failed!",
-        "blocks": [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": f"❌ {platform_emoji} {platform.upper()} Release Failed - v{version}",
-                    "emoji": True
-                }
-            },
-            {
-                "type": "section",
-                "fields": [
-                    {"type": "mrkdwn", "text": f"*Version:* {version}"},
-                    {"type": "mrkdwn", "text": f"*Platform:* {platform.upper()}"},
-                    {"type": "mrkdwn", "text": f"*Branch:* {metadata.get('branch_name', 'unknown')}"},
-                    {"type": "mrkdwn", "text": f"*Triggered by:* @{metadata.get('triggered_by', 'automated')}"}
-                ]
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"*🚨 Error Details:*\n```{error_message}```"
-                }
-            },
-            {
-                "type": "actions",
-                "elements": [
-                    {
-                        "type": "button",
-                        "text": {
-                            "type": "plain_text",
-                            "text": "🔍 View Logs",
-                            "emoji": True
-                        },
-                        "style": "danger",
-                        "url": f"https://github.com/{metadata.get('repo', 'your-repo')}/actions"
-                    }
-                ]
-            }
-        ]
-    }
+    return FAILURE_TEMPLATE.render_dict(
+        **platform_slots(platform),
+        version=version,
+        error_message=error_message,
+        branch_name=metadata.get('branch_name', 'unknown'),
+        triggered_by=metadata.get('triggered_by', 'automated'),
+        repo=metadata.get('repo', 'your-repo')
+    )
 
 def get_download_instructions(platform: str) -> str:
     """Get platform-specific download instructions"""
@@ -135,34 +261,4 @@ def get_download_instructions(platform: str) -> str:
 
 def get_qa_reminder_template(platform: str, version: str, qa_assignee: str) -> dict:
     """Template for QA testing reminder"""
-    platform_emoji = "🍎" if platform == "ios" else "🤖"
-    
-    return {
-        "text": f"🧪 QA Testing Required - {platform.upper()} v{version}",
-        "blocks": [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": f"🧪 QA Testing Required - {platform_emoji} v{version}",
-                    "emoji": True
-                }
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"Hey @{qa_assignee}! 👋\n\nA new {platform.upper()} build is ready for testing. Please complete the QA checklist and report any issues."
-                }
-            },
-            {
-                "type": "section",
-                "fields": [
-                    {"type": "mrkdwn", "text": f"*Platform:* {platform.upper()}"},
-                    {"type": "mrkdwn", "text": f"*Version:* {version}"},
-                    {"type": "mrkdwn", "text": f"*Assigned to:* @{qa_assignee}"},
-                    {"type": "mrkdwn", "text": f"*Priority:* High"}
-                ]
-            }
-        ]
-    }
+    return QA_REMINDER_TEMPLATE.render_dict(**platform_slots(platform), version=version, qa_assignee=qa_assignee)
@@ -2,162 +2,20 @@
 
 # CI/CD Pipeline Test Script
 # This script tests all the CI/CD pipeline steps locally
+#
+# The steps are declared in scripts/pipeline_runner.py, which runs independent steps in
+# parallel within a core budget and skips steps whose inputs are unchanged since their
+# last successful run. Options are passed through, e.g.:
+#   scripts/test_ci_pipeline.sh --only test      # tests and the steps they need
+#   scripts/test_ci_pipeline.sh --no-cache       # run everything
+#   scripts/test_ci_pipeline.sh --list           # show the step graph
 
 set -e  # Exit on any error
 
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+cd "$SCRIPT_DIR/.."
+
 echo "🚀 Testing CI/CD Pipeline Locally"
 echo "=================================="
 
-# Colors for output
-RED='\033[0;31m'
-GREEN='\033[0;32m'
-YELLOW='\033[1;33m'
-BLUE='\033[0;34m'
-NC='\033[0m' # No Color
-
-# Function to print status
-print_status() {
-    echo -e "${BLUE}[INFO]${NC} $1"
-}
-
-print_success() {
-    echo -e "${GREEN}[SUCCESS]${NC} $1"
-}
-
-print_warning() {
-    echo -e "${YELLOW}[WARNING]${NC} $1"
-}
-
-print_error() {
-    echo -e "${RED}[ERROR]${NC} $1"
-}
-
-# Step 1: Get dependencies
-print_status "Step 1: Getting dependencies..."
-if flutter pub get; then
-    print_success "Dependencies installed successfully"
-else
-    print_error "Failed to get dependencies"
-    exit 1
-fi
-
-# Step 2: Generate code
-print_status "Step 2: Generating code..."
-if dart run build_runner build --delete-conflicting-outputs; then
-    print_success "Code generation completed successfully"
-else
-    print_error "Failed to generate code"
-    exit 1
-fi
-
-# Step 3: Check formatting
-print_status "Step 3: Checking code formatting..."
-if dart format --set-exit-if-changed .; then
-    print_success "Code formatting is correct"
-else
-    print_warning "Code formatting issues found - running formatter..."
-    dart format .
-    print_success "Code formatted successfully"
-fi
-
-# Step 4: Sort imports
-print_status "Step 4: Sorting imports..."
-if dart run import_sorter:main --no-comments; then
-    print_success "Imports sorted successfully"
-else
-    print_warning "Import sorting had issues but continuing..."
-fi
-
-# Step 5: Analyze code (check for critical issues only)
-print_status "Step 5: Analyzing code (critical issues only)..."
-if flutter analyze --no-fatal-infos; then
-    print_success "Code analysis passed (no critical issues)"
-else
-    print_warning "Analysis completed with acceptable info hints and warnings"
-fi
-
-# Step 6: Full analysis for reporting (non-blocking)
-print_status "Step 6: Running full analysis for reporting..."
-if flutter analyze --fatal-infos; then
-    print_success "Full analysis passed with no issues"
-else
-    print_warning "Full analysis found minor issues (info hints and style suggestions) - this is acceptable"
-fi
-
-# Step 7: Validate dependencies
-print_status "Step 7: Validating dependencies..."
-if dart run dependency_validator; then
-    print_success "Dependency validation passed"
-else
-    print_warning "Dependency validation found potential issues - this is acceptable for development"
-fi
-
-# Step 8: Run tests with coverage
-print_status "Step 8: Running tests with coverage..."
-if flutter test --coverage; then
-    print_success "All tests passed with coverage generated"
-else
-    print_error "Tests failed"
-    exit 1
-fi
-
-# Step 9: Check coverage file
-print_status "Step 9: Checking coverage file..."
-if [ -f "coverage/lcov.info" ]; then
-    print_success "Coverage file generated successfully"
-    # Show coverage summary if lcov is available
-    if command -v lcov &> /dev/null; then
-        print_status "Coverage summary:"
-        lcov --summary coverage/lcov.info
-    fi
-else
-    print_warning "Coverage file not found"
-fi
-
-# Step 10: Test Android build (if on Linux/macOS)
-print_status "Step 10: Testing Android build..."
-if flutter build apk --debug; then
-    print_success "Android debug build successful"
-else
-    print_warning "Android build failed - this might be due to missing Android SDK"
-fi
-
-# Step 11: Test Web build
-print_status "Step 11: Testing Web build..."
-if flutter build web; then
-    print_success "Web build successful"
-else
-    print_warning "Web build failed"
-fi
-
-# Step 12: Test iOS build (if on macOS)
-if [[ "$OSTYPE" == "darwin"* ]]; then
-    print_status "Step 12: Testing iOS build..."
-    if flutter build ios --no-codesign; then
-        print_success "iOS build successful"
-    else
-        print_warning "iOS build failed - this might be due to missing iOS setup"
-    fi
-else
-    print_status "Step 12: Skipping iOS build (not on macOS)"
-fi
-
-echo ""
-echo "🎉 CI/CD Pipeline Test Complete!"
-echo "================================"
-print_success "All critical steps passed successfully"
-print_status "Your project is ready for CI/CD deployment"
-
-# Summary
-echo ""
-echo "📊 Summary:"
-echo "- ✅ Dependencies: OK"
-echo "- ✅ Code Generation: OK"
-echo "- ✅ Formatting: OK"
-echo "- ✅ Import Sorting: OK"
-echo "- ✅ Code Analysis: OK"
-echo "- ✅ Tests: OK"
-echo "- ✅ Coverage: OK"
-echo "- ✅ Builds: OK"
-echo ""
-echo "🚀 Ready for production deployment!"
+exec python3 scripts/pipeline_runner.py "$@"
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Web Bundle Analyzer
+Measures what users actually download from build/web: raw, gzip and brotli size per file,
+compressed in a process pool and cached by content hash, with startup vs deferred transfer totals
+and deferred-loading candidates for main.dart.js, attributed to packages through its source map
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from bundle_size_analyzer import format_size
+from file_cache import FileHashCache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+WEB_BUILD_DIR = 'build/web'
+ANALYZER_VERSION = '1'
+# Static hosting precompresses once, so measure the strongest settings servers ship with
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+# Below this many uncompressed bytes a process pool costs more than it saves
+PARALLEL_BYTES = 4 * 1024 * 1024
+# main.dart.js transfer size above which large libraries are worth moving behind `deferred as`
+DEFERRED_HINT_BYTES = int(os.getenv('WEB_DEFERRED_HINT_BYTES', str(1024 * 1024)))
+# Packages taking at least this share of main.dart.js are reported as deferred-load candidates
+CANDIDATE_SHARE = 0.05
+# Parts smaller than this (gzip) cost more in request overhead than they save
+MIN_PART_BYTES = 2048
+# Fetched before the first frame; deferred parts and assets load later. Only the default CanvasKit build
+# counts: the chromium/ and skwasm variants are alternatives a browser picks instead of it
+STARTUP_CATEGORIES = ('main.dart.js', 'other')
+STARTUP_FILES = ('canvaskit/canvaskit.js', 'canvaskit/canvaskit.wasm')
+CATEGORIES = ('main.dart.js', 'deferred', 'canvaskit', 'assets', 'sourcemaps', 'other')
+SOURCE_MAP = 'main.dart.js.map'
+BASE64_DIGITS = {c: i for i, c in enumerate('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/')}
+# Package of a source map entry: pub cache, packages/ URIs and the Flutter SDK packages, then the Dart SDK
+PACKAGE_SOURCE_RES = (
+    re.compile(r'/pub\.dev/(?P<package>\w+)-[^/]+/lib/'),
+    re.compile(r'(?:^|/)packages/(?P<package>\w+)/'),
+)
+SDK_SOURCE_RE = re.compile(r'dart-sdk/|org-dartlang-sdk:')
+
+
+def category_of(relative_path: str) -> str:
+    name = os.path.basename(relative_path)
+    if relative_path == 'main.dart.js':
+        return 'main.dart.js'
+    if name.endswith('.part.js'):
+        return 'deferred'
+    if name.endswith('.map'):
+        return 'sourcemaps'
+    if relative_path.startswith('canvaskit/'):
+        return 'canvaskit'
+    if relative_path.startswith('assets/'):
+        return 'assets'
+    return 'other'
+
+
+def compressed_sizes(path: str) -> Dict[str, Optional[int]]:
+    """Raw, gzip and brotli (None without the brotli module) size of one file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return {
+        'raw': len(data),
+        'gzip': len(gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)),
+        'brotli': len(brotli.compress(data, quality=BROTLI_QUALITY)) if brotli else None,
+    }
+
+
+def list_files(root: str) -> List[str]:
+    return sorted(os.path.join(directory, name) for directory, _, names in os.walk(root) for name in names)
+
+
+def measure_files(root: str = WEB_BUILD_DIR, max_workers: Optional[int] = None) -> Dict[str, Dict]:
+    """{relative path: {raw, gzip, brotli, category}}; only new or changed files are compressed"""
+    cache = FileHashCache('web_bundle_analyzer',
+                          version=f"{ANALYZER_VERSION}:{GZIP_LEVEL}:{BROTLI_QUALITY if brotli else 'none'}")
+    paths = list_files(root)
+    results: Dict[str, Dict] = {}
+    pending = []
+    for path in paths:
+        fingerprint, sizes = cache.lookup(path)
+        if sizes is None:
+            pending.append((path, fingerprint))
+        else:
+            results[path] = sizes
+
+    # Largest files first so one big main.dart.js does not finish last on an idle pool
+    pending.sort(key=lambda item: -item[1]['size'])
+    pending_paths = [path for path, _ in pending]
+    if len(pending) > 1 and sum(fingerprint['size'] for _, fingerprint in pending) >= PARALLEL_BYTES:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            measured = list(executor.map(compressed_sizes, pending_paths))
+    else:
+        measured = [compressed_sizes(path) for path in pending_paths]
+
+    for (path, fingerprint), sizes in zip(pending, measured):
+        results[path] = sizes
+        cache.store(path, fingerprint, sizes)
+    cache.prune(paths)
+    cache.save()
+
+    files = {}
+    for path in paths:
+        relative = os.path.relpath(path, root).replace(os.sep, '/')
+        files[relative] = {**results[path], 'category': category_of(relative)}
+    return files
+
+
+def package_of(source: str) -> Optional[str]:
+    for pattern in PACKAGE_SOURCE_RES:
+        match = pattern.search(source)
+        if match:
+            return match.group('package')
+    return 'dart:sdk' if SDK_SOURCE_RE.search(source) else None
+
+
+def decode_vlq(segment: str) -> List[int]:
+    values, value, shift = [], 0, 0
+    for char in segment:
+        digit = BASE64_DIGITS[char]
+        value += (digit & 31) << shift
+        if digit & 32:
+            shift += 5
+        else:
+            values.append(-(value >> 1) if value & 1 else value >> 1)
+            value, shift = 0, 0
+    return values
+
+
+def attribute_source_map(script_path: str, map_path: str) -> Dict[str, int]:
+    """Bytes of the generated script per package: each mapped span counts towards its source's package"""
+    with open(script_path, 'rb') as f:
+        line_lengths = [len(line) for line in f.read().split(b'\n')]
+    with open(map_path, 'r', encoding='utf-8') as f:
+        source_map = json.load(f)
+    packages = [package_of(source or '') for source in source_map.get('sources', [])]
+
+    sizes: Dict[str, int] = {}
+    source = 0
+    for line_index, line in enumerate(source_map.get('mappings', '').split(';')):
+        length = line_lengths[line_index] if line_index < len(line_lengths) else 0
+        column, spans = 0, []
+        for segment in line.split(','):
+            if not segment:
+                continue
+            # Only the generated column restarts per line; the source index is relative to the previous one
+            values = decode_vlq(segment)
+            column += values[0]
+            if len(values) >= 4:
+                source += values[1]
+            spans.append((column, source if len(values) >= 4 else None))
+        for (start, index), (end, _) in zip(spans, spans[1:] + [(length, None)]):
+            package = packages[index] if index is not None and index < len(packages) else None
+            if package and end > start:
+                sizes[package] = sizes.get(package, 0) + end - start
+    return sizes
+
+
+def source_map_packages(root: str) -> Optional[Dict[str, int]]:
+    """Bytes of main.dart.js per package from main.dart.js.map (None without one), cached by content hash"""
+    script_path, map_path = os.path.join(root, 'main.dart.js'), os.path.join(root, SOURCE_MAP)
+    if not (os.path.exists(script_path) and os.path.exists(map_path)):
+        return None
+    cache = FileHashCache('web_source_map', version=ANALYZER_VERSION)
+    fingerprint, sizes = cache.lookup(map_path)
+    if sizes is None:
+        sizes = attribute_source_map(script_path, map_path)
+        cache.store(map_path, fingerprint, sizes)
+        cache.save()
+    return sizes
+
+
+def deferred_candidates(files: Dict[str, Dict], root: str = WEB_BUILD_DIR) -> List[Dict]:
+    """Findings for main.dart.js too large to ship eagerly and for parts too small to split out"""
+    findings = []
+    main = files.get('main.dart.js')
+    if main:
+        transfer = transfer_size(main)
+        if transfer > DEFERRED_HINT_BYTES:
+            message = (f"{format_size(transfer)} transferred before the first frame "
+                       f"(hint above {format_size(DEFERRED_HINT_BYTES)}); load large features with `deferred as`")
+            packages = source_map_packages(root)
+            if packages is None:
+                message += "; build with --source-maps to name the largest packages"
+            ranked = sorted((packages or {}).items(), key=lambda item: -item[1])
+            large = [name for name, size in ranked
+                     if name != 'dart:sdk' and size >= main['raw'] * CANDIDATE_SHARE]
+            findings.append({'file': 'main.dart.js', 'message': message, 'packages': large})
+    for name, sizes in files.items():
+        if sizes['category'] == 'deferred' and sizes['gzip'] < MIN_PART_BYTES:
+            findings.append({
+                'file': name,
+                'message': f"only {format_size(sizes['gzip'])} gzipped; the extra request outweighs the saving",
+                'packages': [],
+            })
+    return findings
+
+
+def transfer_size(sizes: Dict) -> int:
+    """Bytes on the wire with the best encoding available"""
+    return sizes['brotli'] if sizes.get('brotli') is not None else sizes['gzip']
+
+
+def analyze(root: str = WEB_BUILD_DIR, max_workers: Optional[int] = None) -> Dict:
+    files = measure_files(root, max_workers)
+    totals = {category: {'files': 0, 'raw': 0, 'gzip': 0, 'brotli': 0 if brotli else None}
+              for category in CATEGORIES}
+    for sizes in files.values():
+        total = totals[sizes['category']]
+        total['files'] += 1
+        for encoding in ('raw', 'gzip', 'brotli'):
+            if total[encoding] is not None:
+                total[encoding] += sizes[encoding]
+
+    def combined(categories, extra_files=()) -> Dict:
+        return {encoding: (None if encoding == 'brotli' and brotli is None
+                           else sum(totals[category][encoding] for category in categories)
+                           + sum(files[name][encoding] for name in extra_files if name in files))
+                for encoding in ('raw', 'gzip', 'brotli')}
+
+    return {
+        'root': root,
+        'files': files,
+        'categories': totals,
+        'startup': combined(STARTUP_CATEGORIES, STARTUP_FILES),
+        'total': combined([category for category in CATEGORIES if category != 'sourcemaps']),
+        'candidates': deferred_candidates(files, root),
+    }
+
+
+def ledger_components(report: Dict) -> Dict[str, int]:
+    """Raw size per category plus total and startup transfer sizes, as size ledger components of 'web'"""
+    components = {category: totals['raw'] for category, totals in report['categories'].items() if totals['files']}
+    for encoding in ('gzip', 'brotli'):
+        if report['total'][encoding] is not None:
+            components[f"transfer_{encoding}"] = report['total'][encoding]
+            # Not '/startup': that component left out CanvasKit, so growth against it would be misleading
+            components[f"transfer_{encoding}/first_frame"] = report['startup'][encoding]
+    return components
+
+
+def _size(size: Optional[int]) -> str:
+    return '-' if size is None else format_size(size)
+
+
+def print_report(report: Dict, top: int):
+    print("\n" + "="*72)
+    print(f"🌐 WEB BUNDLE TRANSFER SIZE ({report['root']})")
+    print("="*72)
+    print(f"{'':<16}{'files':>7}{'raw':>14}{'gzip':>14}{'brotli':>14}")
+    for category, totals in report['categories'].items():
+        if totals['files']:
+            print(f"{category:<16}{totals['files']:>7}{_size(totals['raw']):>14}"
+                  f"{_size(totals['gzip']):>14}{_size(totals['brotli']):>14}")
+    for label in ('startup', 'total'):
+        sizes = report[label]
+        print(f"{label.capitalize():<16}{'':>7}{_size(sizes['raw']):>14}"
+              f"{_size(sizes['gzip']):>14}{_size(sizes['brotli']):>14}")
+    if brotli is None:
+        print("ℹ️  Install the brotli package for brotli sizes")
+
+    downloads = [(name, sizes) for name, sizes in report['files'].items() if sizes['category'] != 'sourcemaps']
+    ranked = sorted(downloads, key=lambda item: -transfer_size(item[1]))[:top]
+    print("\n🔝 Largest downloads:")
+    for name, sizes in ranked:
+        print(f"   {_size(transfer_size(sizes)):>12}  {name} ({_size(sizes['raw'])} raw)")
+
+    if report['candidates']:
+        print("\n✂️  Deferred loading:")
+        for finding in report['candidates']:
+            print(f"   ⚠️  {finding['file']}: {finding['message']}")
+            for package in finding['packages']:
+                print(f"      - {package}")
+    print("="*72 + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Raw, gzip and brotli sizes of a Flutter web build')
+    parser.add_argument('root', nargs='?', default=WEB_BUILD_DIR, help='web build directory')
+    parser.add_argument('--top', type=int, default=10, help='number of largest files to list')
+    parser.add_argument('--workers', type=int, help='compression processes')
+    parser.add_argument('--json', action='store_true', help='print the full report as JSON')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.root):
+        print(f"❌ Web build not found: {args.root}")
+        return 1
+
+    report = analyze(args.root, args.workers)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())